@@ -1,4 +1,5 @@
 # backend/app/api/routes/__init__.py
-from .emotion import router as emotion_router
+from .admin import router as admin_router
+from .emotion import ANALYSIS_PATHS, router as emotion_router
 
-__all__ = ["emotion_router"]
\ No newline at end of file
+__all__ = ["ANALYSIS_PATHS", "admin_router", "emotion_router"]
@@ -0,0 +1,40 @@
+# backend/app/api/routes/admin.py
+from typing import List
+
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi.responses import PlainTextResponse
+
+from app.core.profiling import ADMIN_TOKEN_HEADER, profiler
+from app.models.emotion import ProfileSummary
+
+
+def require_admin(token: str = Header("", alias=ADMIN_TOKEN_HEADER)) -> None:
+    """Reject requests without a valid X-Admin-Token."""
+    if not profiler.is_admin(token):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin token required")
+
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+@router.get("/profiles", response_model=List[ProfileSummary])
+async def list_profiles():
+    """
+    List stored request profiles, newest first
+    
+    Profiles written by an earlier server process only carry their id and
+    creation time.
+    """
+    return profiler.store.list()
+
+@router.get("/profiles/{profile_id}", response_class=PlainTextResponse)
+async def get_profile(profile_id: str):
+    """
+    Fetch one profile as collapsed stacks
+    
+    Each line is ``thread;outermost;...;innermost samples``, ready for
+    flamegraph.pl or speedscope.
+    """
+    profile = profiler.store.read(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Profile {profile_id} not found")
+    return PlainTextResponse(profile)
@@ -1,26 +1,74 @@
 # backend/app/api/routes/emotion.py
-from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, WebSocket, WebSocketDisconnect, status
 from fastapi.responses import JSONResponse
+from pydantic import ValidationError
 from datetime import datetime
-import uuid
-from typing import Optional
+import asyncio
+import time
+from typing import Optional, Union
 from app.models.emotion import (
+    AdmissionStats,
+    CacheStats,
     EmotionAnalysisRequest, 
     EmotionAnalysisResponse,
+    EmotionBatchRequest,
+    EmotionBatchResponse,
+    EmotionDocumentRequest,
+    EmotionDocumentResponse,
+    EmotionJobRequest,
+    EmotionJobResponse,
+    EmotionJobStatus,
     EmotionStats,
+    EmotionType,
+    EmotionWindowStats,
     HealthCheckResponse,
-    ErrorResponse
+    ErrorResponse,
+    LiveEdit,
+    LiveUpdate,
+    CRISIS_MESSAGE,
+    MicroBatchStats,
+    SingleFlightStats
 )
-from app.services.emotion_analyzer import emotion_analyzer
+from app.services.fast_response import (
+    SUPPORTED_EMOTIONS_SNAPSHOT,
+    RefreshingSnapshot,
+    encode_analysis_response,
+    json_response,
+    new_id,
+    snapshot_response
+)
+from app.services.documents import CrisisContentError
+from app.services.jobs import JobQueueFull, job_manager
+from app.services.streaming import DuplexStreamingResponse, encode_ndjson, iter_ndjson_batches
+from app.services.warmup import warmup
+from app.core.admission import admission_controller
+from app.core.metrics import InstrumentedRoute
 from app.core.logging import get_logger
 from app.core.config import settings
 
 logger = get_logger(__name__)
-router = APIRouter()
+router = APIRouter(route_class=InstrumentedRoute)
+
+# Routes that run analyses, relative to the router's prefix; these are the
+# ones admission control applies to
+ANALYSIS_PATHS = (
+    "/analyze",
+    "/analyze/batch",
+    "/analyze/document",
+    "/analyze/stream",
+    "/analyze/live",
+    "/jobs",
+)
 
 # Track service start time for uptime calculation
 service_start_time = datetime.now()
 
+def _analyzer():
+    # Imported here so that importing the routes does not load the analyzer
+    # and NumPy; it is normally already built by the startup warm-up
+    from app.services.emotion_analyzer import get_emotion_analyzer
+    return get_emotion_analyzer()
+
 @router.post("/analyze", response_model=EmotionAnalysisResponse)
 async def analyze_emotion(
     request: EmotionAnalysisRequest,
@@ -32,10 +80,13 @@ async def analyze_emotion(
     This endpoint accepts text input and returns a comprehensive emotion analysis
     including primary emotion, confidence score, secondary emotions, and suggestions.
     """
-    request_id = str(uuid.uuid4())
+    request_id = new_id()
     client_ip = client_request.client.host
     
-    logger.info(f"Emotion analysis request {request_id} from {client_ip}")
+    logger.info(
+        "Emotion analysis request %s from %s", request_id, client_ip,
+        extra={"sampled": True, "request_id": request_id, "client_ip": client_ip}
+    )
     
     try:
         # Validate request
@@ -45,84 +96,565 @@ async def analyze_emotion(
                 detail="Text input cannot be empty"
             )
         
-        # Analyze emotion
-        result = emotion_analyzer.analyze_emotion(request)
+        # Analyze emotion without blocking the event loop
+        result = await _analyzer().analyze_emotion_async(request)
         
-        logger.info(f"Request {request_id} completed successfully: {result.emotion}")
+        logger.info(
+            "Request %s completed successfully: %s", request_id, result.emotion,
+            extra={"sampled": True, "request_id": request_id, "analysis_id": result.analysis_id}
+        )
         
+        if settings.FAST_RESPONSES:
+            return json_response(encode_analysis_response(result))
         return result
         
     except ValueError as e:
-        logger.warning(f"Validation error for request {request_id}: {str(e)}")
+        logger.warning("Validation error for request %s: %s", request_id, e, extra={"request_id": request_id})
         raise HTTPException(
             status_code=400,
             detail=str(e)
         )
     except Exception as e:
-        logger.error(f"Unexpected error for request {request_id}: {str(e)}")
+        logger.error("Unexpected error for request %s: %s", request_id, e, extra={"request_id": request_id})
         raise HTTPException(
             status_code=500,
             detail="Internal server error occurred during emotion analysis"
         )
 
-@router.get("/stats", response_model=EmotionStats)
-async def get_emotion_stats():
+@router.post("/analyze/batch", response_model=EmotionBatchResponse)
+async def analyze_emotion_batch(
+    request: EmotionBatchRequest,
+    client_request: Request
+):
+    """
+    Analyze emotions for many texts in one call
+    
+    Items are scored together with vectorized lexicon scoring. Items that fail
+    validation are reported inline with an error and do not fail the batch.
+    """
+    request_id = new_id()
+    client_ip = client_request.client.host
+    
+    if len(request.items) > settings.BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch cannot contain more than {settings.BATCH_MAX_ITEMS} items"
+        )
+    
+    logger.info(
+        "Batch analysis request %s from %s: %d items", request_id, client_ip, len(request.items),
+        extra={"request_id": request_id, "client_ip": client_ip}
+    )
+    
+    try:
+        start_time = time.time()
+        results = await _analyzer().analyze_batch_async(request.items)
+        succeeded = sum(1 for item in results if item.result is not None)
+        
+        logger.info(
+            "Batch request %s completed: %d/%d analyzed", request_id, succeeded, len(results),
+            extra={"request_id": request_id}
+        )
+        
+        return EmotionBatchResponse(
+            results=results,
+            succeeded=succeeded,
+            failed=len(results) - succeeded,
+            processing_time=round(time.time() - start_time, 3)
+        )
+        
+    except Exception as e:
+        logger.error("Unexpected error for batch request %s: %s", request_id, e, extra={"request_id": request_id})
+        raise HTTPException(
+            status_code=500,
+            detail="Internal server error occurred during batch emotion analysis"
+        )
+
+@router.post("/analyze/document", response_model=EmotionDocumentResponse)
+async def analyze_emotion_document(
+    request: EmotionDocumentRequest,
+    client_request: Request
+):
+    """
+    Analyze a long document, such as a journal entry
+    
+    The document is split into sentences or paragraphs, which are scored in
+    parallel batches. Returns the analysis of the whole document and an
+    emotion timeline with one entry per chunk, located by character offsets.
+    """
+    request_id = new_id()
+    client_ip = client_request.client.host
+    
+    logger.info(
+        "Document analysis request %s from %s: %d characters", request_id, client_ip, len(request.text),
+        extra={"request_id": request_id, "client_ip": client_ip}
+    )
+    
+    try:
+        result = await _analyzer().analyze_document_async(request)
+        
+        logger.info(
+            "Document request %s completed: %s over %d chunks", request_id, result.analysis.emotion, result.chunks,
+            extra={"request_id": request_id, "analysis_id": result.analysis.analysis_id}
+        )
+        
+        if settings.FAST_RESPONSES:
+            return json_response(result.model_dump_json().encode("utf-8"))
+        return result
+        
+    except CrisisContentError as e:
+        logger.warning("Crisis content in document request %s", request_id, extra={"request_id": request_id})
+        raise HTTPException(
+            status_code=422,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error("Unexpected error for document request %s: %s", request_id, e, extra={"request_id": request_id})
+        raise HTTPException(
+            status_code=500,
+            detail="Internal server error occurred during document emotion analysis"
+        )
+
+@router.post("/jobs", response_model=EmotionJobStatus, status_code=202)
+async def create_analysis_job(
+    request: EmotionJobRequest,
+    client_request: Request
+):
+    """
+    Submit a large batch for analysis in the background
+    
+    Returns the job id at once; poll ``GET /jobs/{job_id}`` for progress and
+    results. Jobs are kept in a local database, so they survive restarts.
+    """
+    request_id = new_id()
+    client_ip = client_request.client.host
+    
+    if len(request.items) > settings.JOBS_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Job cannot contain more than {settings.JOBS_MAX_ITEMS} items"
+        )
+    
+    try:
+        job = await job_manager.submit(request.items)
+    except JobQueueFull as e:
+        logger.warning("Job request %s from %s refused: %s", request_id, client_ip, e, extra={"request_id": request_id})
+        raise HTTPException(
+            status_code=503,
+            detail="Too many jobs are waiting; try again later",
+            headers={"Retry-After": "60"}
+        )
+    except Exception as e:
+        logger.error("Unexpected error for job request %s: %s", request_id, e, extra={"request_id": request_id})
+        raise HTTPException(
+            status_code=500,
+            detail="Internal server error occurred while submitting the job"
+        )
+    
+    logger.info(
+        "Job %s submitted by %s: %d items", job.job_id, client_ip, job.total,
+        extra={"request_id": request_id, "client_ip": client_ip, "job_id": job.job_id}
+    )
+    return job
+
+@router.get("/jobs/{job_id}", response_model=EmotionJobResponse)
+async def get_analysis_job(
+    job_id: str,
+    offset: int = Query(0, ge=0, description="Index of the first result to return"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of results to return")
+):
+    """
+    Get the progress of a job and a page of its results
+    
+    Results are available for processed items while the job is still running.
+    """
+    try:
+        job = await job_manager.get(job_id, offset, limit)
+    except Exception as e:
+        logger.error("Error fetching job %s: %s", job_id, e, extra={"job_id": job_id})
+        raise HTTPException(
+            status_code=500,
+            detail="Internal server error occurred while fetching the job"
+        )
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    
+    if settings.FAST_RESPONSES:
+        return json_response(job.model_dump_json().encode("utf-8"))
+    return job
+
+@router.post(
+    "/analyze/stream",
+    response_class=DuplexStreamingResponse,
+    responses={200: {"content": {"application/x-ndjson": {}}}}
+)
+async def analyze_emotion_stream(client_request: Request):
+    """
+    Analyze a stream of newline-delimited JSON records
+    
+    Each input line is an object with ``text`` and optional
+    ``include_suggestions``. One output line is written per non-blank input
+    line, in order: an ``EmotionAnalysisResponse`` or ``{"line", "error"}``.
+    The body is read incrementally and results are written as they are
+    produced, so a slow reader slows down consumption of the input.
+    """
+    request_id = new_id()
+    client_ip = client_request.client.host
+    
+    logger.info(
+        "Stream analysis request %s from %s", request_id, client_ip,
+        extra={"request_id": request_id, "client_ip": client_ip}
+    )
+    
+    async def results():
+        analyzed = failed = 0
+        async for lines in iter_ndjson_batches(client_request.stream(), settings.STREAM_MAX_LINE_BYTES):
+            items = [line.item for line in lines if line.item is not None]
+            analyses = iter(await _analyzer().analyze_batch_async(items, simulate_latency=False))
+            
+            output = []
+            for line in lines:
+                if line.item is not None:
+                    outcome = next(analyses)
+                    if outcome.result is not None:
+                        analyzed += 1
+                        output.append(encode_analysis_response(outcome.result) + b"\n")
+                        continue
+                    error = outcome.error
+                else:
+                    error = line.error
+                failed += 1
+                output.append(encode_ndjson({"line": line.number, "error": error}))
+            yield b"".join(output)
+        
+        logger.info(
+            "Stream request %s completed: %d analyzed, %d rejected", request_id, analyzed, failed,
+            extra={"request_id": request_id}
+        )
+    
+    return DuplexStreamingResponse(results(), media_type="application/x-ndjson")
+
+@router.websocket("/analyze/live")
+async def analyze_emotion_live(websocket: WebSocket, include_suggestions: bool = True):
+    """
+    Analyze text live as it is typed
+    
+    The client sends ``LiveEdit`` messages: its text once with ``set``, then
+    only its edits. Each edit re-matches just the edited region against the
+    lexicon, and a ``LiveUpdate`` with a full analysis is pushed whenever the
+    primary emotion or intensity changes, or on ``analyze``. Invalid messages
+    get an error update and leave the text unchanged. Connections idle for
+    LIVE_SESSION_IDLE_SECONDS are closed.
+    """
+    # Imported here so that importing the routes does not load the lexicon
+    from app.services.lexicon import get_lexicon
+    from app.services.live_session import EditError, live_sessions
+    
+    await websocket.accept()
+    session = live_sessions.open(get_lexicon(), settings.LIVE_SESSION_MAX_CHARS)
+    if session is None:
+        await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER, reason="Too many live sessions")
+        return
+    
+    session_id = new_id()
+    client_ip = websocket.client.host if websocket.client else None
+    logger.info(
+        "Live session %s opened from %s", session_id, client_ip,
+        extra={"session_id": session_id, "client_ip": client_ip}
+    )
+    
+    async def send(update: LiveUpdate) -> None:
+        await websocket.send_text(update.model_dump_json(exclude_none=True))
+    
+    # Primary emotion and intensity of the last pushed result
+    pushed = None
+    try:
+        while True:
+            try:
+                message = await asyncio.wait_for(websocket.receive_text(), settings.LIVE_SESSION_IDLE_SECONDS)
+            except asyncio.TimeoutError:
+                await websocket.close(code=status.WS_1000_NORMAL_CLOSURE, reason="Idle timeout")
+                break
+            
+            try:
+                # Reject oversized messages before parsing them
+                if len(message) > settings.LIVE_SESSION_MAX_CHARS + 1024:
+                    raise EditError(f"Text cannot exceed {settings.LIVE_SESSION_MAX_CHARS} characters")
+                edit = LiveEdit.model_validate_json(message)
+                session.refresh(get_lexicon())
+                if edit.type == "set":
+                    session.set_text(edit.text)
+                elif edit.type == "edit":
+                    session.replace(edit.start, edit.end, edit.text)
+            except EditError as e:
+                await send(LiveUpdate(type="error", length=len(session.text), detail=str(e)))
+                continue
+            except ValidationError as e:
+                error = e.errors()[0]
+                field = ".".join(map(str, error["loc"]))
+                await send(LiveUpdate(
+                    type="error",
+                    length=len(session.text),
+                    detail=f"Invalid message: {field + ': ' if field else ''}{error['msg']}"
+                ))
+                continue
+            
+            if session.crisis:
+                if pushed != "crisis":
+                    await send(LiveUpdate(type="error", length=len(session.text), detail=CRISIS_MESSAGE))
+                    pushed = "crisis"
+                continue
+            
+            state = session.primary
+            if state == pushed and edit.type != "analyze":
+                continue
+            text = session.text.strip()
+            if not text:
+                pushed = None
+                if edit.type == "analyze":
+                    await send(LiveUpdate(type="error", length=len(session.text), detail="Text cannot be empty"))
+                continue
+            # Scoring a running scan takes microseconds, so it stays on the event loop
+            result = _analyzer().analyze_scanned(text, session.scan(), include_suggestions)
+            await send(LiveUpdate(type="result", length=len(session.text), result=result))
+            pushed = state
+    
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.error("Unexpected error in live session %s: %s", session_id, e, extra={"session_id": session_id})
+        await websocket.close(code=status.WS_1011_INTERNAL_ERROR)
+    finally:
+        live_sessions.close(session)
+        logger.info("Live session %s closed", session_id, extra={"session_id": session_id})
+
+# Pre-encoded bodies of the read-mostly endpoints
+_stats_snapshot = RefreshingSnapshot(settings.STATS_SNAPSHOT_INTERVAL)
+_liveness_snapshot = RefreshingSnapshot()
+_readiness_snapshot = RefreshingSnapshot()
+
+# Clients may keep these but must revalidate them; an unchanged snapshot costs a 304
+_REVALIDATE = "no-cache"
+# The supported emotions only change with a deployment
+_EMOTIONS_CACHE_CONTROL = "public, max-age=3600"
+
+@router.get("/stats", response_model=Union[EmotionWindowStats, EmotionStats])
+async def get_emotion_stats(
+    client_request: Request,
+    window: Optional[str] = Query(
+        None,
+        pattern=r"^[1-9][0-9]*[smh]$",
+        description="Trailing window such as 1m, 5m or 1h"
+    )
+):
     """
     Get emotion analysis statistics
     
     Returns statistics about the emotion analysis service including
     total analyses performed and most common emotions detected.
+    With ``window``, returns processing-time percentiles, request rate and
+    the emotion distribution for that trailing window instead.
+    
+    Overall statistics carry an ETag and are refreshed at most once per
+    STATS_SNAPSHOT_INTERVAL seconds, and only after new analyses.
     """
+    window_seconds = None
+    if window is not None:
+        from app.services.stats import parse_window
+        window_seconds = parse_window(window)
+        if window_seconds > settings.STATS_WINDOW_MAX_SECONDS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Window cannot exceed {settings.STATS_WINDOW_MAX_SECONDS} seconds"
+            )
+    
     try:
-        stats = emotion_analyzer.get_stats()
+        if window_seconds is None and settings.FAST_RESPONSES:
+            analyzer = _analyzer()
+            snapshot = _stats_snapshot.get(
+                lambda: (analyzer.analysis_count, analyzer.lexicon.version),
+                lambda: analyzer.get_stats().model_dump_json().encode("utf-8")
+            )
+            return snapshot_response(snapshot, client_request.headers.get("if-none-match"), _REVALIDATE)
+        if window_seconds is not None:
+            stats = _analyzer().get_window_stats(window_seconds, window)
+        else:
+            stats = _analyzer().get_stats()
         logger.info("Emotion stats retrieved successfully")
+        if settings.FAST_RESPONSES:
+            return json_response(stats.model_dump_json().encode("utf-8"))
         return stats
     except Exception as e:
-        logger.error(f"Error retrieving stats: {str(e)}")
+        logger.error("Error retrieving stats: %s", e)
         raise HTTPException(
             status_code=500,
             detail="Failed to retrieve emotion analysis statistics"
         )
 
+@router.get("/stats/cache", response_model=CacheStats)
+async def get_cache_stats():
+    """
+    Get result cache statistics
+    
+    Returns hit, miss and eviction counters of the result cache used in
+    deterministic mode.
+    """
+    try:
+        return _analyzer().get_cache_stats()
+    except Exception as e:
+        logger.error("Error retrieving cache stats: %s", e)
+        raise HTTPException(
+            status_code=500,
+            detail="Failed to retrieve cache statistics"
+        )
+
+@router.get("/stats/batching", response_model=MicroBatchStats)
+async def get_micro_batch_stats():
+    """
+    Get micro-batching statistics
+    
+    Returns queue depth, the batch-size histogram and the queuing delay added
+    by batching concurrent /analyze requests.
+    """
+    try:
+        return _analyzer().get_micro_batch_stats()
+    except Exception as e:
+        logger.error("Error retrieving micro-batch stats: %s", e)
+        raise HTTPException(
+            status_code=500,
+            detail="Failed to retrieve micro-batch statistics"
+        )
+
+@router.get("/stats/coalescing", response_model=SingleFlightStats)
+async def get_single_flight_stats():
+    """
+    Get single-flight coalescing statistics
+    
+    Returns how many analyses ran and how many identical concurrent /analyze
+    requests were answered by another request's in-flight analysis.
+    """
+    try:
+        return _analyzer().get_single_flight_stats()
+    except Exception as e:
+        logger.error("Error retrieving coalescing stats: %s", e)
+        raise HTTPException(
+            status_code=500,
+            detail="Failed to retrieve coalescing statistics"
+        )
+
+@router.get("/stats/admission", response_model=AdmissionStats)
+async def get_admission_stats():
+    """
+    Get admission control statistics
+    
+    Returns admitted and shed request counters, current in-flight requests and
+    the number of clients tracked by the rate limiter.
+    """
+    try:
+        return admission_controller.stats()
+    except Exception as e:
+        logger.error("Error retrieving admission stats: %s", e)
+        raise HTTPException(
+            status_code=500,
+            detail="Failed to retrieve admission statistics"
+        )
+
+def _health(status: str, message: str) -> HealthCheckResponse:
+    uptime = datetime.now() - service_start_time
+    uptime_str = str(uptime).split('.')[0]  # Remove microseconds
+    
+    return HealthCheckResponse(
+        status=status,
+        message=message,
+        timestamp=datetime.now().isoformat(),
+        version=settings.VERSION,
+        uptime=uptime_str,
+        environment=settings.ENVIRONMENT,
+        ready=warmup.ready,
+        warmup=warmup.state
+    )
+
+def _health_key():
+    # Timestamp and uptime have a resolution of one second
+    return int(time.time()), warmup.state
+
 @router.get("/health", response_model=HealthCheckResponse)
-async def health_check():
+async def health_check(client_request: Request):
     """
     Health check endpoint
     
     Returns the current health status of the emotion analysis service.
+    This is a liveness check: it succeeds as soon as the process serves
+    requests, whether or not the warm-up has finished.
     """
     try:
-        uptime = datetime.now() - service_start_time
-        uptime_str = str(uptime).split('.')[0]  # Remove microseconds
-        
-        return HealthCheckResponse(
-            status="healthy",
-            message="Emotion analysis service is running normally",
-            timestamp=datetime.now().isoformat(),
-            version=settings.VERSION,
-            uptime=uptime_str,
-            environment=settings.ENVIRONMENT
-        )
+        if settings.FAST_RESPONSES:
+            snapshot = _liveness_snapshot.get(
+                _health_key,
+                lambda: _health("healthy", "Emotion analysis service is running normally").model_dump_json().encode("utf-8")
+            )
+            return snapshot_response(snapshot, client_request.headers.get("if-none-match"), _REVALIDATE)
+        return _health("healthy", "Emotion analysis service is running normally")
     except Exception as e:
-        logger.error(f"Health check failed: {str(e)}")
+        logger.error("Health check failed: %s", e)
         raise HTTPException(
             status_code=500,
             detail="Health check failed"
         )
 
+@router.get(
+    "/health/ready",
+    response_model=HealthCheckResponse,
+    responses={503: {"model": HealthCheckResponse, "description": "Warm-up has not finished"}}
+)
+async def readiness_check(client_request: Request):
+    """
+    Readiness check endpoint
+    
+    Returns 200 once the analyzer and lexicon are built and warmed up, and
+    503 until then, so load balancers only route traffic to warm instances.
+    """
+    try:
+        if settings.FAST_RESPONSES:
+            snapshot = _readiness_snapshot.get(_health_key, lambda: (
+                _health("ready", "Emotion analysis service is ready") if warmup.ready
+                else _health("starting", f"Warm-up state: {warmup.state}")
+            ).model_dump_json().encode("utf-8"))
+            return snapshot_response(
+                snapshot,
+                client_request.headers.get("if-none-match"),
+                _REVALIDATE,
+                status_code=200 if warmup.ready else 503
+            )
+        if warmup.ready:
+            return _health("ready", "Emotion analysis service is ready")
+        health = _health("starting", f"Warm-up state: {warmup.state}")
+        return JSONResponse(status_code=503, content=health.model_dump())
+    except Exception as e:
+        logger.error("Readiness check failed: %s", e)
+        raise HTTPException(
+            status_code=500,
+            detail="Readiness check failed"
+        )
+
 @router.get("/emotions", response_model=list)
-async def get_supported_emotions():
+async def get_supported_emotions(client_request: Request):
     """
     Get list of supported emotions
     
     Returns a list of all emotions that the service can detect.
     """
     try:
-        from app.models.emotion import EmotionType
+        if settings.FAST_RESPONSES:
+            return snapshot_response(
+                SUPPORTED_EMOTIONS_SNAPSHOT,
+                client_request.headers.get("if-none-match"),
+                _EMOTIONS_CACHE_CONTROL
+            )
         emotions = [emotion.value for emotion in EmotionType]
         return emotions
     except Exception as e:
-        logger.error(f"Error retrieving supported emotions: {str(e)}")
+        logger.error("Error retrieving supported emotions: %s", e)
         raise HTTPException(
             status_code=500,
             detail="Failed to retrieve supported emotions"
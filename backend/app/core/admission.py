@@ -0,0 +1,184 @@
+# backend/app/core/admission.py
+"""
+Admission control: per-client rate limiting plus a global concurrency cap.
+
+Runs as plain ASGI middleware, so over-limit requests are answered before the
+body is read, routed or validated. Each client gets a token bucket refilled
+at ``requests / period``; buckets live in sharded LRU maps and are dropped
+once idle long enough to have refilled, which loses no state, so memory is
+bounded by the number of recently active clients.
+"""
+import json
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Iterable, List, Optional, Tuple
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import settings
+from app.models.emotion import AdmissionStats
+
+
+class TokenBucketLimiter:
+    """Sharded per-key token buckets with idle eviction"""
+
+    def __init__(
+        self,
+        requests: int,
+        period: float,
+        shards: int = 16,
+        max_keys: int = 100000,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.capacity = float(requests)
+        self.rate = requests / period
+        # A bucket idle this long is full again, the same as a new one
+        self.idle_seconds = period
+        self.max_keys_per_shard = max(1, max_keys // shards)
+        self._clock = clock
+        self._shards: List[Tuple[threading.Lock, "OrderedDict[str, List[float]]"]] = [
+            (threading.Lock(), OrderedDict()) for _ in range(shards)
+        ]
+
+    def __len__(self) -> int:
+        return sum(len(buckets) for _, buckets in self._shards)
+
+    def acquire(self, key: str) -> float:
+        """Take one token for ``key``; returns 0 if allowed, else seconds until a token frees up."""
+        now = self._clock()
+        lock, buckets = self._shards[hash(key) % len(self._shards)]
+        with lock:
+            bucket = buckets.pop(key, None)
+            if bucket is None:
+                bucket = [self.capacity, now]
+            else:
+                bucket[0] = min(self.capacity, bucket[0] + (now - bucket[1]) * self.rate)
+                bucket[1] = now
+            buckets[key] = bucket
+
+            # Least recently used buckets sit at the front
+            while buckets:
+                oldest_key, oldest = next(iter(buckets.items()))
+                if now - oldest[1] < self.idle_seconds and len(buckets) <= self.max_keys_per_shard:
+                    break
+                del buckets[oldest_key]
+
+            if bucket[0] >= 1.0:
+                bucket[0] -= 1.0
+                return 0.0
+            return (1.0 - bucket[0]) / self.rate
+
+
+class AdmissionController:
+    """Rate limiter, in-flight counter and admit/shed counters"""
+
+    def __init__(self, limiter: Optional[TokenBucketLimiter], max_concurrent: int):
+        self.limiter = limiter
+        self.max_concurrent = max_concurrent
+        self.in_flight = 0
+        self.admitted = 0
+        self.shed_rate_limited = 0
+        self.shed_overloaded = 0
+
+    def admit(self, client: str) -> Optional[Tuple[int, int]]:
+        """``None`` if the request may proceed, else ``(status, retry_after_seconds)``."""
+        if self.max_concurrent and self.in_flight >= self.max_concurrent:
+            self.shed_overloaded += 1
+            return 503, 1
+        if self.limiter is not None:
+            wait = self.limiter.acquire(client)
+            if wait:
+                self.shed_rate_limited += 1
+                return 429, max(1, math.ceil(wait))
+        self.in_flight += 1
+        self.admitted += 1
+        return None
+
+    def release(self) -> None:
+        self.in_flight -= 1
+
+    def stats(self) -> AdmissionStats:
+        return AdmissionStats(
+            rate_limit_enabled=self.limiter is not None,
+            rate_limit_requests=int(self.limiter.capacity) if self.limiter else 0,
+            rate_limit_period=self.limiter.idle_seconds if self.limiter else 0.0,
+            max_concurrent=self.max_concurrent,
+            in_flight=self.in_flight,
+            tracked_clients=len(self.limiter) if self.limiter else 0,
+            admitted=self.admitted,
+            shed_rate_limited=self.shed_rate_limited,
+            shed_overloaded=self.shed_overloaded
+        )
+
+
+class AdmissionControlMiddleware:
+    """
+    Applies an ``AdmissionController`` to HTTP requests and WebSocket
+    connections for the given paths.
+
+    A WebSocket connection is admitted or rejected when it opens but does not
+    hold an in-flight slot while it stays open; live sessions are capped
+    separately.
+    """
+
+    def __init__(self, app: ASGIApp, controller: AdmissionController, paths: Iterable[str]):
+        self.app = app
+        self.controller = controller
+        self.paths = frozenset(paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] not in ("http", "websocket") or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        client = scope.get("client")
+        rejection = self.controller.admit(client[0] if client else "unknown")
+        if rejection is not None:
+            if scope["type"] == "websocket":
+                await _reject_websocket(receive, send)
+            else:
+                await _reject(send, *rejection)
+            return
+        if scope["type"] == "websocket":
+            self.controller.release()
+            await self.app(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release()
+
+
+async def _reject(send: Send, status: int, retry_after: int) -> None:
+    detail = "Rate limit exceeded" if status == 429 else "Server is overloaded, please retry"
+    body = json.dumps({"detail": detail}).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode("latin-1")),
+            (b"retry-after", str(retry_after).encode("latin-1")),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _reject_websocket(receive: Receive, send: Send) -> None:
+    # Closing before the handshake is accepted answers it with 403
+    await receive()
+    await send({"type": "websocket.close", "code": 1013})
+
+
+# Shared by the middleware and the stats endpoint
+admission_controller = AdmissionController(
+    TokenBucketLimiter(
+        settings.RATE_LIMIT_REQUESTS,
+        settings.RATE_LIMIT_PERIOD,
+        shards=settings.RATE_LIMIT_SHARDS,
+        max_keys=settings.RATE_LIMIT_MAX_CLIENTS
+    ) if settings.RATE_LIMIT_ENABLED else None,
+    max_concurrent=settings.MAX_CONCURRENT_REQUESTS
+)
@@ -1,9 +1,14 @@
 # app/core/config.py
 from pydantic_settings import BaseSettings
 from pydantic import Field, validator
+from pathlib import Path
 from typing import List
 import json
 
+from app.core.logging import parse_sample_rates
+
+APP_DIR = Path(__file__).resolve().parent.parent
+
 class Settings(BaseSettings):
     PROJECT_NAME: str = Field("Emotion Reflection API", env="PROJECT_NAME")
     VERSION: str = Field("1.0.0", env="VERSION")
@@ -22,10 +27,127 @@ class Settings(BaseSettings):
         ],
         env="ALLOWED_ORIGINS"
     )
-    RATE_LIMIT_REQUESTS: int = Field(100, env="RATE_LIMIT_REQUESTS")
-    RATE_LIMIT_PERIOD: int = Field(3600, env="RATE_LIMIT_PERIOD")
+    # Per-client token bucket on the analysis endpoints: RATE_LIMIT_REQUESTS
+    # per RATE_LIMIT_PERIOD seconds, tracking at most RATE_LIMIT_MAX_CLIENTS.
+    # Load tests turn it off with RATE_LIMIT_ENABLED=false
+    RATE_LIMIT_ENABLED: bool = Field(True, env="RATE_LIMIT_ENABLED")
+    RATE_LIMIT_REQUESTS: int = Field(120, ge=1, env="RATE_LIMIT_REQUESTS")
+    RATE_LIMIT_PERIOD: int = Field(60, ge=1, env="RATE_LIMIT_PERIOD")
+    RATE_LIMIT_SHARDS: int = Field(16, ge=1, env="RATE_LIMIT_SHARDS")
+    RATE_LIMIT_MAX_CLIENTS: int = Field(100000, ge=1, env="RATE_LIMIT_MAX_CLIENTS")
+    # In-flight analysis requests before new ones are shed with 503; 0 disables
+    MAX_CONCURRENT_REQUESTS: int = Field(256, ge=0, env="MAX_CONCURRENT_REQUESTS")
     LOG_LEVEL: str = Field("INFO", env="LOG_LEVEL")
     LOG_FILE: str = Field("app.log", env="LOG_FILE")
+    # "json" (one object per line) or "text"
+    LOG_FORMAT: str = Field("json", env="LOG_FORMAT")
+    # Fraction of per-request lines kept per level, e.g. "INFO=0.1,DEBUG=0.01";
+    # levels not listed keep every line
+    LOG_SAMPLE_RATES: str = Field("", env="LOG_SAMPLE_RATES")
+    # Records waiting for the background writer before new ones are dropped
+    LOG_QUEUE_SIZE: int = Field(10000, ge=1, env="LOG_QUEUE_SIZE")
+    # Send /analyze, /stats and /emotions responses as pre-encoded JSON
+    # instead of letting FastAPI validate and serialize them again
+    FAST_RESPONSES: bool = Field(True, env="FAST_RESPONSES")
+    # Per-stage latency histograms and request counters served at /metrics
+    METRICS_ENABLED: bool = Field(True, env="METRICS_ENABLED")
+    # Simulated model latency: "off", "fixed" (SIMULATED_LATENCY_FIXED seconds)
+    # or "uniform" (between SIMULATED_LATENCY_MIN and SIMULATED_LATENCY_MAX)
+    SIMULATED_LATENCY_MODE: str = Field("uniform", env="SIMULATED_LATENCY_MODE")
+    SIMULATED_LATENCY_FIXED: float = Field(1.0, ge=0.0, env="SIMULATED_LATENCY_FIXED")
+    SIMULATED_LATENCY_MIN: float = Field(0.8, ge=0.0, env="SIMULATED_LATENCY_MIN")
+    SIMULATED_LATENCY_MAX: float = Field(2.5, ge=0.0, env="SIMULATED_LATENCY_MAX")
+    ANALYZER_MAX_WORKERS: int = Field(4, ge=1, env="ANALYZER_MAX_WORKERS")
+    # "thread" scans texts in the API process; "process" sends lexicon scans
+    # to a pool of PROCESS_POOL_WORKERS processes (0 = one per CPU) sharing
+    # the compiled lexicon, PROCESS_POOL_CHUNK_SIZE texts per task
+    ANALYZER_BACKEND: str = Field("thread", env="ANALYZER_BACKEND")
+    PROCESS_POOL_WORKERS: int = Field(0, ge=0, env="PROCESS_POOL_WORKERS")
+    PROCESS_POOL_CHUNK_SIZE: int = Field(16, ge=1, env="PROCESS_POOL_CHUNK_SIZE")
+    BATCH_MAX_ITEMS: int = Field(5000, ge=1, env="BATCH_MAX_ITEMS")
+    STREAM_MAX_LINE_BYTES: int = Field(16384, ge=1, env="STREAM_MAX_LINE_BYTES")
+    # Long-document mode (/analyze/document): documents up to
+    # DOCUMENT_MAX_CHARS are split into chunks of at most
+    # DOCUMENT_CHUNK_MAX_CHARS, scored DOCUMENT_BATCH_SIZE chunks per task
+    DOCUMENT_MAX_CHARS: int = Field(500000, ge=1, env="DOCUMENT_MAX_CHARS")
+    DOCUMENT_CHUNK_MAX_CHARS: int = Field(1000, ge=1, env="DOCUMENT_CHUNK_MAX_CHARS")
+    DOCUMENT_BATCH_SIZE: int = Field(64, ge=1, env="DOCUMENT_BATCH_SIZE")
+    # Asynchronous jobs (/jobs), kept in SQLite at JOBS_DB_PATH. JOBS_WORKERS
+    # tasks per process analyze them JOBS_CHUNK_SIZE texts at a time. At most
+    # JOBS_MAX_QUEUED jobs may wait; finished jobs are deleted after
+    # JOBS_TTL_SECONDS. A job whose worker made no progress for
+    # JOBS_LEASE_SECONDS (it crashed or was restarted) is picked up again
+    JOBS_DB_PATH: str = Field(str(APP_DIR / "data" / "jobs.sqlite3"), env="JOBS_DB_PATH")
+    JOBS_WORKERS: int = Field(2, ge=1, env="JOBS_WORKERS")
+    JOBS_CHUNK_SIZE: int = Field(500, ge=1, env="JOBS_CHUNK_SIZE")
+    JOBS_MAX_ITEMS: int = Field(100000, ge=1, env="JOBS_MAX_ITEMS")
+    JOBS_MAX_QUEUED: int = Field(100, ge=1, env="JOBS_MAX_QUEUED")
+    JOBS_TTL_SECONDS: int = Field(86400, ge=1, env="JOBS_TTL_SECONDS")
+    JOBS_LEASE_SECONDS: float = Field(60.0, gt=0.0, env="JOBS_LEASE_SECONDS")
+    JOBS_GC_INTERVAL: float = Field(300.0, gt=0.0, env="JOBS_GC_INTERVAL")
+    # Live-typing WebSocket sessions: at most LIVE_MAX_SESSIONS per process,
+    # each holding up to LIVE_SESSION_MAX_CHARS of text, closed after
+    # LIVE_SESSION_IDLE_SECONDS without a message
+    LIVE_MAX_SESSIONS: int = Field(1000, ge=1, env="LIVE_MAX_SESSIONS")
+    LIVE_SESSION_MAX_CHARS: int = Field(20000, ge=1, env="LIVE_SESSION_MAX_CHARS")
+    LIVE_SESSION_IDLE_SECONDS: float = Field(300.0, gt=0.0, env="LIVE_SESSION_IDLE_SECONDS")
+    # Opt-in request profiling. API requests carrying an X-Admin-Token header
+    # equal to PROFILING_ADMIN_TOKEN, plus a PROFILING_SAMPLE_RATE share of
+    # all others, have their stacks sampled every PROFILING_INTERVAL seconds;
+    # the newest PROFILING_MAX_FILES profiles are kept in PROFILING_DIR. The
+    # token also guards /admin/profiles. Unset, nothing is installed
+    PROFILING_ADMIN_TOKEN: str = Field("", env="PROFILING_ADMIN_TOKEN")
+    PROFILING_SAMPLE_RATE: float = Field(0.0, ge=0.0, le=1.0, env="PROFILING_SAMPLE_RATE")
+    PROFILING_INTERVAL: float = Field(0.001, gt=0.0, env="PROFILING_INTERVAL")
+    PROFILING_DIR: str = Field(str(APP_DIR / "data" / "profiles"), env="PROFILING_DIR")
+    PROFILING_MAX_FILES: int = Field(50, ge=1, env="PROFILING_MAX_FILES")
+    # Recent (emotion, confidence) pairs kept in memory; 0 disables raw history
+    STATS_HISTORY_SIZE: int = Field(0, ge=0, env="STATS_HISTORY_SIZE")
+    # Time-windowed stats: slot width and the longest window that can be queried
+    STATS_WINDOW_SLOT_SECONDS: int = Field(5, ge=1, env="STATS_WINDOW_SLOT_SECONDS")
+    STATS_WINDOW_MAX_SECONDS: int = Field(3600, ge=1, env="STATS_WINDOW_MAX_SECONDS")
+    # /stats is served from a snapshot, rebuilt when new analyses were
+    # recorded but checked at most once per STATS_SNAPSHOT_INTERVAL seconds;
+    # 0 rebuilds it on every request after a write
+    STATS_SNAPSHOT_INTERVAL: float = Field(1.0, ge=0.0, env="STATS_SNAPSHOT_INTERVAL")
+    # "local" keeps stats per worker process; "shared" merges them across all
+    # workers of a server through a memory-mapped file, by default in
+    # /dev/shm. Set STATS_SHARED_PATH to a file on disk to keep them across
+    # restarts; it holds one row per worker, up to STATS_SHARED_MAX_WORKERS
+    STATS_BACKEND: str = Field("local", env="STATS_BACKEND")
+    STATS_SHARED_PATH: str = Field("", env="STATS_SHARED_PATH")
+    STATS_SHARED_MAX_WORKERS: int = Field(32, ge=1, env="STATS_SHARED_MAX_WORKERS")
+    # Seed randomness from the text so identical texts get identical results,
+    # which also enables the result cache
+    DETERMINISTIC_ANALYSIS: bool = Field(False, env="DETERMINISTIC_ANALYSIS")
+    RESULT_CACHE_MAX_ENTRIES: int = Field(10000, ge=0, env="RESULT_CACHE_MAX_ENTRIES")
+    RESULT_CACHE_TTL: float = Field(300.0, gt=0.0, env="RESULT_CACHE_TTL")
+    # Concurrent /analyze requests with the same normalized text and options
+    # share one analysis (and one simulated delay); each still gets its own
+    # analysis id and timestamp and is counted in stats
+    SINGLE_FLIGHT_ENABLED: bool = Field(True, env="SINGLE_FLIGHT_ENABLED")
+    # Concurrent /analyze requests are scored together once this many are
+    # queued or the first one has waited MICRO_BATCH_MAX_WAIT_MS
+    MICRO_BATCH_ENABLED: bool = Field(True, env="MICRO_BATCH_ENABLED")
+    MICRO_BATCH_MAX_SIZE: int = Field(64, ge=1, env="MICRO_BATCH_MAX_SIZE")
+    MICRO_BATCH_MAX_WAIT_MS: float = Field(2.0, ge=0.0, env="MICRO_BATCH_MAX_WAIT_MS")
+    # Lexicon file (JSON or TOML), directory for its compiled snapshots ("" to
+    # disable) and how often to check the file for changes (0 to disable)
+    LEXICON_PATH: str = Field(str(APP_DIR / "data" / "lexicon.json"), env="LEXICON_PATH")
+    LEXICON_SNAPSHOT_DIR: str = Field(str(APP_DIR / "data" / "snapshots"), env="LEXICON_SNAPSHOT_DIR")
+    LEXICON_RELOAD_INTERVAL: float = Field(2.0, ge=0.0, env="LEXICON_RELOAD_INTERVAL")
+    # NumPy classifier used when a request sets use_real_model
+    MODEL_WEIGHTS_PATH: str = Field(
+        str(APP_DIR / "data" / "emotion_classifier.npy"),
+        env="MODEL_WEIGHTS_PATH"
+    )
+    MODEL_FEATURES: int = Field(65536, ge=16, env="MODEL_FEATURES")
+    MODEL_SECONDARY_THRESHOLD: float = Field(0.15, ge=0.0, le=1.0, env="MODEL_SECONDARY_THRESHOLD")
+    # Build the analyzer and lexicon in the background after startup, so the
+    # first request does not pay for it; /health/ready reports when it is done.
+    # WARMUP_CLASSIFIER also loads the model weights up front
+    WARMUP_ON_STARTUP: bool = Field(True, env="WARMUP_ON_STARTUP")
+    WARMUP_CLASSIFIER: bool = Field(False, env="WARMUP_CLASSIFIER")
 
     @validator("ALLOWED_ORIGINS", pre=True)
     def assemble_cors_origins(cls, v):
@@ -47,6 +169,39 @@ class Settings(BaseSettings):
             raise ValueError(f"LOG_LEVEL must be one of: {valid_levels}")
         return v.upper()
 
+    @validator("LOG_FORMAT")
+    def validate_log_format(cls, v):
+        valid_formats = ["json", "text"]
+        if v.lower() not in valid_formats:
+            raise ValueError(f"LOG_FORMAT must be one of: {valid_formats}")
+        return v.lower()
+
+    @validator("LOG_SAMPLE_RATES")
+    def validate_log_sample_rates(cls, v):
+        parse_sample_rates(v)
+        return v
+
+    @validator("SIMULATED_LATENCY_MODE")
+    def validate_latency_mode(cls, v):
+        valid_modes = ["off", "fixed", "uniform"]
+        if v.lower() not in valid_modes:
+            raise ValueError(f"SIMULATED_LATENCY_MODE must be one of: {valid_modes}")
+        return v.lower()
+
+    @validator("STATS_BACKEND")
+    def validate_stats_backend(cls, v):
+        valid_backends = ["local", "shared"]
+        if v.lower() not in valid_backends:
+            raise ValueError(f"STATS_BACKEND must be one of: {valid_backends}")
+        return v.lower()
+
+    @validator("ANALYZER_BACKEND")
+    def validate_analyzer_backend(cls, v):
+        valid_backends = ["thread", "process"]
+        if v.lower() not in valid_backends:
+            raise ValueError(f"ANALYZER_BACKEND must be one of: {valid_backends}")
+        return v.lower()
+
     class Config:
         env_file = ".env"
         case_sensitive = True
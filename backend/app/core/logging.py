@@ -1,51 +1,245 @@
+# backend/app/core/logging.py
+"""
+Logging setup: records are queued by the calling thread and formatted and
+written in batches by a background ``QueueListener``, so slow consoles or
+disks never stall a request. Output is one JSON object per line by default.
+
+Per-request lines opt into sampling with ``extra={"sampled": True, ...}``;
+``LOG_SAMPLE_RATES`` decides what fraction of them is kept at each level.
+Other keys passed in ``extra`` become fields of the JSON record.
+"""
+import atexit
+import json
 import logging
+import queue
+import random
 import sys
-from datetime import datetime
-from typing import Optional
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, List, Optional
 from pathlib import Path
 
+# Attributes every LogRecord has; anything else came from ``extra``
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "sampled"}
+
+_listener: Optional[QueueListener] = None
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per record, including fields passed through ``extra``"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps a ``rates[level]`` fraction of records logged with ``sampled=True``"""
+
+    def __init__(self, rates: Dict[int, float]):
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not getattr(record, "sampled", False):
+            return True
+        rate = self.rates.get(record.levelno, 1.0)
+        return rate >= 1.0 or random.random() < rate
+
+
+class BackgroundQueueHandler(QueueHandler):
+    """
+    Enqueues records without formatting them first.
+
+    The stock ``QueueHandler.prepare`` formats the message in the caller's
+    thread so records can be pickled; this queue stays in-process, so that
+    work is left to the listener. Records are dropped, and counted, when the
+    queue is full rather than blocking the caller.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class BatchingQueueListener(QueueListener):
+    """
+    Drains the queue in batches and writes each handler's lines with one flush.
+
+    Waking once per record would make the writer thread compete with request
+    handling for the GIL on every log call; instead it waits ``interval``
+    after the first record of a batch and takes everything queued by then.
+    """
+
+    def __init__(self, log_queue: queue.Queue, *handlers: logging.Handler, interval: float = 0.05):
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self.interval = interval
+
+    def _monitor(self) -> None:
+        while True:
+            records = [self.queue.get()]
+            if self.interval:
+                time.sleep(self.interval)
+            while True:
+                try:
+                    records.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            stopping = self._sentinel in records
+            self.handle_batch([record for record in records if record is not self._sentinel])
+            if stopping:
+                return
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """
+        Write what is queued and stop the thread.
+
+        The queue may be full, which is exactly when records are being
+        dropped, so the sentinel waits for room while the thread drains it;
+        a writer stuck for ``timeout`` is left behind (it is a daemon thread).
+        """
+        try:
+            self.queue.put(self._sentinel, timeout=timeout)
+        except queue.Full:
+            pass
+        else:
+            self._thread.join(timeout)
+        self._thread = None
+
+    def handle_batch(self, records: List[logging.LogRecord]) -> None:
+        for handler in self.handlers:
+            selected = [record for record in records if record.levelno >= handler.level]
+            stream = getattr(handler, "stream", None)
+            if stream is None:
+                for record in selected:
+                    handler.handle(record)
+                continue
+            lines = []
+            for record in selected:
+                try:
+                    if handler.filter(record):
+                        lines.append(handler.format(record))
+                except Exception:
+                    handler.handleError(record)
+            if lines:
+                with handler.lock:
+                    stream.write(handler.terminator.join(lines) + handler.terminator)
+                    handler.flush()
+
+
+def parse_sample_rates(spec: str) -> Dict[int, float]:
+    """Parse ``"INFO=0.1,DEBUG=0.01"`` into ``{logging.INFO: 0.1, logging.DEBUG: 0.01}``."""
+    rates = {}
+    for part in spec.split(","):
+        if not part.strip():
+            continue
+        name, _, rate = part.partition("=")
+        level = logging.getLevelName(name.strip().upper())
+        if not isinstance(level, int):
+            raise ValueError(f"Unknown log level in sample rates: {name.strip()}")
+        value = float(rate)
+        if not 0.0 <= value <= 1.0:
+            raise ValueError(f"Sample rate for {name.strip()} must be between 0 and 1")
+        rates[level] = value
+    return rates
+
+
 def setup_logging(
-    name: str = "emotion-api",
+    name: str = "app",
     level: str = "INFO",
     log_file: Optional[str] = None,
-    debug: bool = False
+    debug: bool = False,
+    console: bool = True,
+    log_format: str = "json",
+    sample_rates: Optional[Dict[int, float]] = None,
+    queue_size: int = 10000
 ) -> logging.Logger:
     """
     Setup comprehensive logging configuration
+
+    Replaces any earlier configuration, stopping its listener first.
     """
-    
+    global _listener
+    stop_logging()
+
     # Create formatter
-    formatter = logging.Formatter(
-        fmt="%(asctime)s - %(name)s - %(levelname)s - %(funcName)s:%(lineno)d - %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S"
-    )
-    
-    # Create logger
-    logger = logging.getLogger(name)
-    logger.setLevel(getattr(logging, level.upper()))
-    
-    # Clear existing handlers
-    logger.handlers.clear()
-    
+    if log_format == "json":
+        formatter = JSONFormatter()
+    else:
+        formatter = logging.Formatter(
+            fmt="%(asctime)s - %(name)s - %(levelname)s - %(funcName)s:%(lineno)d - %(message)s",
+            datefmt="%Y-%m-%d %H:%M:%S"
+        )
+
+    handlers = []
+
     # Console handler
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
-    
+    if console:
+        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler.setFormatter(formatter)
+        handlers.append(console_handler)
+
     # File handler (only in production)
     if log_file and not debug:
         log_path = Path(log_file)
         log_path.parent.mkdir(parents=True, exist_ok=True)
-        
+
         file_handler = logging.FileHandler(log_path)
         file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
-    
+        handlers.append(file_handler)
+
+    # Callers only enqueue; the listener thread formats and writes
+    log_queue = queue.Queue(maxsize=queue_size)
+    queue_handler = BackgroundQueueHandler(log_queue)
+    if sample_rates:
+        queue_handler.addFilter(SamplingFilter(sample_rates))
+    _listener = BatchingQueueListener(log_queue, *handlers)
+    _listener.start()
+
+    # Create logger
+    logger = logging.getLogger(name)
+    logger.setLevel(getattr(logging, level.upper()))
+
+    # Clear existing handlers
+    logger.handlers.clear()
+    logger.addHandler(queue_handler)
+
     # Prevent duplicate logs
     logger.propagate = False
-    
+
     return logger
 
+
+def stop_logging() -> None:
+    """Flush queued records and stop the background writer."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(stop_logging)
+
+
 def get_logger(name: str) -> logging.Logger:
     """Get a logger instance"""
-    return logging.getLogger(name)
\ No newline at end of file
+    return logging.getLogger(name)
@@ -0,0 +1,280 @@
+# backend/app/core/metrics.py
+"""
+Request and pipeline-stage metrics in the Prometheus text format.
+
+Histograms keep one bucket array per thread, so ``observe`` is a bisect and
+two list updates on memory no other thread writes; shards are only summed
+when ``/metrics`` is scraped. In-flight and per-status counters are updated
+from the event loop by ``MetricsMiddleware``.
+
+``InstrumentedRoute`` splits each endpoint call into ``parse`` (reading and
+validating the body, which for /analyze includes the lexicon scan) and
+``serialize`` (validating and rendering the response) around the endpoint
+body itself.
+"""
+import functools
+import inspect
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from fastapi.routing import APIRoute
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+# Upper bounds in seconds; stages run from microseconds up to the simulated
+# model latency
+DEFAULT_BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Histogram:
+    """Cumulative-bucket histogram with per-thread shards"""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.upper_bounds = tuple(buckets)
+        self._local = threading.local()
+        self._shards: List[List[float]] = []
+        self._lock = threading.Lock()
+
+    def _shard(self) -> List[float]:
+        try:
+            return self._local.shard
+        except AttributeError:
+            # One count per bucket plus +Inf, then the running sum
+            shard = [0] * (len(self.upper_bounds) + 1) + [0.0]
+            with self._lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+            return shard
+
+    def observe(self, value: float, count: int = 1) -> None:
+        """Record ``count`` observations of ``value`` seconds."""
+        shard = self._shard()
+        shard[bisect_left(self.upper_bounds, value)] += count
+        shard[-1] += value * count
+
+    def snapshot(self) -> Tuple[List[int], float]:
+        """Per-bucket counts (not cumulative) and the sum over all threads."""
+        with self._lock:
+            shards = list(self._shards)
+        counts = [0] * (len(self.upper_bounds) + 1)
+        total = 0.0
+        for shard in shards:
+            for i in range(len(counts)):
+                counts[i] += shard[i]
+            total += shard[-1]
+        return counts, total
+
+
+class _StageTimer:
+    """Context manager recording its duration into one histogram"""
+
+    __slots__ = ("histogram", "started")
+
+    def __init__(self, histogram: Optional[Histogram]):
+        self.histogram = histogram
+
+    def __enter__(self) -> "_StageTimer":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if self.histogram is not None:
+            self.histogram.observe(time.perf_counter() - self.started)
+
+
+class Metrics:
+    """Registry of the API's histograms and counters"""
+
+    def __init__(self, enabled: bool = True, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.enabled = enabled
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        # Analysis pipeline stages, by stage name
+        self.stage_seconds: Dict[str, Histogram] = {}
+        # Endpoint parse/serialize time, by (route, stage)
+        self.request_stage_seconds: Dict[Tuple[str, str], Histogram] = {}
+        self.in_flight = 0
+        self.responses: Dict[Tuple[str, int], int] = {}
+
+    def _histogram(self, histograms: Dict, key) -> Histogram:
+        histogram = histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = histograms.setdefault(key, Histogram(self.buckets))
+        return histogram
+
+    def observe_stage(self, stage: str, seconds: float, count: int = 1) -> None:
+        """Record ``count`` analyses that each spent ``seconds`` in ``stage``."""
+        if self.enabled and count:
+            self._histogram(self.stage_seconds, stage).observe(seconds, count)
+
+    def stage(self, stage: str) -> _StageTimer:
+        """``with metrics.stage("suggestions"): ...`` times the block."""
+        return _StageTimer(self._histogram(self.stage_seconds, stage) if self.enabled else None)
+
+    def observe_request_stage(self, route: str, stage: str, seconds: float) -> None:
+        if self.enabled:
+            self._histogram(self.request_stage_seconds, (route, stage)).observe(seconds)
+
+    def count_response(self, method: str, status: int) -> None:
+        key = (method, status)
+        self.responses[key] = self.responses.get(key, 0) + 1
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        with self._lock:
+            stages = {(stage,): histogram for stage, histogram in self.stage_seconds.items()}
+            request_stages = dict(self.request_stage_seconds)
+        lines: List[str] = []
+        lines += _render_histograms(
+            "emotion_analysis_stage_seconds",
+            "Time spent in each analysis pipeline stage, per analysis",
+            ("stage",),
+            stages
+        )
+        lines += _render_histograms(
+            "emotion_request_stage_seconds",
+            "Time spent parsing requests and serializing responses, per endpoint",
+            ("route", "stage"),
+            request_stages
+        )
+        lines += [
+            "# HELP emotion_http_requests_in_flight HTTP requests currently being served",
+            "# TYPE emotion_http_requests_in_flight gauge",
+            f"emotion_http_requests_in_flight {self.in_flight}",
+            "# HELP emotion_http_responses_total HTTP responses sent, by method and status code",
+            "# TYPE emotion_http_responses_total counter",
+        ]
+        for (method, status), count in sorted(self.responses.items()):
+            lines.append(f'emotion_http_responses_total{{method="{method}",status="{status}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+
+def _render_histograms(
+    name: str,
+    help_text: str,
+    label_names: Tuple[str, ...],
+    histograms: Dict[Tuple[str, ...], Histogram]
+) -> List[str]:
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+    for label_values, histogram in sorted(histograms.items()):
+        labels = ",".join(f'{key}="{_escape(value)}"' for key, value in zip(label_names, label_values))
+        counts, total = histogram.snapshot()
+        cumulative = 0
+        for bound, count in zip(histogram.upper_bounds + (float("inf"),), counts):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(f'{name}_bucket{{{labels},le="{le}"}} {cumulative}')
+        lines.append(f"{name}_sum{{{labels}}} {total!r}")
+        lines.append(f"{name}_count{{{labels}}} {cumulative}")
+    return lines
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class _EndpointTimes:
+    __slots__ = ("started", "finished")
+
+    def __init__(self):
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+
+
+_endpoint_times: ContextVar[Optional[_EndpointTimes]] = ContextVar("endpoint_times", default=None)
+
+
+def _timed_endpoint(endpoint: Callable) -> Callable:
+    """Wrap an async endpoint to note when its body starts and ends."""
+
+    @functools.wraps(endpoint)
+    async def timed(*args, **kwargs):
+        times = _endpoint_times.get()
+        if times is not None:
+            times.started = time.perf_counter()
+        try:
+            return await endpoint(*args, **kwargs)
+        finally:
+            if times is not None:
+                times.finished = time.perf_counter()
+
+    timed.timed_endpoint = True
+    return timed
+
+
+class InstrumentedRoute(APIRoute):
+    """``APIRoute`` that records parse and serialize time into ``metrics``"""
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        # Sync endpoints run in a thread pool, where the marks would not be
+        # seen; routes copied by include_router are already wrapped
+        if inspect.iscoroutinefunction(endpoint) and not getattr(endpoint, "timed_endpoint", False):
+            endpoint = _timed_endpoint(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+    def get_route_handler(self) -> Callable[[Request], Response]:
+        handler = super().get_route_handler()
+        route = self.path_format
+
+        async def instrumented_handler(request: Request) -> Response:
+            if not metrics.enabled:
+                return await handler(request)
+            times = _EndpointTimes()
+            token = _endpoint_times.set(times)
+            received = time.perf_counter()
+            try:
+                response = await handler(request)
+            finally:
+                _endpoint_times.reset(token)
+            if times.started is not None:
+                metrics.observe_request_stage(route, "parse", times.started - received)
+            if times.finished is not None:
+                metrics.observe_request_stage(route, "serialize", time.perf_counter() - times.finished)
+            return response
+
+        return instrumented_handler
+
+
+class MetricsMiddleware:
+    """Counts in-flight HTTP requests and responses by status code"""
+
+    def __init__(self, app: ASGIApp, registry: "Metrics"):
+        self.app = app
+        self.metrics = registry
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.metrics.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        self.metrics.in_flight += 1
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            self.metrics.in_flight -= 1
+            self.metrics.count_response(scope["method"], status)
+
+
+# Shared by the routes, the analyzer and the /metrics endpoint
+metrics = Metrics(enabled=settings.METRICS_ENABLED)
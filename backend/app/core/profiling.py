@@ -0,0 +1,276 @@
+# backend/app/core/profiling.py
+"""
+Opt-in per-request profiling with collapsed-stack dumps.
+
+A profiled request runs with a sampler thread that records the Python stacks
+of every busy thread in the process every ``interval`` seconds, so the work
+the analyzer does on its executor threads is seen as well as the event loop.
+Idle threads (waiting on a lock, a queue or ``select``) are skipped. Stacks
+are written as ``thread;outer;...;inner count`` lines, the collapsed format
+read by flamegraph.pl and speedscope, to a directory that keeps only the
+newest ``max_files`` profiles. Scans sent to the process pool backend run in
+other processes and are not sampled.
+
+One request is profiled at a time, and the samples include whatever else
+the process did meanwhile. ``ProfilingMiddleware`` is only installed when
+profiling is configured, so it costs nothing otherwise.
+"""
+import hmac
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.models.emotion import ProfileSummary
+
+logger = get_logger(__name__)
+
+PROFILE_SUFFIX = ".collapsed"
+# Carries PROFILING_ADMIN_TOKEN on admin and profiled requests
+ADMIN_TOKEN_HEADER = "X-Admin-Token"
+# Set on profiled responses to the id the profile is stored under
+PROFILE_ID_HEADER = "X-Profile-Id"
+_admin_header = ADMIN_TOKEN_HEADER.lower().encode("latin-1")
+_profile_id_header = PROFILE_ID_HEADER.lower().encode("latin-1")
+
+# Innermost frames of threads that are blocked, by function name
+_IDLE_FRAMES = {
+    "wait": "threading.py",
+    "select": "selectors.py",
+    # ThreadPoolExecutor worker waiting for its next work item
+    "_worker": os.path.join("concurrent", "futures", "thread.py"),
+}
+
+
+def _frame_label(code, labels: Dict) -> str:
+    label = labels.get(code)
+    if label is None:
+        # co_qualname is new in Python 3.11
+        name = getattr(code, "co_qualname", code.co_name)
+        label = f"{name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+        labels[code] = label
+    return label
+
+
+class StackSampler(threading.Thread):
+    """Samples the stacks of all other busy threads until stopped"""
+
+    def __init__(self, interval: float):
+        super().__init__(name="profile-sampler", daemon=True)
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stopping = threading.Event()
+        self._labels: Dict = {}
+
+    def run(self) -> None:
+        own = threading.get_ident()
+        try:
+            while not self._stopping.wait(self.interval):
+                self.sample(own)
+        except Exception as e:
+            # The profile is still saved, with the samples taken so far
+            logger.warning("Profile sampler stopped after %d samples: %s", self.samples, e)
+
+    def sample(self, own: int) -> None:
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            code = frame.f_code
+            if ident == own or code.co_filename.endswith(_IDLE_FRAMES.get(code.co_name, "\0")):
+                continue
+            stack: List[str] = []
+            while frame is not None:
+                stack.append(_frame_label(frame.f_code, self._labels))
+                frame = frame.f_back
+            stack.append(names.get(ident, str(ident)))
+            self.stacks[";".join(reversed(stack))] += 1
+        self.samples += 1
+
+    def stop(self) -> None:
+        self._stopping.set()
+        self.join()
+
+
+class ProfileStore:
+    """The newest ``max_files`` profiles in ``directory``"""
+
+    def __init__(self, directory: Path, max_files: int):
+        self.directory = directory
+        self.max_files = max_files
+        self._lock = threading.Lock()
+        # Request details of the profiles written by this process
+        self._summaries: "OrderedDict[str, ProfileSummary]" = OrderedDict()
+
+    def save(self, summary: ProfileSummary, stacks: Counter) -> None:
+        """Write one profile and drop the oldest beyond ``max_files``."""
+        lines = [f"{stack} {count}\n" for stack, count in stacks.most_common()]
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / (summary.profile_id + PROFILE_SUFFIX)
+        temporary = path.with_name(path.name + ".tmp")
+        temporary.write_text("".join(lines), encoding="utf-8")
+        os.replace(temporary, path)
+        with self._lock:
+            self._summaries[summary.profile_id] = summary
+            for stale in self._paths()[self.max_files:]:
+                stale.unlink(missing_ok=True)
+                self._summaries.pop(stale.name[:-len(PROFILE_SUFFIX)], None)
+
+    def _paths(self) -> List[Path]:
+        """Profile files, newest first."""
+        paths = []
+        for path in self.directory.glob("*" + PROFILE_SUFFIX):
+            try:
+                paths.append((path.stat().st_mtime, path))
+            except FileNotFoundError:
+                continue
+        return [path for _, path in sorted(paths, reverse=True)]
+
+    def list(self) -> List[ProfileSummary]:
+        """Stored profiles, newest first; those left by an earlier process only carry their id."""
+        if not self.directory.is_dir():
+            return []
+        with self._lock:
+            paths = self._paths()
+            summaries = dict(self._summaries)
+        result = []
+        for path in paths:
+            profile_id = path.name[:-len(PROFILE_SUFFIX)]
+            result.append(summaries.get(profile_id) or ProfileSummary(
+                profile_id=profile_id,
+                created=datetime.fromtimestamp(path.stat().st_mtime).isoformat()
+            ))
+        return result
+
+    def read(self, profile_id: str) -> Optional[str]:
+        """Collapsed stacks of one profile, or None if it is not (or no longer) stored."""
+        # Ids are generated here; anything else cannot name a file in the directory
+        if not profile_id.replace("-", "").isalnum():
+            return None
+        try:
+            return (self.directory / (profile_id + PROFILE_SUFFIX)).read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return None
+
+
+class RequestProfiler:
+    """Decides which requests are profiled and saves their samples"""
+
+    def __init__(
+        self,
+        store: ProfileStore,
+        admin_token: str = "",
+        sample_rate: float = 0.0,
+        interval: float = 0.001
+    ):
+        self.store = store
+        self.admin_token = admin_token.encode("latin-1")
+        self.sample_rate = sample_rate
+        self.interval = interval
+        self._active = False
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.admin_token) or self.sample_rate > 0
+
+    def is_admin(self, token: str) -> bool:
+        return bool(self.admin_token) and hmac.compare_digest(token.encode("latin-1", "replace"), self.admin_token)
+
+    def trigger(self, scope: Scope) -> Optional[str]:
+        """Why this request should be profiled ("header" or "sampled"), or None."""
+        if self._active:
+            return None
+        if self.admin_token:
+            for name, value in scope["headers"]:
+                if name == _admin_header:
+                    if hmac.compare_digest(value, self.admin_token):
+                        return "header"
+                    break
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            return "sampled"
+        return None
+
+    def start(self) -> StackSampler:
+        self._active = True
+        sampler = StackSampler(self.interval)
+        sampler.start()
+        return sampler
+
+    def finish(self, sampler: StackSampler, summary: ProfileSummary) -> None:
+        """Stop sampling and save the profile; runs in a worker thread."""
+        try:
+            sampler.stop()
+            summary.samples = sampler.samples
+            self.store.save(summary, sampler.stacks)
+        except Exception as e:
+            logger.warning("Could not save profile %s: %s", summary.profile_id, e)
+        finally:
+            self._active = False
+
+
+class ProfilingMiddleware:
+    """Profiles the requests under ``path_prefix`` that ``profiler`` picks"""
+
+    def __init__(self, app: ASGIApp, profiler: RequestProfiler, path_prefix: str = ""):
+        self.app = app
+        self.profiler = profiler
+        self.path_prefix = path_prefix
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith(self.path_prefix):
+            await self.app(scope, receive, send)
+            return
+        trigger = self.profiler.trigger(scope)
+        if trigger is None:
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        status = 500
+
+        async def send_with_profile_id(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [
+                    (_profile_id_header, profile_id.encode("latin-1"))
+                ]
+            await send(message)
+
+        created = datetime.now().isoformat()
+        sampler = self.profiler.start()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            summary = ProfileSummary(
+                profile_id=profile_id,
+                created=created,
+                method=scope["method"],
+                path=scope["path"],
+                status=status,
+                duration=time.perf_counter() - started,
+                trigger=trigger
+            )
+            # Joining the sampler and writing the file stay off the event loop
+            threading.Thread(
+                target=self.profiler.finish, args=(sampler, summary), name="profile-writer", daemon=True
+            ).start()
+
+
+# Shared by the middleware and the admin endpoints
+profiler = RequestProfiler(
+    ProfileStore(Path(settings.PROFILING_DIR), settings.PROFILING_MAX_FILES),
+    admin_token=settings.PROFILING_ADMIN_TOKEN,
+    sample_rate=settings.PROFILING_SAMPLE_RATE,
+    interval=settings.PROFILING_INTERVAL
+)
@@ -1,15 +1,35 @@
 # app/main.py
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from app.api.routes import emotion_router
+from fastapi.responses import JSONResponse, PlainTextResponse
+from app.api.routes import ANALYSIS_PATHS, admin_router, emotion_router
+from app.core.admission import AdmissionControlMiddleware, admission_controller
+from app.services.jobs import job_manager
+from app.services.lexicon_store import lexicon_watcher
+from app.services.warmup import warmup
 from app.core.config import settings
-from app.core.logging import get_logger
-import uvicorn
+from app.core.metrics import CONTENT_TYPE, MetricsMiddleware, metrics
+from app.core.profiling import ProfilingMiddleware, profiler
+from app.core.logging import get_logger, parse_sample_rates, setup_logging
 
+setup_logging(
+    "app",
+    level=settings.LOG_LEVEL,
+    log_file=settings.LOG_FILE,
+    debug=settings.DEBUG,
+    log_format=settings.LOG_FORMAT,
+    sample_rates=parse_sample_rates(settings.LOG_SAMPLE_RATES),
+    queue_size=settings.LOG_QUEUE_SIZE
+)
 logger = get_logger(__name__)
 
+def _close_analyzer() -> None:
+    # Imported here: the analyzer module is only loaded once something uses it
+    from app.services.emotion_analyzer import close_emotion_analyzer
+    close_emotion_analyzer()
+
 def create_application() -> FastAPI:
+    emotion_prefix = f"{settings.API_V1_STR}/emotion"
     app = FastAPI(
         title=settings.PROJECT_NAME,
         description="A simple emotion reflection tool API",
@@ -19,6 +39,13 @@ def create_application() -> FastAPI:
         redoc_url="/redoc" if settings.DEBUG else None,
     )
     
+    # Added before CORS so that CORS headers are also set on 429/503 responses
+    app.add_middleware(
+        AdmissionControlMiddleware,
+        controller=admission_controller,
+        paths=[emotion_prefix + path for path in ANALYSIS_PATHS]
+    )
+    
     app.add_middleware(
         CORSMiddleware,
         allow_origins=[
@@ -30,12 +57,40 @@ def create_application() -> FastAPI:
         allow_headers=["*"],
     )
     
+    # Outermost, so shed and CORS-rejected requests are counted too
+    app.add_middleware(MetricsMiddleware, registry=metrics)
+    
+    # Only installed when configured, so unprofiled deployments pay nothing
+    if profiler.enabled:
+        app.add_middleware(ProfilingMiddleware, profiler=profiler, path_prefix=settings.API_V1_STR)
+    
     app.include_router(
         emotion_router,
-        prefix="/api/v1/emotion",
+        prefix=emotion_prefix,
         tags=["emotion"]
     )
     
+    # Listing and fetching profiles needs the admin token
+    if profiler.admin_token:
+        app.include_router(admin_router, prefix="/admin", tags=["admin"])
+    
+    # Watch the lexicon file for changes while the app runs
+    app.add_event_handler("startup", lexicon_watcher.start)
+    app.add_event_handler("shutdown", lexicon_watcher.stop)
+    
+    # Build the analyzer and lexicon in the background; /health/ready turns
+    # true when done
+    app.add_event_handler("startup", warmup.start)
+    app.add_event_handler("shutdown", warmup.stop)
+    
+    # Process queued analysis jobs in the background; stopped before the
+    # analyzer they use is closed
+    app.add_event_handler("startup", job_manager.start)
+    app.add_event_handler("shutdown", job_manager.stop)
+    
+    # Release analyzer worker threads/processes and shared memory on shutdown
+    app.add_event_handler("shutdown", _close_analyzer)
+    
     @app.get("/")
     async def root():
         return {
@@ -44,9 +99,13 @@ def create_application() -> FastAPI:
             "status": "running"
         }
     
+    @app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+    async def prometheus_metrics():
+        return PlainTextResponse(metrics.render(), media_type=CONTENT_TYPE)
+    
     @app.exception_handler(Exception)
     async def global_exception_handler(request, exc):
-        logger.error(f"Global exception: {str(exc)}")
+        logger.error("Global exception: %s", exc, exc_info=exc)
         return JSONResponse(
             status_code=500,
             content={"detail": "Internal server error"}
@@ -57,6 +116,8 @@ def create_application() -> FastAPI:
 app = create_application()
 
 if __name__ == "__main__":
+    # Only needed when run directly; under an ASGI server it is already loaded
+    import uvicorn
     uvicorn.run(
         "app.main:app",
         host=settings.HOST,
@@ -3,7 +3,15 @@ from .emotion import (
     EmotionType,
     EmotionAnalysisRequest,
     EmotionAnalysisResponse,
+    EmotionBatchItem,
+    EmotionBatchRequest,
+    EmotionBatchItemResult,
+    EmotionBatchResponse,
     EmotionStats,
+    EmotionWindowStats,
+    CacheStats,
+    MicroBatchStats,
+    AdmissionStats,
     HealthCheckResponse,
     ErrorResponse,
     EmotionConfig
@@ -13,7 +21,15 @@ __all__ = [
     "EmotionType",
     "EmotionAnalysisRequest", 
     "EmotionAnalysisResponse",
+    "EmotionBatchItem",
+    "EmotionBatchRequest",
+    "EmotionBatchItemResult",
+    "EmotionBatchResponse",
     "EmotionStats",
+    "EmotionWindowStats",
+    "CacheStats",
+    "MicroBatchStats",
+    "AdmissionStats",
     "HealthCheckResponse",
     "ErrorResponse",
     "EmotionConfig"
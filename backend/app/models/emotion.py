@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field, validator
-from typing import List, Optional, Dict, Any
+from pydantic import BaseModel, Field, PrivateAttr, model_validator, validator
+from typing import List, Literal, Optional, Dict, Any
 from datetime import datetime
 from enum import Enum
 
@@ -26,6 +26,10 @@ class EmotionType(str, Enum):
     GUILTY = "Guilty"
     JEALOUS = "Jealous"
 
+CRISIS_MESSAGE = (
+    'This service is not equipped to handle crisis situations. Please contact a mental health professional.'
+)
+
 class EmotionAnalysisRequest(BaseModel):
     """Request model for emotion analysis"""
     text: str = Field(
@@ -40,21 +44,52 @@ class EmotionAnalysisRequest(BaseModel):
     )
     use_real_model: bool = Field(
         False, 
-        description="If true, use real transformer model"
+        description="If true, use the NumPy classifier instead of keyword rules"
     )
+    # Result of the single lexicon pass done during validation, reused by the analyzer
+    _lexicon_scan: Any = PrivateAttr(default=None)
+
     @validator('text')
     def validate_text(cls, v):
         if not v.strip():
             raise ValueError('Text cannot be empty or just whitespace')
-        
-        # Check for potentially harmful content
-        harmful_keywords = ['suicide', 'kill myself', 'end it all', 'hurt myself']
-        text_lower = v.lower()
-        if any(keyword in text_lower for keyword in harmful_keywords):
-            raise ValueError('This service is not equipped to handle crisis situations. Please contact a mental health professional.')
-        
         return v.strip()
 
+    @model_validator(mode='after')
+    def scan_text(self):
+        # Check for potentially harmful content in the same pass that scores emotions
+        from app.core.config import settings
+        from app.core.metrics import metrics
+        from app.services.lexicon import contains_crisis_keyword, get_lexicon
+
+        if settings.ANALYZER_BACKEND == "process":
+            # The full scan runs later in a worker process; the crisis phrases
+            # still come from the loaded lexicon, which may have been reloaded
+            crisis = contains_crisis_keyword(self.text, get_lexicon().crisis_keywords)
+        else:
+            with metrics.stage("scan"):
+                self._lexicon_scan = get_lexicon().scan(self.text)
+            crisis = self._lexicon_scan.crisis
+        if crisis:
+            raise ValueError(CRISIS_MESSAGE)
+        return self
+
+    @property
+    def lexicon_scan(self):
+        """Lexicon scan of ``text``, computed once per request"""
+        if self._lexicon_scan is None:
+            from app.services.lexicon import get_lexicon
+            self._lexicon_scan = get_lexicon().scan(self.text)
+        return self._lexicon_scan
+
+    @property
+    def is_scanned(self) -> bool:
+        return self._lexicon_scan is not None
+
+    def set_lexicon_scan(self, scan) -> None:
+        """Store a scan of ``text`` computed elsewhere, e.g. in a worker process"""
+        self._lexicon_scan = scan
+
 class EmotionAnalysisResponse(BaseModel):
     """Response model for emotion analysis"""
     emotion: str = Field(..., description="Primary detected emotion")
@@ -74,6 +109,129 @@ class EmotionAnalysisResponse(BaseModel):
     timestamp: str = Field(..., description="Analysis timestamp")
     processing_time: float = Field(..., ge=0.0, description="Processing time in seconds")
     analysis_id: str = Field(..., description="Unique analysis identifier")
+    lexicon_version: Optional[str] = Field(None, description="Version of the lexicon used")
+
+class EmotionBatchItem(BaseModel):
+    """One text in a batch analysis request.
+    
+    Items carry the same fields as ``EmotionAnalysisRequest`` but are validated
+    individually, so one invalid text is reported inline instead of failing
+    the whole batch.
+    """
+    text: str = Field(..., description="Text to analyze for emotions")
+    include_suggestions: bool = Field(
+        True, 
+        description="Whether to include suggestions in response"
+    )
+
+class EmotionBatchRequest(BaseModel):
+    """Request model for batch emotion analysis"""
+    items: List[EmotionBatchItem] = Field(
+        ..., 
+        min_length=1, 
+        description="Texts to analyze"
+    )
+
+class EmotionBatchItemResult(BaseModel):
+    """Outcome of one batch item: either a result or an error"""
+    index: int = Field(..., description="Position of the item in the request")
+    result: Optional[EmotionAnalysisResponse] = Field(None, description="Analysis result")
+    error: Optional[str] = Field(None, description="Why the item could not be analyzed")
+
+class EmotionBatchResponse(BaseModel):
+    """Response model for batch emotion analysis"""
+    results: List[EmotionBatchItemResult] = Field(..., description="Per-item results in request order")
+    succeeded: int = Field(..., description="Number of items analyzed")
+    failed: int = Field(..., description="Number of items rejected")
+    processing_time: float = Field(..., ge=0.0, description="Processing time in seconds")
+
+class EmotionJobRequest(BaseModel):
+    """Request model for an asynchronous analysis job"""
+    items: List[EmotionBatchItem] = Field(
+        ...,
+        min_length=1,
+        description="Texts to analyze, up to JOBS_MAX_ITEMS"
+    )
+
+class EmotionJobStatus(BaseModel):
+    """Progress of an asynchronous analysis job"""
+    job_id: str = Field(..., description="Job identifier")
+    status: Literal["queued", "running", "completed", "failed"] = Field(..., description="Job state")
+    total: int = Field(..., description="Number of items in the job")
+    processed: int = Field(..., description="Items analyzed or rejected so far")
+    succeeded: int = Field(..., description="Items analyzed so far")
+    failed: int = Field(..., description="Items rejected so far")
+    error: Optional[str] = Field(None, description="Why the job failed")
+    created_at: str = Field(..., description="When the job was submitted")
+    updated_at: str = Field(..., description="When the job last made progress")
+    expires_at: Optional[str] = Field(None, description="When a finished job will be deleted")
+
+class EmotionJobResponse(EmotionJobStatus):
+    """Progress of a job with one page of its results"""
+    offset: int = Field(..., description="Index of the first item in this page")
+    results: List[EmotionBatchItemResult] = Field(..., description="Results of processed items, in item order")
+    next_offset: Optional[int] = Field(None, description="Offset of the next page, if there are more items")
+
+class EmotionDocumentRequest(BaseModel):
+    """Request model for long-document analysis"""
+    text: str = Field(
+        ...,
+        min_length=1,
+        description="Document to analyze, up to DOCUMENT_MAX_CHARS characters"
+    )
+    split: Literal["sentence", "paragraph"] = Field(
+        "sentence",
+        description="Unit the document is chunked into for the timeline"
+    )
+    include_suggestions: bool = Field(
+        True,
+        description="Whether to include suggestions in the document analysis"
+    )
+
+    @validator('text')
+    def validate_text(cls, v):
+        from app.core.config import settings
+
+        if v.isspace():
+            raise ValueError('Text cannot be empty or just whitespace')
+        if len(v) > settings.DOCUMENT_MAX_CHARS:
+            raise ValueError(f'Text cannot exceed {settings.DOCUMENT_MAX_CHARS} characters')
+        return v
+
+class EmotionTimelineEntry(BaseModel):
+    """Emotion of one chunk of a document"""
+    index: int = Field(..., description="Position of the chunk in the document")
+    start: int = Field(..., description="Offset of the chunk's first character")
+    end: int = Field(..., description="Offset just past the chunk's last character")
+    emotion: str = Field(..., description="Primary emotion of the chunk")
+    confidence: float = Field(..., ge=0.0, le=1.0, description="Confidence score (0-1)")
+    emotion_intensity: str = Field(..., description="Intensity level: low, medium, high")
+
+class EmotionDocumentResponse(BaseModel):
+    """Response model for long-document analysis"""
+    analysis: EmotionAnalysisResponse = Field(..., description="Analysis of the document as a whole")
+    timeline: List[EmotionTimelineEntry] = Field(..., description="Per-chunk emotions in document order")
+    chunks: int = Field(..., description="Number of chunks analyzed")
+    processing_time: float = Field(..., ge=0.0, description="Processing time in seconds")
+
+class LiveEdit(BaseModel):
+    """Message from a live-typing client.
+    
+    ``set`` replaces the whole text, ``edit`` replaces characters ``start``
+    to ``end`` with ``text``, and ``analyze`` asks for the current result.
+    Positions count Unicode code points.
+    """
+    type: Literal["set", "edit", "analyze"] = Field(..., description="Message type")
+    start: int = Field(0, ge=0, description="First replaced character, for edit")
+    end: int = Field(0, ge=0, description="End of the replaced range (exclusive), for edit")
+    text: str = Field("", description="New text, or the inserted text for edit")
+
+class LiveUpdate(BaseModel):
+    """Message pushed to a live-typing client"""
+    type: Literal["result", "error"] = Field(..., description="Message type")
+    length: int = Field(..., description="Length of the session's text after the last edit")
+    result: Optional[EmotionAnalysisResponse] = Field(None, description="Analysis of the current text")
+    detail: Optional[str] = Field(None, description="Why the last message was rejected")
 
 class EmotionStats(BaseModel):
     """Statistics about emotion analysis"""
@@ -81,6 +239,80 @@ class EmotionStats(BaseModel):
     most_common_emotion: str = Field(..., description="Most frequently detected emotion")
     average_confidence: float = Field(..., description="Average confidence score")
     processing_time_avg: float = Field(..., description="Average processing time")
+    lexicon_version: Optional[str] = Field(None, description="Version of the lexicon currently loaded")
+
+class EmotionWindowStats(BaseModel):
+    """Statistics over a trailing time window"""
+    window: str = Field(..., description="Window length, e.g. 5m")
+    total_analyses: int = Field(..., description="Analyses completed in the window")
+    request_rate: float = Field(..., description="Analyses per second over the window")
+    processing_time_p50: float = Field(..., description="Median processing time in seconds")
+    processing_time_p90: float = Field(..., description="90th percentile processing time in seconds")
+    processing_time_p99: float = Field(..., description="99th percentile processing time in seconds")
+    emotion_distribution: Dict[str, int] = Field(
+        default_factory=dict, 
+        description="Number of analyses per detected emotion"
+    )
+    lexicon_version: Optional[str] = Field(None, description="Version of the lexicon currently loaded")
+
+class CacheStats(BaseModel):
+    """Result cache counters"""
+    enabled: bool = Field(..., description="Whether the result cache is active")
+    size: int = Field(0, description="Entries currently cached")
+    max_entries: int = Field(0, description="Maximum number of cached entries")
+    ttl_seconds: float = Field(0.0, description="Entry time-to-live in seconds")
+    hits: int = Field(0, description="Lookups served from the cache")
+    misses: int = Field(0, description="Lookups that required a fresh analysis")
+    evictions: int = Field(0, description="Entries dropped to stay within max_entries")
+    expirations: int = Field(0, description="Entries dropped after their TTL")
+
+class SingleFlightStats(BaseModel):
+    """Single-flight coalescing counters"""
+    enabled: bool = Field(..., description="Whether identical concurrent requests are coalesced")
+    in_flight: int = Field(0, description="Distinct analyses currently running")
+    computations: int = Field(0, description="Analyses run on behalf of one or more requests")
+    coalesced: int = Field(0, description="Requests answered by another request's in-flight analysis")
+
+class MicroBatchStats(BaseModel):
+    """Micro-batching scheduler counters"""
+    enabled: bool = Field(..., description="Whether /analyze requests are micro-batched")
+    max_batch_size: int = Field(0, description="Largest batch scored in one call")
+    max_wait_ms: float = Field(0.0, description="Longest time the first queued request waits for a batch to fill")
+    queue_depth: int = Field(0, description="Requests queued or being scored right now")
+    batches: int = Field(0, description="Batches scored")
+    items: int = Field(0, description="Requests scored through batches")
+    average_batch_size: float = Field(0.0, description="Mean requests per batch")
+    batch_size_histogram: Dict[str, int] = Field(
+        default_factory=dict,
+        description="Number of batches per batch-size range"
+    )
+    queue_wait_avg: float = Field(0.0, description="Mean seconds a request waited before scoring started")
+    queue_wait_p50: float = Field(0.0, description="Median queuing delay in seconds")
+    queue_wait_p90: float = Field(0.0, description="90th percentile queuing delay in seconds")
+    queue_wait_p99: float = Field(0.0, description="99th percentile queuing delay in seconds")
+
+class AdmissionStats(BaseModel):
+    """Admission control counters"""
+    rate_limit_enabled: bool = Field(..., description="Whether per-client rate limiting is active")
+    rate_limit_requests: int = Field(0, description="Requests allowed per client per period")
+    rate_limit_period: float = Field(0.0, description="Rate limit period in seconds")
+    max_concurrent: int = Field(0, description="In-flight request cap (0 = unlimited)")
+    in_flight: int = Field(0, description="Admitted requests currently being served")
+    tracked_clients: int = Field(0, description="Clients with a live token bucket")
+    admitted: int = Field(0, description="Requests admitted")
+    shed_rate_limited: int = Field(0, description="Requests rejected with 429")
+    shed_overloaded: int = Field(0, description="Requests rejected with 503")
+
+class ProfileSummary(BaseModel):
+    """A stored request profile"""
+    profile_id: str = Field(..., description="Profile identifier, also sent as X-Profile-Id")
+    created: str = Field(..., description="When the profiled request started")
+    method: Optional[str] = Field(None, description="HTTP method of the profiled request")
+    path: Optional[str] = Field(None, description="Path of the profiled request")
+    status: Optional[int] = Field(None, description="Response status code")
+    duration: Optional[float] = Field(None, description="Request duration in seconds")
+    samples: Optional[int] = Field(None, description="Stack samples taken")
+    trigger: Optional[str] = Field(None, description="header or sampled")
 
 class HealthCheckResponse(BaseModel):
     """Health check response model"""
@@ -90,6 +322,8 @@ class HealthCheckResponse(BaseModel):
     version: str = Field(..., description="API version")
     uptime: str = Field(..., description="Service uptime")
     environment: str = Field(..., description="Environment (dev/prod)")
+    ready: bool = Field(True, description="Whether the startup warm-up has finished")
+    warmup: str = Field("ready", description="Warm-up state: pending, warming, ready or failed (retrying)")
 
 class ErrorResponse(BaseModel):
     """Standardized error response model"""
@@ -1,4 +1,12 @@
 # backend/app/services/__init__.py
-from .emotion_analyzer import emotion_analyzer
+# The analyzer is imported on first use, so importing the app stays cheap
 
-__all__ = ["emotion_analyzer"]
\ No newline at end of file
+
+def __getattr__(name):
+    if name == "get_emotion_analyzer":
+        from .emotion_analyzer import get_emotion_analyzer
+        return get_emotion_analyzer
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = ["get_emotion_analyzer"]
@@ -0,0 +1,140 @@
+# backend/app/services/batch_scoring.py
+"""
+Vectorized scoring of many texts at once.
+
+Each document's matched lexicon phrases become a row of a document x phrase
+match matrix; multiplying it by the phrase x emotion tier-weight matrix gives
+every document's emotion scores in one shot. Primary and secondary emotions,
+confidence and intensity are then derived with array operations using the
+same rules as ``EmotionAnalyzer``.
+"""
+import random
+from typing import List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from app.models.emotion import EmotionType
+from app.services.lexicon import (
+    FLAG_HIGH_INTENSITY,
+    FLAG_LOW_INTENSITY,
+    CompiledLexicon,
+    LexiconScan,
+    get_lexicon,
+)
+
+INTENSITY_LEVELS = np.array(["low", "medium", "high"])
+
+
+class BatchScores(NamedTuple):
+    """Per-document results of a vectorized scoring pass"""
+    emotions: List[EmotionType]
+    confidences: List[float]
+    secondary_emotions: List[List[str]]
+    intensities: List[str]
+
+
+class BatchScorer:
+    """Tier-weight and intensity matrices for one compiled lexicon."""
+
+    def __init__(self, lexicon: CompiledLexicon):
+        self.lexicon = lexicon
+        self.emotions = lexicon.emotions
+        self.emotion_names = [emotion.value for emotion in lexicon.emotions]
+
+        weights = np.zeros((len(lexicon.patterns), len(lexicon.emotions)), dtype=np.float64)
+        for pattern_id, contributions in enumerate(lexicon.contributions):
+            for slot, weight in contributions:
+                weights[pattern_id, slot] += weight
+        self.weights = weights
+
+        flags = np.array(lexicon.flags, dtype=np.int64)
+        self.intensity_columns = np.stack([
+            (flags & FLAG_LOW_INTENSITY) != 0,
+            (flags & FLAG_HIGH_INTENSITY) != 0,
+        ], axis=1).astype(np.float64)
+
+    def match_matrix(self, scans: Sequence[LexiconScan]) -> np.ndarray:
+        """Build the document x phrase 0/1 match matrix from lexicon scans."""
+        matrix = np.zeros((len(scans), len(self.lexicon.patterns)), dtype=np.float64)
+        rows = [row for row, scan in enumerate(scans) for _ in scan.matched]
+        cols = [pattern_id for scan in scans for pattern_id in scan.matched]
+        matrix[rows, cols] = 1.0
+        return matrix
+
+    def score(
+        self,
+        scans: Sequence[LexiconScan],
+        text_lengths: Sequence[int],
+        rngs: Optional[Sequence[random.Random]] = None
+    ) -> BatchScores:
+        """
+        Score every document from its lexicon scan.
+        
+        With ``rngs``, each document's confidence noise is drawn from its own
+        generator exactly as the single-text path does, so deterministic
+        analyses give the same result either way.
+        """
+        count = len(scans)
+        if count == 0:
+            return BatchScores([], [], [], [])
+
+        matches = self.match_matrix(scans)
+        scores = matches @ self.weights
+        low, high = (matches @ self.intensity_columns > 0).T
+
+        # Primary emotion: first highest-scoring emotion, Neutral when nothing matched
+        primary = scores.argmax(axis=1)
+        max_scores = scores[np.arange(count), primary]
+        neutral = max_scores == 0
+
+        # Confidence from top score and text length, with the same noise as the analyzer
+        base_confidence = np.minimum(0.95, 0.4 + max_scores * 0.15)
+        length_factor = np.minimum(1.0, np.asarray(text_lengths, dtype=np.float64) / 100)
+        confidence = np.minimum(0.95, base_confidence + length_factor * 0.1)
+        if rngs is None:
+            noise = np.random.default_rng(random.getrandbits(64))
+            draws = noise.uniform(-0.05, 0.05, count)
+            draws[neutral] = noise.uniform(0.3, 0.5, int(neutral.sum()))
+        else:
+            draws = np.array([
+                rng.uniform(0.3, 0.5) if is_neutral else rng.uniform(-0.05, 0.05)
+                for rng, is_neutral in zip(rngs, neutral.tolist())
+            ])
+        confidence = np.where(neutral, draws, np.clip(confidence + draws, 0.3, 0.95))
+
+        # Secondary emotions: top two other non-zero scores, ties in lexicon order
+        order = np.argsort(-scores, axis=1, kind="stable")
+        ordered_scores = np.take_along_axis(scores, order, axis=1)
+        candidates = (order != primary[:, None]) & (ordered_scores > 0)
+        selected = candidates & (np.cumsum(candidates, axis=1) <= 2)
+
+        intensities = INTENSITY_LEVELS[np.where(high, 2, np.where(low, 0, 1))]
+
+        names = self.emotion_names
+        emotions = [
+            EmotionType.NEUTRAL if is_neutral else self.emotions[slot]
+            for slot, is_neutral in zip(primary.tolist(), neutral.tolist())
+        ]
+        secondary = [
+            [names[slot] for slot in row_order[row_selected]]
+            for row_order, row_selected in zip(order, selected)
+        ]
+        return BatchScores(
+            emotions=emotions,
+            confidences=confidence.tolist(),
+            secondary_emotions=secondary,
+            intensities=intensities.tolist(),
+        )
+
+
+_scorer: Optional[BatchScorer] = None
+
+
+def get_batch_scorer(lexicon: Optional[CompiledLexicon] = None) -> BatchScorer:
+    """Return the batch scorer for ``lexicon`` (default: the current one), building it on first use."""
+    global _scorer
+    lexicon = lexicon or get_lexicon()
+    scorer = _scorer
+    if scorer is None or scorer.lexicon is not lexicon:
+        scorer = _scorer = BatchScorer(lexicon)
+    return scorer
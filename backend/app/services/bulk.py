@@ -0,0 +1,453 @@
+# backend/app/services/bulk.py
+"""
+Offline bulk analysis of JSONL and CSV files on all cores.
+
+The input file is memory-mapped and cut into chunks of about ``chunk_bytes``
+that end on record boundaries. Worker processes map the same file and are
+only sent the byte offsets of each chunk: they parse and score its records
+with ``EmotionAnalyzer.analyze_batch`` and return encoded results, so the
+parent process only writes output, in input order. No latency is simulated.
+
+After each chunk is written and synced, the offset of the next one is saved
+to a checkpoint file. A resumed run truncates the output back to what the
+checkpoint covers and carries on from that offset.
+"""
+import csv
+import io
+import json
+import mmap
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.models.emotion import EmotionBatchItem
+from app.services.batch_scoring import INTENSITY_LEVELS
+from app.services.emotion_analyzer import EmotionAnalyzer
+from app.services.fast_response import encode_analysis_response
+from app.services.lexicon import get_lexicon, set_lexicon
+from app.services.shared_lexicon import SharedLexicon
+from app.services.stats import EMOTION_INDEX, EMOTIONS
+from app.services.streaming import encode_ndjson, parse_ndjson_line
+
+INPUT_FORMATS = ("jsonl", "csv")
+OUTPUT_FORMATS = ("jsonl", "columnar")
+
+# Records scored per vectorized call; bounds the size of the match matrix
+_SCORE_BATCH = 1024
+
+# Columns of the columnar output; emotions and intensities are stored as codes
+COLUMNS = {
+    "line": np.dtype("<i8"),
+    "emotion": np.dtype("i1"),
+    "confidence": np.dtype("<f4"),
+    "emotion_intensity": np.dtype("i1"),
+}
+_INTENSITY_INDEX = {level: index for index, level in enumerate(INTENSITY_LEVELS.tolist())}
+
+
+class BulkOptions(NamedTuple):
+    """What to analyze and where the results go"""
+    input: Path
+    input_format: str
+    output: Path
+    output_format: str
+    text_column: str = "text"
+    include_suggestions: bool = True
+    chunk_bytes: int = 1 << 20
+
+
+class BulkProgress(NamedTuple):
+    """Records written so far"""
+    records: int
+    rejected: int
+    bytes_done: int
+    bytes_total: int
+    elapsed: float
+    # Records written by an interrupted run this one resumed
+    resumed: int = 0
+
+    @property
+    def rate(self) -> float:
+        """Records per second of this run"""
+        return (self.records - self.resumed) / self.elapsed if self.elapsed > 0 else 0.0
+
+
+class ChunkOutput(NamedTuple):
+    """Results for the records of one chunk, in input order"""
+    records: int
+    # JSONL output: the encoded response of each record, None if rejected
+    lines: List[Optional[bytes]]
+    # Columnar output: one array per column, line numbers counted from 0
+    columns: Dict[str, np.ndarray]
+    # Position in the chunk and reason of each rejected record
+    errors: List[Tuple[int, str]]
+
+
+def input_format_for(path: Path) -> str:
+    """Input format implied by a file name."""
+    return "csv" if path.suffix.lower() == ".csv" else "jsonl"
+
+
+def iter_spans(data: mmap.mmap, start: int, chunk_bytes: int, quoted: bool = False) -> Iterator[Tuple[int, int]]:
+    """
+    Yield ``(start, end)`` offsets of consecutive chunks of whole lines.
+
+    With ``quoted``, a chunk never ends inside a double-quoted CSV field,
+    which may contain line breaks: a line break ends a record only after an
+    even number of quotes.
+    """
+    size = len(data)
+    while start < size:
+        end = _line_end(data, min(size, start + chunk_bytes) - 1)
+        if quoted:
+            quotes = data[start:end].count(b'"')
+            while quotes % 2 and end < size:
+                extended = _line_end(data, end)
+                quotes += data[end:extended].count(b'"')
+                end = extended
+        yield start, end
+        start = end
+
+
+def _line_end(data: mmap.mmap, position: int) -> int:
+    """Offset just past the first line break at or after ``position``."""
+    newline = data.find(b"\n", position)
+    return len(data) if newline == -1 else newline + 1
+
+
+def read_csv_header(data: mmap.mmap) -> Tuple[List[str], int]:
+    """Column names of a CSV file and the offset of its first data record."""
+    start, end = next(iter_spans(data, 0, 1, quoted=True), (0, 0))
+    text = data[start:end].decode("utf-8-sig")
+    return next(csv.reader(io.StringIO(text, newline="")), []), end
+
+
+# Set in each worker process by ``_init_worker``
+_worker: Optional["_ChunkWorker"] = None
+
+
+def _init_worker(options: BulkOptions, text_index: int, lexicon_name: str) -> None:
+    global _worker
+    _worker = _ChunkWorker(options, text_index, lexicon_name)
+
+
+def _analyze_chunk(start: int, end: int) -> ChunkOutput:
+    return _worker.analyze(start, end)
+
+
+class _ChunkWorker:
+    """Parses and scores chunks of the input file; one per worker process"""
+
+    def __init__(self, options: BulkOptions, text_index: int, lexicon_name: str):
+        # Each worker scores on its own thread with its own stats; cached
+        # results would never be read
+        settings.ANALYZER_BACKEND = "thread"
+        settings.STATS_BACKEND = "local"
+        settings.RESULT_CACHE_MAX_ENTRIES = 0
+        self.shared = SharedLexicon.attach(lexicon_name)
+        set_lexicon(self.shared.lexicon)
+        self.analyzer = EmotionAnalyzer()
+
+        self.options = options
+        self.text_index = text_index
+        self.file = open(options.input, "rb")
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def analyze(self, start: int, end: int) -> ChunkOutput:
+        records = self._parse(self.data[start:end])
+        items = [item for item, _ in records if item is not None]
+        results = []
+        for first in range(0, len(items), _SCORE_BATCH):
+            results.extend(self.analyzer.analyze_batch(items[first:first + _SCORE_BATCH]))
+
+        outcomes = iter(results)
+        responses = []
+        errors = []
+        for position, (item, error) in enumerate(records):
+            response = None
+            if item is not None:
+                outcome = next(outcomes)
+                response, error = outcome.result, outcome.error
+            responses.append(response)
+            if response is None:
+                errors.append((position, error))
+
+        if self.options.output_format == "jsonl":
+            lines = [None if response is None else encode_analysis_response(response) for response in responses]
+            return ChunkOutput(len(records), lines, {}, errors)
+        return ChunkOutput(len(records), [], _columns(responses), errors)
+
+    def _parse(self, chunk: bytes) -> List[Tuple[Optional[EmotionBatchItem], Optional[str]]]:
+        """Each record of the chunk as an item, or the reason it cannot be analyzed."""
+        records = []
+        if self.options.input_format == "jsonl":
+            for line in chunk.split(b"\n"):
+                if line.strip():
+                    parsed = parse_ndjson_line(0, line)
+                    records.append((parsed.item, parsed.error))
+        else:
+            text = chunk.decode("utf-8", errors="replace")
+            for row in csv.reader(io.StringIO(text, newline="")):
+                if not row:
+                    continue
+                if self.text_index >= len(row):
+                    records.append((None, f"Missing column {self.options.text_column!r}"))
+                else:
+                    records.append((EmotionBatchItem(text=row[self.text_index]), None))
+        if not self.options.include_suggestions:
+            for item, _ in records:
+                if item is not None:
+                    item.include_suggestions = False
+        return records
+
+
+def _columns(responses: List[Any]) -> Dict[str, np.ndarray]:
+    """Columnar form of a chunk's responses; rejected records get code -1."""
+    count = len(responses)
+    emotion = np.full(count, -1, dtype=COLUMNS["emotion"])
+    confidence = np.full(count, np.nan, dtype=COLUMNS["confidence"])
+    intensity = np.full(count, -1, dtype=COLUMNS["emotion_intensity"])
+    for row, response in enumerate(responses):
+        if response is not None:
+            emotion[row] = EMOTION_INDEX[response.emotion]
+            confidence[row] = response.confidence
+            intensity[row] = _INTENSITY_INDEX[response.emotion_intensity]
+    return {
+        "line": np.arange(count, dtype=COLUMNS["line"]),
+        "emotion": emotion,
+        "confidence": confidence,
+        "emotion_intensity": intensity,
+    }
+
+
+def _sync(file) -> None:
+    file.flush()
+    os.fsync(file.fileno())
+
+
+def _truncated(path: Path, size: int):
+    """Open ``path`` for appending after cutting it back to ``size`` bytes."""
+    file = open(path, "r+b" if size else "wb")
+    file.truncate(size)
+    file.seek(size)
+    return file
+
+
+class JSONLWriter:
+    """One line per record: the response, or ``{"line", "error"}`` like /analyze/stream"""
+
+    def __init__(self, path: Path, state: Optional[Dict[str, int]] = None):
+        self.path = path
+        self.file = _truncated(path, (state or {}).get("bytes", 0))
+
+    def write(self, chunk: ChunkOutput, first_line: int) -> None:
+        errors = dict(chunk.errors)
+        self.file.write(b"".join(
+            line + b"\n" if line is not None else encode_ndjson({"line": first_line + position, "error": errors[position]})
+            for position, line in enumerate(chunk.lines)
+        ))
+
+    def commit(self) -> Dict[str, int]:
+        """Make everything written durable; returns the state to resume from."""
+        _sync(self.file)
+        return {"bytes": self.file.tell()}
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class _NpyColumn:
+    """A ``.npy`` file grown in place: rows are appended and the header rewritten on commit"""
+
+    def __init__(self, path: Path, dtype: np.dtype, rows: int):
+        self.dtype = dtype
+        self.rows = rows
+        self.file = open(path, "r+b" if rows else "wb")
+        self.header_size = self._write_header()
+        self.file.truncate(self.header_size + rows * dtype.itemsize)
+        self.file.seek(0, os.SEEK_END)
+
+    def _write_header(self) -> int:
+        self.file.seek(0)
+        # NumPy pads the header so that the row count can grow without moving the data
+        np.lib.format.write_array_header_1_0(self.file, {
+            "descr": np.lib.format.dtype_to_descr(self.dtype),
+            "fortran_order": False,
+            "shape": (self.rows,),
+        })
+        return self.file.tell()
+
+    def append(self, values: np.ndarray) -> None:
+        self.file.write(values.astype(self.dtype, copy=False).tobytes())
+        self.rows += len(values)
+
+    def commit(self) -> None:
+        end = self.file.tell()
+        if self._write_header() != self.header_size:
+            raise RuntimeError(f"Header of {self.file.name} changed size")
+        self.file.seek(end)
+        _sync(self.file)
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class ColumnarWriter:
+    """
+    A directory with one ``.npy`` file per column, readable with
+    ``numpy.load(..., mmap_mode="r")``, ``schema.json`` naming the emotion and
+    intensity codes, and ``errors.jsonl`` for rejected records.
+    """
+
+    def __init__(self, path: Path, state: Optional[Dict[str, int]] = None):
+        state = state or {}
+        path.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        rows = state.get("rows", 0)
+        self.columns = {name: _NpyColumn(path / f"{name}.npy", dtype, rows) for name, dtype in COLUMNS.items()}
+        self.errors = _truncated(path / "errors.jsonl", state.get("error_bytes", 0))
+        schema = {
+            "columns": {name: dtype.str for name, dtype in COLUMNS.items()},
+            "emotion": [emotion.value for emotion in EMOTIONS],
+            "emotion_intensity": INTENSITY_LEVELS.tolist(),
+        }
+        (path / "schema.json").write_text(json.dumps(schema, indent=2))
+
+    def write(self, chunk: ChunkOutput, first_line: int) -> None:
+        for name, column in self.columns.items():
+            values = chunk.columns[name]
+            column.append(values + first_line if name == "line" else values)
+        self.errors.write(b"".join(
+            encode_ndjson({"line": first_line + position, "error": error}) for position, error in chunk.errors
+        ))
+
+    def commit(self) -> Dict[str, int]:
+        for column in self.columns.values():
+            column.commit()
+        _sync(self.errors)
+        return {"rows": next(iter(self.columns.values())).rows, "error_bytes": self.errors.tell()}
+
+    def close(self) -> None:
+        for column in self.columns.values():
+            column.close()
+        self.errors.close()
+
+
+WRITERS = {"jsonl": JSONLWriter, "columnar": ColumnarWriter}
+
+
+def _identity(options: BulkOptions) -> Dict[str, Any]:
+    """What a checkpoint must match to be resumed from."""
+    stat = options.input.stat()
+    return {
+        "input": str(options.input.resolve()),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "input_format": options.input_format,
+        "output": str(options.output.resolve()),
+        "output_format": options.output_format,
+        "text_column": options.text_column,
+        "include_suggestions": options.include_suggestions,
+    }
+
+
+def load_checkpoint(path: Path, options: BulkOptions) -> Optional[Dict[str, Any]]:
+    """The saved progress for ``options``; ValueError if it belongs to another run."""
+    try:
+        checkpoint = json.loads(path.read_text())
+    except FileNotFoundError:
+        return None
+    if checkpoint.get("identity") != _identity(options):
+        raise ValueError(f"Checkpoint {path} was written for another input, output or options")
+    return checkpoint
+
+
+def _save_checkpoint(path: Path, checkpoint: Dict[str, Any]) -> None:
+    temporary = path.with_name(path.name + ".tmp")
+    temporary.write_text(json.dumps(checkpoint))
+    os.replace(temporary, path)
+
+
+def run_bulk(
+    options: BulkOptions,
+    workers: int,
+    checkpoint_path: Path,
+    resume: bool = False,
+    progress: Optional[Callable[[BulkProgress], None]] = None
+) -> BulkProgress:
+    """
+    Analyze every record of ``options.input`` on ``workers`` processes.
+
+    With ``resume``, continues from ``checkpoint_path`` if it exists. The
+    checkpoint is removed once the whole input is written; ``progress`` is
+    called after each chunk.
+    """
+    started = time.perf_counter()
+    identity = _identity(options)
+    checkpoint = load_checkpoint(checkpoint_path, options) if resume else None
+    state = checkpoint or {"identity": identity, "offset": 0, "records": 0, "rejected": 0, "output": None}
+    writer = WRITERS[options.output_format](options.output, state["output"])
+    if not identity["size"]:
+        writer.commit()
+        writer.close()
+        return BulkProgress(0, 0, 0, 0, time.perf_counter() - started)
+
+    resumed = records = state["records"]
+    rejected = state["rejected"]
+    done = 0
+    with open(options.input, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        text_index = 0
+        start = state["offset"]
+        if options.input_format == "csv":
+            header, header_end = read_csv_header(data)
+            if options.text_column not in header:
+                writer.close()
+                raise ValueError(f"CSV header has no column {options.text_column!r}")
+            text_index = header.index(options.text_column)
+            start = max(start, header_end)
+        done = start
+
+        shared = SharedLexicon.create(get_lexicon())
+        executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(options, text_index, shared.name)
+        )
+        spans = iter_spans(data, start, options.chunk_bytes, quoted=options.input_format == "csv")
+        # Two chunks per worker in flight keep every worker busy while the
+        # parent writes, and bound memory to a few chunks
+        pending: Deque[Tuple[int, Future]] = deque()
+        try:
+            while True:
+                while len(pending) < 2 * workers:
+                    span = next(spans, None)
+                    if span is None:
+                        break
+                    pending.append((span[1], executor.submit(_analyze_chunk, *span)))
+                if not pending:
+                    break
+                end, future = pending.popleft()
+                chunk = future.result()
+                writer.write(chunk, records + 1)
+                records += chunk.records
+                rejected += len(chunk.errors)
+                done = end
+                state.update(offset=end, records=records, rejected=rejected, output=writer.commit())
+                _save_checkpoint(checkpoint_path, state)
+                if progress is not None:
+                    progress(BulkProgress(records, rejected, done, len(data), time.perf_counter() - started, resumed))
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+            shared.close()
+            writer.close()
+
+    checkpoint_path.unlink(missing_ok=True)
+    return BulkProgress(records, rejected, done, identity["size"], time.perf_counter() - started, resumed)
@@ -0,0 +1,305 @@
+# backend/app/services/classifier.py
+"""
+CPU-only emotion classifier in pure NumPy.
+
+Texts are turned into hashed word unigram, word bigram and character trigram
+features, and a linear softmax head maps them to ``EmotionType`` classes. The
+weights live in a single ``.npy`` file of shape ``(n_features + 1, n_classes)``
+(the last row is the bias) and are opened with ``mmap_mode='r'``, so forked
+workers share the same physical pages and loading costs no copy.
+
+Weights are distilled from the keyword lexicon: a synthetic corpus built from
+lexicon phrases is labelled by the keyword rules and a softmax regression is
+fitted to it. Build them ahead of time with::
+
+    python -m app.services.classifier build
+"""
+import argparse
+import os
+import random
+import re
+import tempfile
+import threading
+import zlib
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.models.emotion import EmotionType
+from app.services.lexicon import CompiledLexicon, default_lexicon_source, get_lexicon
+
+logger = get_logger(__name__)
+
+CLASSES: Tuple[EmotionType, ...] = tuple(EmotionType)
+TOKEN_PATTERN = re.compile(r"[a-z0-9']+")
+
+FILLER_WORDS = [
+    "today", "work", "the", "meeting", "and", "my", "friend", "was", "really",
+    "about", "weekend", "family", "project", "after", "morning", "felt", "that",
+    "i", "am", "we", "it", "this", "with", "school", "team", "home", "week",
+]
+
+
+class Prediction(NamedTuple):
+    """Classifier output for one text"""
+    emotion: EmotionType
+    confidence: float
+    secondary_emotions: List[str]
+
+
+def hash_features(text: str, n_features: int) -> Dict[int, float]:
+    """Hashed word 1-2 gram and char 3-gram counts of ``text``."""
+    tokens = TOKEN_PATTERN.findall(text.lower())
+    features: Dict[int, float] = {}
+
+    def add(feature: str) -> None:
+        index = zlib.crc32(feature.encode("utf-8")) % n_features
+        features[index] = features.get(index, 0.0) + 1.0
+
+    for position, token in enumerate(tokens):
+        add("w:" + token)
+        if position:
+            add("b:" + tokens[position - 1] + " " + token)
+        padded = "<" + token + ">"
+        for start in range(len(padded) - 2):
+            add("c:" + padded[start:start + 3])
+    return features
+
+
+class SparseRows:
+    """
+    Feature matrix in compressed-row form with L2-normalized log counts.
+
+    Row ``i`` owns ``columns[offsets[i]:offsets[i + 1]]``. Training also
+    builds a column-sorted view so both products reduce contiguous runs.
+    """
+
+    def __init__(self, offsets: np.ndarray, columns: np.ndarray, values: np.ndarray):
+        self.offsets = offsets
+        self.columns = columns
+        self.values = values
+        self.n_rows = len(offsets) - 1
+        # reduceat cannot express empty rows, so only non-empty ones are reduced
+        self._present = np.diff(offsets) > 0
+        self._starts = offsets[:-1][self._present]
+        self._by_column: Optional[Tuple[np.ndarray, ...]] = None
+
+    def _column_view(self) -> Tuple[np.ndarray, ...]:
+        """Row ids, values, distinct columns and run starts in column order (training only)."""
+        if self._by_column is None:
+            rows = np.repeat(np.arange(self.n_rows), np.diff(self.offsets))
+            order = np.argsort(self.columns, kind="stable")
+            column_ids, starts = np.unique(self.columns[order], return_index=True)
+            self._by_column = (rows[order], self.values[order], column_ids, starts)
+        return self._by_column
+
+    def dot(self, weights: np.ndarray) -> np.ndarray:
+        """``X @ weights`` for a dense ``(n_features, k)`` matrix."""
+        result = np.zeros((self.n_rows, weights.shape[1]), dtype=np.float32)
+        if len(self.columns):
+            contributions = weights[self.columns] * self.values[:, None]
+            result[self._present] = np.add.reduceat(contributions, self._starts, axis=0)
+        return result
+
+    def transpose_dot(self, error: np.ndarray, n_features: int) -> np.ndarray:
+        """``X.T @ error`` as a dense ``(n_features, k)`` matrix."""
+        result = np.zeros((n_features, error.shape[1]), dtype=np.float32)
+        if len(self.columns):
+            rows, values, column_ids, starts = self._column_view()
+            contributions = error[rows] * values[:, None]
+            result[column_ids] = np.add.reduceat(contributions, starts, axis=0)
+        return result
+
+
+def vectorize(texts: Sequence[str], n_features: int) -> SparseRows:
+    """Hash ``texts`` into a sparse feature matrix."""
+    offsets = [0]
+    columns: List[int] = []
+    values: List[float] = []
+    for text in texts:
+        features = hash_features(text, n_features)
+        weights = np.log1p(np.fromiter(features.values(), dtype=np.float32, count=len(features)))
+        norm = float(np.sqrt((weights * weights).sum())) or 1.0
+        columns.extend(features)
+        values.extend((weights / norm).tolist())
+        offsets.append(len(columns))
+    return SparseRows(
+        np.asarray(offsets, dtype=np.int64),
+        np.asarray(columns, dtype=np.int64),
+        np.asarray(values, dtype=np.float32),
+    )
+
+
+def softmax(logits: np.ndarray) -> np.ndarray:
+    shifted = logits - logits.max(axis=1, keepdims=True)
+    exp = np.exp(shifted)
+    return exp / exp.sum(axis=1, keepdims=True)
+
+
+class EmotionClassifier:
+    """Linear softmax head over hashed n-gram features."""
+
+    def __init__(self, weights: np.ndarray):
+        if weights.ndim != 2 or weights.shape[1] != len(CLASSES):
+            raise ValueError(f"Classifier weights must have shape (n_features + 1, {len(CLASSES)})")
+        self.weights = weights
+        self.n_features = weights.shape[0] - 1
+
+    @classmethod
+    def load(cls, path: Path) -> "EmotionClassifier":
+        """Memory-map weights from ``path``; pages are read on first touch."""
+        return cls(np.load(path, mmap_mode="r"))
+
+    def predict_proba(self, texts: Sequence[str]) -> np.ndarray:
+        features = vectorize(texts, self.n_features)
+        return softmax(features.dot(self.weights) + self.weights[-1])
+
+    def predict(self, texts: Sequence[str]) -> List[Prediction]:
+        """Primary emotion, confidence and up to two secondary emotions per text."""
+        predictions = []
+        for probabilities in self.predict_proba(texts):
+            ranked = np.argsort(-probabilities, kind="stable")
+            primary = int(ranked[0])
+            secondary = [
+                CLASSES[int(index)].value
+                for index in ranked[1:3]
+                if probabilities[index] >= settings.MODEL_SECONDARY_THRESHOLD
+            ]
+            predictions.append(Prediction(
+                emotion=CLASSES[primary],
+                confidence=float(np.clip(probabilities[primary], 0.3, 0.95)),
+                secondary_emotions=secondary,
+            ))
+        return predictions
+
+
+def synthetic_corpus(
+    lexicon: CompiledLexicon,
+    size: int,
+    rng: random.Random
+) -> Tuple[List[str], np.ndarray]:
+    """Texts assembled from lexicon phrases, labelled by the keyword rules."""
+    source = default_lexicon_source()
+    phrases = {
+        emotion: [word for words in groups.values() for word in words]
+        for emotion, groups in source.emotion_keywords.items()
+    }
+    emotions = list(phrases)
+    class_index = {emotion: index for index, emotion in enumerate(CLASSES)}
+    texts: List[str] = []
+    labels: List[int] = []
+    while len(texts) < size:
+        words = rng.sample(FILLER_WORDS, rng.randint(3, 12))
+        if rng.random() > 0.1:
+            emotion = rng.choice(emotions)
+            words += rng.sample(phrases[emotion], min(len(phrases[emotion]), rng.randint(1, 3)))
+            if rng.random() < 0.4:
+                words.append(rng.choice(phrases[rng.choice(emotions)]))
+        if rng.random() < 0.3:
+            words.append(rng.choice(source.high_intensity_words + source.low_intensity_words))
+        rng.shuffle(words)
+        text = " ".join(words)
+
+        scan = lexicon.scan(text)
+        if scan.crisis:
+            continue
+        scores = scan.scores
+        label = EmotionType.NEUTRAL if max(scores.values()) == 0 else max(scores, key=scores.get)
+        texts.append(text)
+        labels.append(class_index[label])
+    return texts, np.asarray(labels, dtype=np.int64)
+
+
+def train(
+    features: SparseRows,
+    labels: np.ndarray,
+    n_features: int,
+    epochs: int = 30,
+    learning_rate: float = 0.5
+) -> np.ndarray:
+    """Fit softmax regression with full-batch Adagrad; returns the weight array."""
+    n_rows = features.n_rows
+    weights = np.zeros((n_features + 1, len(CLASSES)), dtype=np.float32)
+    history = np.full_like(weights, 1e-8)
+    targets = np.zeros((n_rows, len(CLASSES)), dtype=np.float32)
+    targets[np.arange(n_rows), labels] = 1.0
+
+    for _ in range(epochs):
+        error = (softmax(features.dot(weights) + weights[-1]) - targets) / n_rows
+
+        gradient = np.zeros_like(weights)
+        gradient[:-1] = features.transpose_dot(error, n_features)
+        gradient[-1] = error.sum(axis=0)
+        history += gradient * gradient
+        weights -= learning_rate * gradient / np.sqrt(history)
+    return weights
+
+
+def build_weights(path: Path, n_features: int, corpus_size: int = 10000, seed: int = 7) -> float:
+    """Train on a synthetic corpus, save the weights and return training accuracy."""
+    texts, labels = synthetic_corpus(get_lexicon(), corpus_size, random.Random(seed))
+    features = vectorize(texts, n_features)
+    weights = train(features, labels, n_features)
+    predicted = (features.dot(weights) + weights[-1]).argmax(axis=1)
+    accuracy = float((predicted == labels).mean())
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # A unique temporary name, so concurrent builds never mix their output
+    descriptor, temporary = tempfile.mkstemp(prefix=path.name + ".", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(descriptor, "wb") as output:
+            np.save(output, weights)
+        os.replace(temporary, path)
+    except BaseException:
+        Path(temporary).unlink(missing_ok=True)
+        raise
+    return accuracy
+
+
+class ClassifierUnavailableError(RuntimeError):
+    """The classifier weights have not been built"""
+
+
+_classifier: Optional[EmotionClassifier] = None
+_classifier_lock = threading.Lock()
+
+
+def get_classifier() -> EmotionClassifier:
+    """
+    Return the shared classifier, loading its weights lazily.
+
+    Training takes far longer than any request should, so missing weights
+    raise ``ClassifierUnavailableError`` instead of being built here.
+    """
+    global _classifier
+    if _classifier is None:
+        with _classifier_lock:
+            if _classifier is None:
+                path = Path(settings.MODEL_WEIGHTS_PATH)
+                if not path.exists():
+                    raise ClassifierUnavailableError(
+                        f"Classifier weights not found at {path}; "
+                        "build them with `python -m app.services.classifier build`"
+                    )
+                _classifier = EmotionClassifier.load(path)
+                logger.info("Emotion classifier loaded from %s", path)
+    return _classifier
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build the NumPy emotion classifier weights")
+    parser.add_argument("command", choices=["build"])
+    parser.add_argument("--output", default=settings.MODEL_WEIGHTS_PATH)
+    parser.add_argument("--features", type=int, default=settings.MODEL_FEATURES)
+    parser.add_argument("--corpus-size", type=int, default=10000)
+    args = parser.parse_args()
+
+    accuracy = build_weights(Path(args.output), args.features, args.corpus_size)
+    print(f"Saved classifier weights to {args.output} (training accuracy {accuracy:.3f})")
+
+
+if __name__ == "__main__":
+    main()
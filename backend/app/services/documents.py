@@ -0,0 +1,64 @@
+# backend/app/services/documents.py
+"""
+Splitting long documents into chunks for the long-document mode.
+
+Chunks are produced lazily as ``(start, end)`` character offsets into the
+document, so splitting never copies the text; a chunk's text is only sliced
+out when its batch is scored. Chunks are sentences or paragraphs, with
+surrounding whitespace trimmed, and anything longer than ``max_chars`` is cut
+at the last whitespace before the limit.
+"""
+import re
+from itertools import islice
+from typing import Iterable, Iterator, List, Tuple
+
+Span = Tuple[int, int]
+
+# End of a sentence: terminal punctuation with any closing quotes or
+# brackets, or a line break
+_SENTENCE_END = re.compile(r"[.!?…]+[\"'’”)\]]*(?=\s|$)|\n")
+# End of a paragraph: a blank line
+_PARAGRAPH_END = re.compile(r"\n[ \t\r\f\v]*\n")
+
+SPLIT_PATTERNS = {"sentence": _SENTENCE_END, "paragraph": _PARAGRAPH_END}
+
+
+def iter_chunks(text: str, split: str = "sentence", max_chars: int = 1000) -> Iterator[Span]:
+    """Yield the offsets of each non-blank sentence or paragraph of ``text``."""
+    start = 0
+    for boundary in SPLIT_PATTERNS[split].finditer(text):
+        yield from _trimmed(text, start, boundary.end(), max_chars)
+        start = boundary.end()
+    yield from _trimmed(text, start, len(text), max_chars)
+
+
+def _trimmed(text: str, start: int, end: int, max_chars: int) -> Iterator[Span]:
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    while end - start > max_chars:
+        # Cut at the last whitespace within the limit, or hard at the limit
+        cut = max(text.rfind(" ", start + 1, start + max_chars + 1), text.rfind("\n", start + 1, start + max_chars + 1))
+        if cut <= start:
+            cut = start + max_chars
+        yield from _trimmed(text, start, cut, max_chars)
+        start = cut
+        while start < end and text[start].isspace():
+            start += 1
+    if start < end:
+        yield start, end
+
+
+def batched(spans: Iterable[Span], size: int) -> Iterator[List[Span]]:
+    """Group spans into lists of ``size``; only one list is held at a time."""
+    spans = iter(spans)
+    while True:
+        batch = list(islice(spans, size))
+        if not batch:
+            return
+        yield batch
+
+
+class CrisisContentError(ValueError):
+    """A document contains a crisis phrase"""
@@ -1,226 +1,89 @@
+import asyncio
+import hashlib
 import random
+import threading
 import time
-import uuid
-from typing import Dict, List, Tuple
-from datetime import datetime
-from collections import Counter
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Deque, Dict, Hashable, List, Optional, Sequence, Tuple
+from pydantic import ValidationError
 from app.models.emotion import (
+    CRISIS_MESSAGE,
     EmotionType, 
     EmotionAnalysisRequest, 
     EmotionAnalysisResponse,
-    EmotionStats
+    EmotionBatchItem,
+    EmotionBatchItemResult,
+    EmotionDocumentRequest,
+    EmotionDocumentResponse,
+    EmotionTimelineEntry,
+    CacheStats,
+    EmotionStats,
+    MicroBatchStats,
+    SingleFlightStats,
+    EmotionWindowStats
 )
+from app.core.config import settings
 from app.core.logging import get_logger
+from app.core.metrics import metrics
+from app.services.batch_scoring import get_batch_scorer
+from app.services.cache import TTLCache
+from app.services.documents import CrisisContentError, Span, batched, iter_chunks
+from app.services.fast_response import new_id, timestamp_now
+from app.services.lexicon import CompiledLexicon, LexiconScan, get_lexicon
+from app.services.micro_batching import MicroBatcher
+from app.services.process_pool import ProcessScanPool
+from app.services.single_flight import SingleFlight
+from app.services.stats import StatsAggregator
 
 logger = get_logger(__name__)
 
+# Randomness source for non-deterministic analyses
+_shared_rng = random.Random()
+
+# Characters of a text hashed at a time when seeding deterministic analyses
+_DIGEST_SLICE = 16384
+
 class EmotionAnalyzer:
     """Advanced emotion analysis service using comprehensive keyword analysis"""
     
     def __init__(self):
-        self.analysis_count = 0
-        self.emotion_history: List[Tuple[str, float]] = [] 
-        self.total_processing_time = 0.0
-        
-        # Enhanced emotion keywords with weights
-        self.emotion_keywords = {
-            EmotionType.HAPPY: {
-                'primary': ['happy', 'joy', 'joyful', 'elated', 'ecstatic', 'blissful'],
-                'secondary': ['great', 'amazing', 'wonderful', 'fantastic', 'awesome', 'brilliant', 'cheerful', 'delighted', 'pleased'],
-                'contextual': ['celebration', 'success', 'achievement', 'victory', 'win']
-            },
-            EmotionType.SAD: {
-                'primary': ['sad', 'depressed', 'melancholy', 'grief', 'sorrow', 'despair'],
-                'secondary': ['down', 'blue', 'gloomy', 'miserable', 'heartbroken', 'disappointed'],
-                'contextual': ['crying', 'tears', 'loss', 'farewell', 'goodbye', 'miss']
-            },
-            EmotionType.ANXIOUS: {
-                'primary': ['anxious', 'anxiety', 'worried', 'nervous', 'panic', 'fearful'],
-                'secondary': ['scared', 'afraid', 'uneasy', 'restless', 'tense', 'on edge'],
-                'contextual': ['stress', 'pressure', 'overwhelming', 'uncertain', 'doubt']
-            },
-            EmotionType.ANGRY: {
-                'primary': ['angry', 'mad', 'furious', 'rage', 'irate', 'livid'],
-                'secondary': ['irritated', 'annoyed', 'frustrated', 'outraged', 'hostile', 'bitter'],
-                'contextual': ['hate', 'disgusted', 'fed up', 'can\'t stand', 'infuriating']
-            },
-            EmotionType.EXCITED: {
-                'primary': ['excited', 'thrilled', 'exhilarated', 'energetic', 'pumped'],
-                'secondary': ['eager', 'enthusiastic', 'animated', 'vibrant', 'spirited'],
-                'contextual': ['can\'t wait', 'looking forward', 'anticipating', 'psyched']
-            },
-            EmotionType.CONFUSED: {
-                'primary': ['confused', 'puzzled', 'perplexed', 'bewildered', 'baffled'],
-                'secondary': ['lost', 'unclear', 'uncertain', 'mixed up', 'stumped'],
-                'contextual': ['don\'t understand', 'makes no sense', 'what\'s going on']
-            },
-            EmotionType.CALM: {
-                'primary': ['calm', 'peaceful', 'serene', 'tranquil', 'composed'],
-                'secondary': ['relaxed', 'quiet', 'still', 'balanced', 'centered'],
-                'contextual': ['meditation', 'mindful', 'zen', 'at peace', 'harmony']
-            },
-            EmotionType.FRUSTRATED: {
-                'primary': ['frustrated', 'exasperated', 'aggravated', 'vexed'],
-                'secondary': ['stuck', 'blocked', 'hindered', 'bothered', 'irked'],
-                'contextual': ['nothing works', 'keep trying', 'obstacles', 'barriers']
-            },
-            EmotionType.HOPEFUL: {
-                'primary': ['hopeful', 'optimistic', 'positive', 'confident', 'upbeat'],
-                'secondary': ['encouraged', 'inspired', 'motivated', 'determined'],
-                'contextual': ['better tomorrow', 'things will improve', 'light at the end', 'faith']
-            },
-            EmotionType.DISAPPOINTED: {
-                'primary': ['disappointed', 'let down', 'discouraged', 'deflated'],
-                'secondary': ['dissatisfied', 'disheartened', 'dismayed', 'disillusioned'],
-                'contextual': ['expected more', 'didn\'t work out', 'fell short', 'not what I hoped']
-            },
-            EmotionType.OVERWHELMED: {
-                'primary': ['overwhelmed', 'swamped', 'buried', 'overloaded'],
-                'secondary': ['too much', 'can\'t handle', 'drowning', 'suffocating'],
-                'contextual': ['so many things', 'no time', 'pressure', 'breaking point']
-            },
-            EmotionType.CONFIDENT: {
-                'primary': ['confident', 'sure', 'certain', 'assured', 'self-assured'],
-                'secondary': ['capable', 'strong', 'empowered', 'bold', 'fearless'],
-                'contextual': ['I can do this', 'believe in myself', 'ready', 'prepared']
-            },
-            EmotionType.GRATEFUL: {
-                'primary': ['grateful', 'thankful', 'appreciative', 'blessed'],
-                'secondary': ['fortunate', 'lucky', 'appreciate', 'value'],
-                'contextual': ['thank you', 'so grateful', 'appreciate', 'blessed']
-            },
-            EmotionType.LONELY: {
-                'primary': ['lonely', 'alone', 'isolated', 'solitary'],
-                'secondary': ['disconnected', 'abandoned', 'forsaken', 'left out'],
-                'contextual': ['no one understands', 'by myself', 'missing people', 'social isolation']
-            },
-            EmotionType.STRESSED: {
-                'primary': ['stressed', 'pressure', 'tension', 'strain'],
-                'secondary': ['overwhelmed', 'burned out', 'exhausted', 'drained'],
-                'contextual': ['deadlines', 'workload', 'responsibilities', 'juggling']
-            },
-            EmotionType.PROUD: {
-                'primary': ['proud', 'accomplished', 'satisfied', 'fulfilled'],
-                'secondary': ['achieved', 'successful', 'impressed', 'pleased'],
-                'contextual': ['hard work paid off', 'exceeded expectations', 'milestone', 'breakthrough']
-            }
-        }
-        
-        # Contextual suggestions for each emotion
-        self.emotion_suggestions = {
-            EmotionType.HAPPY: [
-                "Share your joy with someone special today",
-                "Take a moment to savor this positive feeling",
-                "Consider keeping a gratitude journal to remember these moments",
-                "Use this positive energy to tackle a challenge you've been avoiding",
-                "Practice mindfulness to fully appreciate this happiness"
-            ],
-            EmotionType.SAD: [
-                "Allow yourself to feel these emotions - they're valid and temporary",
-                "Reach out to a trusted friend or family member for support",
-                "Consider gentle activities like walking in nature or listening to music",
-                "Practice self-compassion and avoid harsh self-judgment",
-                "If feelings persist, consider speaking with a counselor"
-            ],
-            EmotionType.ANXIOUS: [
-                "Try the 4-7-8 breathing technique: inhale for 4, hold for 7, exhale for 8",
-                "Break down your worries into smaller, manageable action steps",
-                "Practice grounding techniques: name 5 things you can see, 4 you can touch, 3 you can hear",
-                "Consider mindfulness meditation or progressive muscle relaxation",
-                "Talk to someone you trust about your concerns"
-            ],
-            EmotionType.ANGRY: [
-                "Take 10 deep breaths before responding to what triggered you",
-                "Try physical exercise to release built-up tension safely",
-                "Ask yourself: 'What am I really feeling underneath this anger?'",
-                "Practice 'I' statements when expressing your feelings to others",
-                "Consider whether this situation will matter in 5 years"
-            ],
-            EmotionType.EXCITED: [
-                "Channel this positive energy into a meaningful project",
-                "Share your excitement with others who will celebrate with you",
-                "Plan concrete steps to make the most of this momentum",
-                "Use this motivation to tackle tasks you've been putting off",
-                "Document this feeling to remember during tougher times"
-            ],
-            EmotionType.CONFUSED: [
-                "Take time to gather more information before making decisions",
-                "Break complex situations into smaller, clearer components",
-                "Seek perspective from someone with relevant experience",
-                "Remember that confusion often precedes clarity and growth",
-                "Consider writing down your thoughts to organize them"
-            ],
-            EmotionType.CALM: [
-                "Enjoy this peaceful moment and notice what created it",
-                "Use this mental clarity to reflect on important decisions",
-                "Practice gratitude for this sense of balance and well-being",
-                "Consider what habits or practices help you maintain this state",
-                "Share your calm energy with others who might need it"
-            ],
-            EmotionType.FRUSTRATED: [
-                "Take a break and return to the situation with fresh perspective",
-                "Try a completely different approach to the problem",
-                "Ask for help or advice from someone who might have insights",
-                "Remember that obstacles are often opportunities in disguise",
-                "Focus on what you can control rather than what you can't"
-            ],
-            EmotionType.HOPEFUL: [
-                "Build on this optimism by creating concrete action plans",
-                "Share your positive outlook with others who might benefit",
-                "Use this momentum to take the next step toward your goals",
-                "Document your hopes and dreams to revisit when motivation wanes",
-                "Celebrate small wins along the way to maintain this feeling"
-            ],
-            EmotionType.DISAPPOINTED: [
-                "Acknowledge your feelings without judgment - disappointment is natural",
-                "Look for lessons or silver linings in this experience",
-                "Focus on what you can control moving forward",
-                "Remember that setbacks often set us up for bigger comebacks",
-                "Consider adjusting expectations while maintaining your core values"
-            ],
-            EmotionType.OVERWHELMED: [
-                "Make a list of everything on your mind, then prioritize ruthlessly",
-                "Focus on completing one task at a time rather than multitasking",
-                "Delegate or eliminate non-essential activities",
-                "Take regular breaks to prevent burnout",
-                "Consider asking for help - you don't have to handle everything alone"
-            ],
-            EmotionType.CONFIDENT: [
-                "Use this confidence to tackle a challenge you've been avoiding",
-                "Share your knowledge or skills with others who could benefit",
-                "Set a new goal that stretches your capabilities",
-                "Remember this feeling during times of self-doubt",
-                "Consider mentoring someone who could use your confidence"
-            ],
-            EmotionType.GRATEFUL: [
-                "Write a thank-you note to someone who has impacted your life",
-                "Start a daily gratitude practice to cultivate this feeling",
-                "Look for ways to pay your blessings forward to others",
-                "Share your appreciation with the people who matter to you",
-                "Use this gratitude as motivation to help others"
-            ],
-            EmotionType.LONELY: [
-                "Reach out to an old friend or family member you haven't contacted recently",
-                "Consider joining a group or class based on your interests",
-                "Practice self-compassion - being alone doesn't mean being lonely",
-                "Engage in activities that connect you with your community",
-                "Remember that feeling lonely is temporary and you have value"
-            ],
-            EmotionType.STRESSED: [
-                "Identify the specific sources of your stress and address them one by one",
-                "Practice stress-relief techniques like deep breathing or meditation",
-                "Ensure you're getting enough sleep, exercise, and proper nutrition",
-                "Consider time management strategies to better organize your responsibilities",
-                "Don't hesitate to ask for help when you need it"
-            ],
-            EmotionType.PROUD: [
-                "Take time to fully acknowledge and celebrate your achievement",
-                "Share your success with people who supported you along the way",
-                "Reflect on the skills and qualities that led to this success",
-                "Use this confidence to set your next meaningful goal",
-                "Consider how you can help others achieve similar success"
-            ]
-        }
+        # Running aggregates; memory stays constant however many analyses run
+        self.stats = _create_stats()
+        
+        # Results of deterministic analyses, reusable for identical texts
+        self.result_cache: Optional[TTLCache[EmotionAnalysisResponse]] = None
+        if settings.DETERMINISTIC_ANALYSIS and settings.RESULT_CACHE_MAX_ENTRIES > 0:
+            self.result_cache = TTLCache(
+                max_entries=settings.RESULT_CACHE_MAX_ENTRIES,
+                ttl_seconds=settings.RESULT_CACHE_TTL
+            )
+        
+        # Bounded pool for CPU-bound scoring off the event loop
+        self._executor = ThreadPoolExecutor(
+            max_workers=settings.ANALYZER_MAX_WORKERS,
+            thread_name_prefix="emotion-analyzer"
+        )
+        
+        # Worker processes for lexicon scans when ANALYZER_BACKEND is "process",
+        # started on first use
+        self._scan_pool: Optional[ProcessScanPool] = None
+        self._scan_pool_lock = threading.Lock()
+        
+        # Identical concurrent requests share one in-flight analysis
+        self.single_flight: Optional[SingleFlight[EmotionAnalysisResponse]] = None
+        if settings.SINGLE_FLIGHT_ENABLED:
+            self.single_flight = SingleFlight()
+        
+        # Groups concurrent async analyses into one scoring call
+        self.micro_batcher: Optional[MicroBatcher] = None
+        if settings.MICRO_BATCH_ENABLED:
+            self.micro_batcher = MicroBatcher(
+                self._analyze_queued,
+                self._executor,
+                max_batch_size=settings.MICRO_BATCH_MAX_SIZE,
+                max_wait_ms=settings.MICRO_BATCH_MAX_WAIT_MS
+            )
         
         logger.info("EmotionAnalyzer initialized successfully")
     
@@ -228,53 +91,286 @@ class EmotionAnalyzer:
         """
         Analyzes emotion from text input using comprehensive keyword analysis.
         Updates internal statistics with each analysis.
+        
+        Blocks the calling thread for the simulated latency; use
+        ``analyze_emotion_async`` from async code.
         """
         start_time = time.time()
-        analysis_id = str(uuid.uuid4())
+        analysis_id = new_id()
+        
+        logger.debug(
+            "Starting emotion analysis %s", analysis_id,
+            extra={"sampled": True, "analysis_id": analysis_id, "text_length": len(request.text)}
+        )
         
-        logger.info(f"Starting emotion analysis {analysis_id} for text: {request.text[:100]}...")
+        cached = self._from_cache(request, analysis_id, start_time)
+        if cached is not None:
+            return cached
         
-        response: EmotionAnalysisResponse
-        try:
-            # Simulate realistic processing time
-            processing_delay = random.uniform(0.8, 2.5)
+        # Simulate realistic processing time
+        processing_delay = self._simulated_delay()
+        if processing_delay:
             time.sleep(processing_delay)
+            metrics.observe_stage("simulated_latency", processing_delay)
+        
+        return self._analyze(request, analysis_id, start_time)
+    
+    async def analyze_emotion_async(self, request: EmotionAnalysisRequest) -> EmotionAnalysisResponse:
+        """
+        Non-blocking variant of ``analyze_emotion``.
+        
+        The simulated latency is awaited without holding the event loop, and the
+        CPU-bound scoring runs on the analyzer's bounded thread pool, batched
+        with other concurrent requests when micro-batching is enabled.
+        """
+        start_time = time.time()
+        analysis_id = new_id()
+        
+        logger.debug(
+            "Starting emotion analysis %s", analysis_id,
+            extra={"sampled": True, "analysis_id": analysis_id, "text_length": len(request.text)}
+        )
+        
+        cached = self._from_cache(request, analysis_id, start_time)
+        if cached is not None:
+            return cached
+        
+        if self.single_flight is None:
+            return await self._analyze_async(request, analysis_id, start_time)
+        
+        response, shared = await self.single_flight.run(
+            _cache_key(request),
+            lambda: self._analyze_async(request, analysis_id, start_time)
+        )
+        if not shared:
+            return response
+        return self._reissue(response, analysis_id, start_time, "coalesced with an in-flight analysis")
+    
+    async def _analyze_async(
+        self,
+        request: EmotionAnalysisRequest,
+        analysis_id: str,
+        start_time: float
+    ) -> EmotionAnalysisResponse:
+        """Simulated latency, then scoring on the thread pool or micro-batcher."""
+        processing_delay = self._simulated_delay()
+        if processing_delay:
+            await asyncio.sleep(processing_delay)
+            metrics.observe_stage("simulated_latency", processing_delay)
+        
+        if self.micro_batcher is not None:
+            return await self.micro_batcher.submit((request, analysis_id, start_time))
+        
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, self._analyze, request, analysis_id, start_time
+        )
+    
+    def analyze_scanned(
+        self,
+        text: str,
+        scan: LexiconScan,
+        include_suggestions: bool = True,
+        start_time: Optional[float] = None,
+        cache: bool = False
+    ) -> EmotionAnalysisResponse:
+        """
+        Analyze ``text`` from a lexicon scan computed elsewhere, such as a
+        live session's running scan. No latency is simulated, and the result
+        only goes into the result cache if ``cache`` is set: live sessions
+        score a new text on every keystroke, and documents are rarely sent
+        twice.
+        """
+        request = EmotionAnalysisRequest.model_construct(
+            text=text,
+            include_suggestions=include_suggestions,
+            use_real_model=False
+        )
+        request.set_lexicon_scan(scan)
+        return self._analyze(request, new_id(), start_time or time.time(), cache=cache)
+    
+    async def analyze_document_async(self, request: EmotionDocumentRequest) -> EmotionDocumentResponse:
+        """
+        Analyze a long document chunk by chunk.
+        
+        The document as a whole is scanned once, like /analyze would, so
+        phrases cut by a chunk boundary still count towards its scores and the
+        crisis check; ``CrisisContentError`` is raised before any chunk is
+        scored. Chunks, which only feed the timeline, come from a generator
+        and are scored in batches on the thread pool, at most one batch per
+        worker in flight, so memory beyond the document itself is bounded by
+        the batch size rather than the document length.
+        """
+        start_time = time.time()
+        text = request.text
+        
+        processing_delay = self._simulated_delay()
+        if processing_delay:
+            await asyncio.sleep(processing_delay)
+            metrics.observe_stage("simulated_latency", processing_delay)
+        
+        # One lexicon for the whole document, even if a reload lands meanwhile
+        lexicon = self.lexicon
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        document_scan = await loop.run_in_executor(self._executor, lexicon.scan, text)
+        metrics.observe_stage("scan", time.perf_counter() - started)
+        if document_scan.crisis:
+            raise CrisisContentError(CRISIS_MESSAGE)
+        
+        batches = batched(
+            iter_chunks(text, request.split, settings.DOCUMENT_CHUNK_MAX_CHARS),
+            settings.DOCUMENT_BATCH_SIZE
+        )
+        pending: Deque[asyncio.Future] = deque()
+        timeline: List[EmotionTimelineEntry] = []
+        scheduled = 0
+        try:
+            while True:
+                while len(pending) < settings.ANALYZER_MAX_WORKERS:
+                    batch = next(batches, None)
+                    if batch is None:
+                        break
+                    pending.append(loop.run_in_executor(
+                        self._executor, self._score_chunks, text, batch, scheduled, lexicon
+                    ))
+                    scheduled += len(batch)
+                if not pending:
+                    break
+                timeline.extend(await pending.popleft())
+        finally:
+            for future in pending:
+                future.cancel()
+        
+        analysis = self.analyze_scanned(
+            text,
+            document_scan,
+            include_suggestions=request.include_suggestions,
+            start_time=start_time
+        )
+        logger.debug(
+            "Document analysis %s completed: %d chunks", analysis.analysis_id, len(timeline),
+            extra={"sampled": True, "analysis_id": analysis.analysis_id, "text_length": len(text)}
+        )
+        return EmotionDocumentResponse(
+            analysis=analysis,
+            timeline=timeline,
+            chunks=len(timeline),
+            processing_time=round(time.time() - start_time, 3)
+        )
+    
+    def _score_chunks(
+        self,
+        text: str,
+        spans: Sequence[Span],
+        first_index: int,
+        lexicon: CompiledLexicon
+    ) -> List[EmotionTimelineEntry]:
+        """Timeline entries of one batch of chunks."""
+        texts = [text[start:end] for start, end in spans]
+        
+        started = time.perf_counter()
+        if settings.ANALYZER_BACKEND == "process":
+            try:
+                scans = self._get_scan_pool().scan(texts)
+            except RuntimeError:
+                # The pool was replaced after a lexicon reload while we were using it
+                scans = self._get_scan_pool().scan(texts)
+            scans = [
+                scan if scan.fingerprint == lexicon.fingerprint else lexicon.scan(chunk)
+                for scan, chunk in zip(scans, texts)
+            ]
+        else:
+            scans = [lexicon.scan(chunk) for chunk in texts]
+        metrics.observe_stage("scan", (time.perf_counter() - started) / len(texts), len(texts))
+        
+        started = time.perf_counter()
+        scores = get_batch_scorer(lexicon).score(
+            scans,
+            [len(chunk) for chunk in texts],
+            [self._rng_for(chunk) for chunk in texts] if settings.DETERMINISTIC_ANALYSIS else None
+        )
+        metrics.observe_stage("scoring", (time.perf_counter() - started) / len(texts), len(texts))
+        
+        return [
+            EmotionTimelineEntry(
+                index=first_index + row,
+                start=start,
+                end=end,
+                emotion=scores.emotions[row].value,
+                confidence=round(scores.confidences[row], 3),
+                emotion_intensity=scans[row].intensity
+            )
+            for row, (start, end) in enumerate(spans)
+        ]
+    
+    def _simulated_delay(self) -> float:
+        """Seconds of simulated model latency for one analysis, per ``Settings``."""
+        mode = settings.SIMULATED_LATENCY_MODE
+        if mode == "fixed":
+            return settings.SIMULATED_LATENCY_FIXED
+        if mode == "uniform":
+            return random.uniform(settings.SIMULATED_LATENCY_MIN, settings.SIMULATED_LATENCY_MAX)
+        return 0.0
+    
+    def _analyze(
+        self,
+        request: EmotionAnalysisRequest,
+        analysis_id: str,
+        start_time: float,
+        cache: bool = True
+    ) -> EmotionAnalysisResponse:
+        """Score the request, build the response and update statistics."""
+        try:
+            self._ensure_scans([request])
+            rng = self._rng_for(request.text)
             
-            # Calculate emotion scores
-            emotion_scores = self._calculate_emotion_scores(request.text)
+            # Scores and intensity both come from the single lexicon pass
+            lexicon = self.lexicon
+            scan = _scan_for(request, lexicon)
+            emotion_scores = scan.scores
             
             # Determine primary emotion
-            if max(emotion_scores.values()) == 0:
+            if request.use_real_model:
+                # Imported here so the keyword-only path never loads the classifier module
+                from app.services.classifier import get_classifier
+                with metrics.stage("model"):
+                    prediction = get_classifier().predict([request.text])[0]
+                primary_emotion = prediction.emotion
+                confidence = prediction.confidence
+                secondary_emotions = prediction.secondary_emotions
+            elif max(emotion_scores.values()) == 0:
                 # No keywords matched - use neutral with low confidence
                 primary_emotion = EmotionType.NEUTRAL
-                confidence = random.uniform(0.3, 0.5)
+                confidence = rng.uniform(0.3, 0.5)
                 secondary_emotions = []
             else:
-                # Find emotion with highest score
-                primary_emotion = max(emotion_scores, key=emotion_scores.get)
-                max_score = emotion_scores[primary_emotion]
-                
-                # Calculate confidence based on score and text length
-                base_confidence = min(0.95, 0.4 + (max_score * 0.15))
-                text_length_factor = min(1.0, len(request.text) / 100)  # Longer text = higher confidence
-                confidence = min(0.95, base_confidence + (text_length_factor * 0.1))
-                
-                # Add some randomness to make it more realistic
-                confidence += random.uniform(-0.05, 0.05)
-                confidence = max(0.3, min(0.95, confidence))
+                with metrics.stage("scoring"):
+                    # Find emotion with highest score
+                    primary_emotion = max(emotion_scores, key=emotion_scores.get)
+                    max_score = emotion_scores[primary_emotion]
+                    
+                    # Calculate confidence based on score and text length
+                    base_confidence = min(0.95, 0.4 + (max_score * 0.15))
+                    text_length_factor = min(1.0, len(request.text) / 100)  # Longer text = higher confidence
+                    confidence = min(0.95, base_confidence + (text_length_factor * 0.1))
+                    
+                    # Add some randomness to make it more realistic
+                    confidence += rng.uniform(-0.05, 0.05)
+                    confidence = max(0.3, min(0.95, confidence))
                 
                 # Get secondary emotions
-                secondary_emotions = self._get_secondary_emotions(emotion_scores, primary_emotion)
+                with metrics.stage("secondary_emotions"):
+                    secondary_emotions = self._get_secondary_emotions(emotion_scores, primary_emotion)
             
             # Determine emotion intensity
-            intensity = self._determine_intensity(request.text, primary_emotion)
+            intensity = scan.intensity
             
             # Get suggestions
             suggestions = []
             if request.include_suggestions:
-                available_suggestions = self.emotion_suggestions.get(primary_emotion, [])
-                num_suggestions = min(4, len(available_suggestions))
-                suggestions = random.sample(available_suggestions, num_suggestions)
+                with metrics.stage("suggestions"):
+                    suggestions = self._select_suggestions(primary_emotion, rng, lexicon)
             
             processing_time = time.time() - start_time
             
@@ -284,72 +380,333 @@ class EmotionAnalyzer:
                 secondary_emotions=secondary_emotions,
                 suggestions=suggestions,
                 emotion_intensity=intensity,
-                timestamp=datetime.now().isoformat(),
+                timestamp=timestamp_now(),
                 processing_time=round(processing_time, 3),
-                analysis_id=analysis_id
+                analysis_id=analysis_id,
+                lexicon_version=lexicon.version
             )
             
-            # Update statistics
-            self.analysis_count += 1
-            self.emotion_history.append((response.emotion, response.confidence)) 
-            self.total_processing_time += response.processing_time
+            self._record(response)
+            if cache and self.result_cache is not None:
+                self.result_cache.put(_cache_key(request), response)
             
-            logger.info(f"Analysis {analysis_id} completed: {response.emotion} ({response.confidence:.3f} confidence)")
+            logger.debug(
+                "Analysis %s completed: %s (%.3f confidence)", analysis_id, response.emotion, response.confidence,
+                extra={"sampled": True, "analysis_id": analysis_id, "emotion": response.emotion}
+            )
             return response
             
         except Exception as e:
-            logger.error(f"Error in emotion analysis {analysis_id}: {str(e)}")
+            logger.error("Error in emotion analysis %s: %s", analysis_id, e, extra={"analysis_id": analysis_id})
             raise
     
-    def _calculate_emotion_scores(self, text: str) -> Dict[EmotionType, float]:
-        """Calculate weighted scores for each emotion based on keywords."""
-        text_lower = text.lower()
-        emotion_scores = {}
+    def analyze_batch(
+        self,
+        items: Sequence[EmotionBatchItem],
+        start_time: Optional[float] = None
+    ) -> List[EmotionBatchItemResult]:
+        """
+        Analyze many texts with vectorized scoring.
         
-        for emotion, keyword_groups in self.emotion_keywords.items():
-            score = 0.0
-            
-            # Primary keywords (highest weight)
-            for keyword in keyword_groups.get('primary', []):
-                if keyword in text_lower:
-                    score += 3.0
-            
-            # Secondary keywords (medium weight)
-            for keyword in keyword_groups.get('secondary', []):
-                if keyword in text_lower:
-                    score += 2.0
-            
-            # Contextual keywords (lower weight)
-            for keyword in keyword_groups.get('contextual', []):
-                if keyword in text_lower:
-                    score += 1.0
-            
-            emotion_scores[emotion] = score
+        Each item is validated like an ``EmotionAnalysisRequest``; items that
+        fail validation (including crisis-keyword rejections) are returned with
+        an inline error instead of failing the batch.
+        """
+        start_time = start_time or time.time()
+        results: List[Optional[EmotionBatchItemResult]] = [None] * len(items)
+        requests: List[EmotionAnalysisRequest] = []
+        positions: List[int] = []
         
-        return emotion_scores
+        for index, item in enumerate(items):
+            try:
+                request = EmotionAnalysisRequest(
+                    text=item.text,
+                    include_suggestions=item.include_suggestions
+                )
+            except ValidationError as e:
+                results[index] = EmotionBatchItemResult(index=index, error=_validation_message(e))
+                continue
+            requests.append(request)
+            positions.append(index)
+        
+        responses = self._analyze_many(
+            requests,
+            [new_id() for _ in requests],
+            [start_time] * len(requests)
+        )
+        for position, response in zip(positions, responses):
+            results[position] = EmotionBatchItemResult(index=position, result=response)
+        
+        logger.info("Batch analysis completed: %d analyzed, %d rejected", len(requests), len(items) - len(requests))
+        return results
     
-    def _determine_intensity(self, text: str, emotion: EmotionType) -> str:
-        """Determine the intensity level of the emotion based on intensity words."""
-        text_lower = text.lower()
+    def _analyze_many(
+        self,
+        requests: Sequence[EmotionAnalysisRequest],
+        analysis_ids: Sequence[str],
+        start_times: Sequence[float]
+    ) -> List[EmotionAnalysisResponse]:
+        """
+        Score validated requests together and build their responses.
         
-        # High intensity indicators
-        high_intensity_words = [
-            'extremely', 'incredibly', 'absolutely', 'completely', 'totally',
-            'utterly', 'so much', 'overwhelming', 'intense', 'severe'
-        ]
+        Keyword-path requests go through one vectorized scoring call and
+        ``use_real_model`` requests through one classifier call.
+        """
+        self._ensure_scans(requests)
+        rngs = [self._rng_for(request.text) for request in requests]
+        # One lexicon for the whole batch, even if a reload lands meanwhile
+        lexicon = self.lexicon
+        scans = [_scan_for(request, lexicon) for request in requests]
+        keyword_rows = [i for i, request in enumerate(requests) if not request.use_real_model]
+        model_rows = [i for i, request in enumerate(requests) if request.use_real_model]
         
-        # Low intensity indicators
-        low_intensity_words = [
-            'slightly', 'somewhat', 'a little', 'kind of', 'sort of',
-            'mildly', 'barely', 'hardly', 'just a bit'
-        ]
+        primary_emotions: List[EmotionType] = [EmotionType.NEUTRAL] * len(requests)
+        confidences = [0.0] * len(requests)
+        secondary_emotions: List[List[str]] = [[] for _ in requests]
         
-        if any(word in text_lower for word in high_intensity_words):
-            return "high"
-        elif any(word in text_lower for word in low_intensity_words):
-            return "low"
-        else:
-            return "medium"
+        # Batched stages are recorded as the per-analysis share of the batch's time
+        started = time.perf_counter()
+        scores = get_batch_scorer(lexicon).score(
+            [scans[i] for i in keyword_rows],
+            [len(requests[i].text) for i in keyword_rows],
+            [rngs[i] for i in keyword_rows] if settings.DETERMINISTIC_ANALYSIS else None
+        )
+        if keyword_rows:
+            # Primary emotion, confidence and secondary emotions in one vectorized pass
+            metrics.observe_stage("scoring", (time.perf_counter() - started) / len(keyword_rows), len(keyword_rows))
+        for row, i in enumerate(keyword_rows):
+            primary_emotions[i] = scores.emotions[row]
+            confidences[i] = scores.confidences[row]
+            secondary_emotions[i] = scores.secondary_emotions[row]
+        
+        if model_rows:
+            from app.services.classifier import get_classifier
+            started = time.perf_counter()
+            predictions = get_classifier().predict([requests[i].text for i in model_rows])
+            metrics.observe_stage("model", (time.perf_counter() - started) / len(model_rows), len(model_rows))
+            for i, prediction in zip(model_rows, predictions):
+                primary_emotions[i] = prediction.emotion
+                confidences[i] = prediction.confidence
+                secondary_emotions[i] = prediction.secondary_emotions
+        
+        responses = []
+        for i, request in enumerate(requests):
+            suggestions = []
+            if request.include_suggestions:
+                with metrics.stage("suggestions"):
+                    suggestions = self._select_suggestions(primary_emotions[i], rngs[i], lexicon)
+            
+            response = EmotionAnalysisResponse(
+                emotion=primary_emotions[i].value,
+                confidence=round(confidences[i], 3),
+                secondary_emotions=secondary_emotions[i],
+                suggestions=suggestions,
+                emotion_intensity=scans[i].intensity,
+                timestamp=timestamp_now(),
+                processing_time=round(time.time() - start_times[i], 3),
+                analysis_id=analysis_ids[i],
+                lexicon_version=lexicon.version
+            )
+            self._record(response)
+            if self.result_cache is not None:
+                self.result_cache.put(_cache_key(request), response)
+            responses.append(response)
+        return responses
+    
+    def _analyze_queued(
+        self,
+        items: List[Tuple[EmotionAnalysisRequest, str, float]]
+    ) -> List[EmotionAnalysisResponse]:
+        """Score one micro-batch of ``(request, analysis_id, start_time)`` items."""
+        requests, analysis_ids, start_times = zip(*items)
+        responses = self._analyze_many(requests, analysis_ids, start_times)
+        for response in responses:
+            logger.debug(
+                "Analysis %s completed: %s (%.3f confidence)",
+                response.analysis_id, response.emotion, response.confidence,
+                extra={"sampled": True, "analysis_id": response.analysis_id, "emotion": response.emotion}
+            )
+        return responses
+    
+    async def analyze_batch_async(
+        self,
+        items: Sequence[EmotionBatchItem],
+        simulate_latency: bool = True
+    ) -> List[EmotionBatchItemResult]:
+        """Non-blocking variant of ``analyze_batch``; the simulated latency applies once per batch."""
+        start_time = time.time()
+        
+        processing_delay = self._simulated_delay() if simulate_latency else 0.0
+        if processing_delay:
+            await asyncio.sleep(processing_delay)
+        
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.analyze_batch, items, start_time)
+    
+    def _ensure_scans(self, requests: Sequence[EmotionAnalysisRequest]) -> None:
+        """Run deferred lexicon scans on the process pool, if that backend is active."""
+        if settings.ANALYZER_BACKEND != "process":
+            return
+        pending = [request for request in requests if not request.is_scanned]
+        if not pending:
+            return
+        texts = [request.text for request in pending]
+        started = time.perf_counter()
+        try:
+            scans = self._get_scan_pool().scan(texts)
+        except RuntimeError:
+            # The pool was replaced after a lexicon reload while we were using it
+            scans = self._get_scan_pool().scan(texts)
+        metrics.observe_stage("scan", (time.perf_counter() - started) / len(texts), len(texts))
+        for request, scan in zip(pending, scans):
+            request.set_lexicon_scan(scan)
+    
+    def _get_scan_pool(self) -> ProcessScanPool:
+        """Process pool for the current lexicon, replaced when the lexicon changes."""
+        lexicon = self.lexicon
+        retired = None
+        with self._scan_pool_lock:
+            if self._scan_pool is None or self._scan_pool.lexicon is not lexicon:
+                retired = self._scan_pool
+                self._scan_pool = ProcessScanPool(
+                    lexicon,
+                    workers=settings.PROCESS_POOL_WORKERS,
+                    chunk_size=settings.PROCESS_POOL_CHUNK_SIZE
+                )
+            pool = self._scan_pool
+        if retired is not None:
+            # Let scans already running on the old pool finish
+            retired.close()
+        return pool
+    
+    def warm_up(self) -> None:
+        """Build everything the first request would otherwise wait for."""
+        lexicon = self.lexicon
+        scorer = get_batch_scorer(lexicon)
+        if settings.ANALYZER_BACKEND == "process":
+            # Starts the worker processes and shares the lexicon with them
+            self._get_scan_pool().scan(["warming up"])
+        if settings.WARMUP_CLASSIFIER:
+            from app.services.classifier import get_classifier
+            get_classifier()
+        # One validation and scoring pass, without recording stats
+        request = EmotionAnalysisRequest(text="Warming up the emotion analyzer")
+        scorer.score([_scan_for(request, lexicon)], [len(request.text)], None)
+    
+    def close(self) -> None:
+        """Stop the worker threads and processes."""
+        with self._scan_pool_lock:
+            if self._scan_pool is not None:
+                self._scan_pool.close()
+                self._scan_pool = None
+        self._executor.shutdown(wait=False)
+        self.stats.close()
+    
+    def _select_suggestions(
+        self,
+        emotion: EmotionType,
+        rng: random.Random,
+        lexicon: Optional[CompiledLexicon] = None
+    ) -> List[str]:
+        """Pick up to four suggestions for an emotion."""
+        available_suggestions = (lexicon or self.lexicon).suggestions.get(emotion, [])
+        num_suggestions = min(4, len(available_suggestions))
+        return rng.sample(available_suggestions, num_suggestions)
+    
+    def _rng_for(self, text: str) -> random.Random:
+        """
+        Randomness source for one analysis.
+        
+        In deterministic mode it is seeded from a hash of the normalized text,
+        so identical texts always get identical confidence and suggestions.
+        """
+        if not settings.DETERMINISTIC_ANALYSIS:
+            return _shared_rng
+        return random.Random(int.from_bytes(_normalized_digest(text), 'big'))
+    
+    def _from_cache(
+        self,
+        request: EmotionAnalysisRequest,
+        analysis_id: str,
+        start_time: float
+    ) -> Optional[EmotionAnalysisResponse]:
+        """Cached result for an identical earlier request, with fresh id and timestamp."""
+        if self.result_cache is None:
+            return None
+        cached = self.result_cache.get(_cache_key(request))
+        if cached is None:
+            return None
+        return self._reissue(cached, analysis_id, start_time, "served from cache")
+    
+    def _reissue(
+        self,
+        response: EmotionAnalysisResponse,
+        analysis_id: str,
+        start_time: float,
+        source: str
+    ) -> EmotionAnalysisResponse:
+        """Another request's result with fresh id and timestamp, counted in stats."""
+        response = response.model_copy(update={
+            'analysis_id': analysis_id,
+            'timestamp': timestamp_now(),
+            'processing_time': round(time.time() - start_time, 3)
+        })
+        self._record(response)
+        logger.debug(
+            "Analysis %s %s: %s", analysis_id, source, response.emotion,
+            extra={"sampled": True, "analysis_id": analysis_id, "emotion": response.emotion}
+        )
+        return response
+    
+    def get_cache_stats(self) -> CacheStats:
+        """Get result cache counters."""
+        if self.result_cache is None:
+            return CacheStats(enabled=False)
+        return self.result_cache.stats()
+    
+    def get_single_flight_stats(self) -> SingleFlightStats:
+        """Get counters of identical concurrent requests sharing one analysis."""
+        if self.single_flight is None:
+            return SingleFlightStats(enabled=False)
+        return self.single_flight.stats()
+    
+    def get_micro_batch_stats(self) -> MicroBatchStats:
+        """Get micro-batching queue depth, batch sizes and queuing delay."""
+        if self.micro_batcher is None:
+            return MicroBatchStats(enabled=False)
+        return self.micro_batcher.stats()
+    
+    def _record(self, response: EmotionAnalysisResponse) -> None:
+        """Update statistics; safe to call from concurrent analyses."""
+        self.stats.record(response.emotion, response.confidence, response.processing_time)
+    
+    @property
+    def analysis_count(self) -> int:
+        """Total number of analyses performed"""
+        return self.stats.total
+    
+    @property
+    def lexicon(self) -> CompiledLexicon:
+        """Compiled keyword, intensity and crisis matcher"""
+        return get_lexicon()
+    
+    @property
+    def emotion_keywords(self) -> Dict[EmotionType, Dict[str, List[str]]]:
+        """Emotion keywords by tier, from the current lexicon"""
+        return self.lexicon.emotion_keywords
+    
+    @property
+    def emotion_suggestions(self) -> Dict[EmotionType, List[str]]:
+        """Contextual suggestions for each emotion, from the current lexicon"""
+        return self.lexicon.suggestions
+    
+    def _calculate_emotion_scores(self, text: str) -> Dict[EmotionType, float]:
+        """Calculate weighted scores for each emotion based on keywords."""
+        return self.lexicon.scan(text).scores
+    
+    def _determine_intensity(self, text: str, emotion: EmotionType) -> str:
+        """Determine the intensity level of the emotion based on intensity words."""
+        return self.lexicon.scan(text).intensity
     
     def _get_secondary_emotions(self, emotion_scores: Dict[EmotionType, float], primary_emotion: EmotionType) -> List[str]:
         """Get secondary emotions based on scores, excluding the primary emotion."""
@@ -365,29 +722,91 @@ class EmotionAnalyzer:
     
     def get_stats(self) -> EmotionStats:
         """Get analysis statistics including total analyses, most common emotion, and average processing time."""
-        if not self.emotion_history:
-            return EmotionStats(
-                total_analyses=0,
-                most_common_emotion="None",
-                average_confidence=0.0,
-                processing_time_avg=0.0
+        return self.stats.snapshot().model_copy(update={'lexicon_version': self.lexicon.version})
+    
+    def get_window_stats(self, window_seconds: int, label: str) -> EmotionWindowStats:
+        """Get latency percentiles, request rate and emotion distribution for a recent window."""
+        stats = self.stats.window_snapshot(window_seconds, label)
+        return stats.model_copy(update={'lexicon_version': self.lexicon.version})
+
+def _create_stats():
+    """Stats for this process, or shared by all workers with STATS_BACKEND=shared."""
+    if settings.STATS_BACKEND == "shared":
+        from app.services.shared_stats import SharedStatsAggregator, default_stats_path
+        try:
+            return SharedStatsAggregator(
+                settings.STATS_SHARED_PATH or default_stats_path(),
+                max_workers=settings.STATS_SHARED_MAX_WORKERS,
+                persistent=bool(settings.STATS_SHARED_PATH),
+                history_size=settings.STATS_HISTORY_SIZE,
+                window_slot_seconds=settings.STATS_WINDOW_SLOT_SECONDS,
+                window_max_seconds=settings.STATS_WINDOW_MAX_SECONDS
             )
-        
-        # Extract just the emotion values for counting
-        emotion_values = [item[0] for item in self.emotion_history]
-        emotion_counter = Counter(emotion_values)
-        most_common = emotion_counter.most_common(1)[0][0]
+        except (OSError, RuntimeError) as e:
+            logger.error("Shared stats unavailable, keeping stats per process: %s", e)
+    return StatsAggregator(
+        history_size=settings.STATS_HISTORY_SIZE,
+        window_slot_seconds=settings.STATS_WINDOW_SLOT_SECONDS,
+        window_max_seconds=settings.STATS_WINDOW_MAX_SECONDS
+    )
 
-        # Calculate average confidence from stored values
-        total_confidence = sum(item[1] for item in self.emotion_history)
-        average_confidence = total_confidence / len(self.emotion_history)
-        
-        return EmotionStats(
-            total_analyses=self.analysis_count,
-            most_common_emotion=most_common,
-            average_confidence=round(average_confidence, 3),
-            processing_time_avg=round(self.total_processing_time / self.analysis_count, 3)
-        )
+def _normalize(text: str) -> str:
+    """Normalized form of a text; analyses only depend on this and the text length."""
+    return text.strip().lower()
+
+def _normalized_digest(text: str) -> bytes:
+    """
+    Hash of ``_normalize(text)``, computed in slices so that a long document
+    is never copied whole.
+    """
+    digest = hashlib.blake2b(digest_size=8)
+    start, end = 0, len(text)
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    for offset in range(start, end, _DIGEST_SLICE):
+        digest.update(text[offset:min(end, offset + _DIGEST_SLICE)].lower().encode('utf-8'))
+    return digest.digest()
+
+def _cache_key(request: EmotionAnalysisRequest) -> Hashable:
+    return (
+        get_lexicon().fingerprint,
+        _normalize(request.text),
+        len(request.text),
+        request.include_suggestions,
+        request.use_real_model
+    )
+
+def _scan_for(request: EmotionAnalysisRequest, lexicon: CompiledLexicon) -> LexiconScan:
+    """The request's lexicon scan, redone if it was made with a different lexicon."""
+    scan = request.lexicon_scan
+    if scan.fingerprint != lexicon.fingerprint:
+        with metrics.stage("scan"):
+            scan = lexicon.scan(request.text)
+        request.set_lexicon_scan(scan)
+    return scan
+
+def _validation_message(error: ValidationError) -> str:
+    """Human-readable message for the first error of a failed validation."""
+    detail = error.errors()[0]
+    cause = detail.get('ctx', {}).get('error')
+    return str(cause) if cause else detail['msg']
+
+# Shared instance, built on first use or by the startup warm-up
+_emotion_analyzer: Optional[EmotionAnalyzer] = None
+_emotion_analyzer_lock = threading.Lock()
+
+def get_emotion_analyzer() -> EmotionAnalyzer:
+    """Get the shared analyzer, creating it on first use."""
+    global _emotion_analyzer
+    if _emotion_analyzer is None:
+        with _emotion_analyzer_lock:
+            if _emotion_analyzer is None:
+                _emotion_analyzer = EmotionAnalyzer()
+    return _emotion_analyzer
 
-# Create singleton instance
-emotion_analyzer = EmotionAnalyzer()
+def close_emotion_analyzer() -> None:
+    """Close the shared analyzer, if it was ever created."""
+    if _emotion_analyzer is not None:
+        _emotion_analyzer.close()
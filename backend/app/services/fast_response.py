@@ -0,0 +1,197 @@
+# backend/app/services/fast_response.py
+"""
+Fast paths for building and encoding API responses.
+
+Routes return encoded bytes in a plain ``Response``, which FastAPI sends as
+is: the declared ``response_model`` still documents the schema, but the
+result is not validated and serialized a second time. Analysis responses
+are assembled from cached byte fragments, since emotion names, suggestion
+lists and intensities repeat across requests and only the confidence,
+timestamp, timing and id change.
+
+Read-mostly endpoints are served from ``JSONSnapshot``s: bodies encoded once
+and reused until their content changes, with a strong ETag so that
+conditional requests are answered with 304 and no body.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from functools import lru_cache
+from typing import Callable, Hashable, NamedTuple, Optional, Tuple
+
+from starlette.responses import Response
+
+from app.models.emotion import EmotionAnalysisResponse, EmotionType
+
+# Field order the fragments below are written in; if the model changes,
+# ``encode_analysis_response`` falls back to pydantic until they are updated
+_ANALYSIS_FIELDS = (
+    "emotion", "confidence", "secondary_emotions", "suggestions", "emotion_intensity",
+    "timestamp", "processing_time", "analysis_id", "lexicon_version"
+)
+_FRAGMENTS_MATCH_MODEL = tuple(EmotionAnalysisResponse.model_fields) == _ANALYSIS_FIELDS
+
+# Random bytes for ids, read from os.urandom in batches of _ID_BATCH ids;
+# dropped in forked workers so that no two processes hand out the same ids
+_ID_BATCH = 256
+_id_bytes = b""
+_id_offset = 0
+_id_lock = threading.Lock()
+
+
+def _reset_ids() -> None:
+    global _id_bytes, _id_offset, _id_lock
+    _id_bytes, _id_offset, _id_lock = b"", 0, threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_ids)
+
+# Local time of the current second, formatted once per second
+_second: Tuple[int, str] = (-1, "")
+
+SUPPORTED_EMOTIONS_JSON = json.dumps(
+    [emotion.value for emotion in EmotionType], ensure_ascii=False, separators=(",", ":")
+).encode("utf-8")
+
+
+class JSONSnapshot(NamedTuple):
+    """An encoded JSON body, its ETag, and what it was built from"""
+    body: bytes
+    etag: str
+    key: Hashable = None
+    # time.monotonic() when the body was last known to be current
+    checked: float = 0.0
+
+
+def make_snapshot(body: bytes, key: Hashable = None) -> JSONSnapshot:
+    """Snapshot of ``body`` with a strong ETag derived from its bytes."""
+    etag = '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+    return JSONSnapshot(body, etag, key, time.monotonic())
+
+
+class RefreshingSnapshot:
+    """
+    A snapshot rebuilt when its key changes.
+
+    The key is checked at most once per ``interval`` seconds; in between the
+    snapshot is served as is, so a change shows up within ``interval``.
+    Only the event loop thread may call ``get``.
+    """
+
+    def __init__(self, interval: float = 0.0):
+        self.interval = interval
+        self.builds = 0
+        self._snapshot: Optional[JSONSnapshot] = None
+
+    def get(self, key: Callable[[], Hashable], build: Callable[[], bytes]) -> JSONSnapshot:
+        snapshot = self._snapshot
+        now = time.monotonic()
+        if snapshot is not None and now - snapshot.checked < self.interval:
+            return snapshot
+        current = key()
+        if snapshot is not None and current == snapshot.key:
+            snapshot = snapshot._replace(checked=now)
+        else:
+            snapshot = make_snapshot(build(), current)
+            self.builds += 1
+        self._snapshot = snapshot
+        return snapshot
+
+
+SUPPORTED_EMOTIONS_SNAPSHOT = make_snapshot(SUPPORTED_EMOTIONS_JSON)
+
+
+def new_id() -> str:
+    """A random version 4 UUID string, like ``str(uuid.uuid4())``."""
+    global _id_bytes, _id_offset
+    with _id_lock:
+        offset = _id_offset
+        if offset == len(_id_bytes):
+            _id_bytes, offset = os.urandom(16 * _ID_BATCH), 0
+        _id_offset = offset + 16
+        value = int.from_bytes(_id_bytes[offset:offset + 16], "big")
+    # Version 4, RFC 4122 variant
+    value = (value & ~(0xF000 << 64) & ~(0xC000 << 48)) | (0x4000 << 64) | (0x8000 << 48)
+    digits = "%032x" % value
+    return f"{digits[:8]}-{digits[8:12]}-{digits[12:16]}-{digits[16:20]}-{digits[20:]}"
+
+
+def timestamp_now() -> str:
+    """Current local time in ISO 8601 with microseconds, like ``datetime.now().isoformat()``."""
+    global _second
+    now = time.time()
+    second = int(now)
+    cached = _second
+    if cached[0] != second:
+        cached = _second = (second, datetime.fromtimestamp(second).isoformat())
+    return f"{cached[1]}.{int((now - second) * 1_000_000):06d}"
+
+
+@lru_cache(maxsize=4096)
+def _string(value: str) -> bytes:
+    return json.dumps(value, ensure_ascii=False).encode("utf-8")
+
+
+@lru_cache(maxsize=64)
+def _head(emotion: str) -> bytes:
+    return b'{"emotion":' + _string(emotion) + b',"confidence":'
+
+
+@lru_cache(maxsize=4096)
+def _middle(secondary_emotions: Tuple[str, ...], suggestions: Tuple[str, ...], intensity: str) -> bytes:
+    return b"".join((
+        b',"secondary_emotions":[', b",".join(map(_string, secondary_emotions)),
+        b'],"suggestions":[', b",".join(map(_string, suggestions)),
+        b'],"emotion_intensity":', _string(intensity),
+        b',"timestamp":"',
+    ))
+
+
+@lru_cache(maxsize=64)
+def _tail(lexicon_version: Optional[str]) -> bytes:
+    version = b"null" if lexicon_version is None else _string(lexicon_version)
+    return b'","lexicon_version":' + version + b"}"
+
+
+def encode_analysis_response(response: EmotionAnalysisResponse) -> bytes:
+    """JSON for ``response``, the same document ``model_dump_json`` produces."""
+    if not _FRAGMENTS_MATCH_MODEL:
+        return response.model_dump_json().encode("utf-8")
+    return b"".join((
+        _head(response.emotion),
+        repr(float(response.confidence)).encode("ascii"),
+        _middle(tuple(response.secondary_emotions), tuple(response.suggestions), response.emotion_intensity),
+        # Timestamps and ids are unique and never need escaping
+        response.timestamp.encode("ascii"),
+        b'","processing_time":', repr(float(response.processing_time)).encode("ascii"),
+        b',"analysis_id":"', response.analysis_id.encode("ascii"),
+        _tail(response.lexicon_version),
+    ))
+
+
+def json_response(content: bytes) -> Response:
+    """Already-encoded JSON, passed through FastAPI without re-validation."""
+    return Response(content=content, media_type="application/json")
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Whether an If-None-Match header lists ``etag``, compared weakly as RFC 9110 requires."""
+    if if_none_match.strip() == "*":
+        return True
+    return any(candidate.strip().removeprefix("W/") == etag for candidate in if_none_match.split(","))
+
+
+def snapshot_response(
+    snapshot: JSONSnapshot,
+    if_none_match: Optional[str],
+    cache_control: str,
+    status_code: int = 200
+) -> Response:
+    """The snapshot's body, or an empty 304 if the client already has it."""
+    headers = {"ETag": snapshot.etag, "Cache-Control": cache_control}
+    if status_code == 200 and if_none_match and etag_matches(if_none_match, snapshot.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=snapshot.body, status_code=status_code, media_type="application/json", headers=headers)
@@ -0,0 +1,426 @@
+# backend/app/services/jobs.py
+"""
+Asynchronous analysis jobs, persisted in SQLite.
+
+Submitting a job writes its texts to the database and returns at once; the
+queue is the set of queued rows, so waiting jobs hold no memory, and at most
+``max_queued`` of them may wait. Worker tasks claim jobs one at a time and
+analyze them in chunks with ``EmotionAnalyzer.analyze_batch_async``; each
+chunk's results are committed together with the job's progress.
+
+A claimed job is leased: its worker renews the lease while a chunk is being
+analyzed and when it commits one, and a job whose lease ran out (its worker
+stopped or crashed) is claimed again and continues after its last committed
+chunk. This also holds across restarts
+and between the worker processes of one server sharing the database.
+Finished jobs are deleted ``ttl`` seconds after they finish.
+"""
+import asyncio
+import sqlite3
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Awaitable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.models.emotion import (
+    EmotionAnalysisResponse,
+    EmotionBatchItem,
+    EmotionBatchItemResult,
+    EmotionJobResponse,
+    EmotionJobStatus
+)
+from app.services.fast_response import encode_analysis_response
+
+logger = get_logger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    total INTEGER NOT NULL,
+    processed INTEGER NOT NULL DEFAULT 0,
+    succeeded INTEGER NOT NULL DEFAULT 0,
+    failed INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    created REAL NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_by_status ON jobs (status, created);
+CREATE TABLE IF NOT EXISTS job_items (
+    job_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    include_suggestions INTEGER NOT NULL,
+    result TEXT,
+    error TEXT,
+    PRIMARY KEY (job_id, position)
+) WITHOUT ROWID;
+"""
+
+FINISHED = ("completed", "failed")
+
+
+class JobQueueFull(Exception):
+    """Too many jobs are already waiting"""
+
+
+class JobLost(Exception):
+    """Another worker took over the job after this one's lease ran out"""
+
+
+class JobRecord(NamedTuple):
+    """One row of the jobs table"""
+    id: str
+    status: str
+    total: int
+    processed: int
+    succeeded: int
+    failed: int
+    error: Optional[str]
+    created: float
+    updated: float
+
+    def to_status(self, ttl: int) -> EmotionJobStatus:
+        expires = self.updated + ttl if self.status in FINISHED else None
+        return EmotionJobStatus(
+            job_id=self.id,
+            status=self.status,
+            total=self.total,
+            processed=self.processed,
+            succeeded=self.succeeded,
+            failed=self.failed,
+            error=self.error,
+            created_at=datetime.fromtimestamp(self.created).isoformat(),
+            updated_at=datetime.fromtimestamp(self.updated).isoformat(),
+            expires_at=datetime.fromtimestamp(expires).isoformat() if expires else None
+        )
+
+
+class JobStore:
+    """Jobs and their items in one SQLite file; used from a single thread"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Transactions are opened explicitly, see ``_transaction``
+        self._db = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        # IMMEDIATE takes the write lock up front, so checks and the writes
+        # depending on them are atomic across processes
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            yield self._db
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        self._db.execute("COMMIT")
+
+    def create(self, items: Sequence[EmotionBatchItem], max_queued: int) -> JobRecord:
+        """Store a new queued job; raises ``JobQueueFull`` if ``max_queued`` are waiting."""
+        now = time.time()
+        job = JobRecord(uuid.uuid4().hex, "queued", len(items), 0, 0, 0, None, now, now)
+        with self._transaction() as db:
+            (queued,) = db.execute("SELECT COUNT(*) FROM jobs WHERE status = 'queued'").fetchone()
+            if queued >= max_queued:
+                raise JobQueueFull(f"{queued} jobs are already waiting")
+            db.execute("INSERT INTO jobs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", job)
+            db.executemany(
+                "INSERT INTO job_items (job_id, position, text, include_suggestions) VALUES (?, ?, ?, ?)",
+                ((job.id, position, item.text, item.include_suggestions) for position, item in enumerate(items))
+            )
+        return job
+
+    def get(self, job_id: str) -> Optional[JobRecord]:
+        row = self._db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return JobRecord(*row) if row else None
+
+    def claim(self, lease: float) -> Optional[JobRecord]:
+        """Take the oldest queued job, or a running one whose lease ran out."""
+        now = time.time()
+        with self._transaction() as db:
+            row = db.execute(
+                "SELECT * FROM jobs WHERE status = 'queued' OR (status = 'running' AND updated < ?)"
+                " ORDER BY created LIMIT 1",
+                (now - lease,)
+            ).fetchone()
+            if row is None:
+                return None
+            db.execute("UPDATE jobs SET status = 'running', updated = ? WHERE id = ?", (now, row[0]))
+        return JobRecord(*row)._replace(status="running", updated=now)
+
+    def pending_items(self, job_id: str, start: int, limit: int) -> List[Tuple[int, str, bool]]:
+        """``(position, text, include_suggestions)`` of the next unprocessed items."""
+        rows = self._db.execute(
+            "SELECT position, text, include_suggestions FROM job_items"
+            " WHERE job_id = ? AND position >= ? ORDER BY position LIMIT ?",
+            (job_id, start, limit)
+        ).fetchall()
+        return [(position, text, bool(suggestions)) for position, text, suggestions in rows]
+
+    def save_chunk(
+        self,
+        job: JobRecord,
+        results: Sequence[Tuple[int, Optional[str], Optional[str]]]
+    ) -> JobRecord:
+        """
+        Store ``(position, result JSON, error)`` of a chunk and advance the job;
+        raises ``JobLost`` if another worker advanced it meanwhile.
+        """
+        failed = sum(1 for _, result, _ in results if result is None)
+        processed = job.processed + len(results)
+        job = job._replace(
+            status="completed" if processed >= job.total else "running",
+            processed=processed,
+            succeeded=job.succeeded + len(results) - failed,
+            failed=job.failed + failed,
+            updated=time.time()
+        )
+        with self._transaction() as db:
+            cursor = db.execute(
+                "UPDATE jobs SET status = ?, processed = ?, succeeded = ?, failed = ?, updated = ?"
+                " WHERE id = ? AND status = 'running' AND processed = ?",
+                (job.status, job.processed, job.succeeded, job.failed, job.updated,
+                 job.id, processed - len(results))
+            )
+            if cursor.rowcount != 1:
+                raise JobLost(job.id)
+            db.executemany(
+                "UPDATE job_items SET result = ?, error = ? WHERE job_id = ? AND position = ?",
+                ((result, error, job.id, position) for position, result, error in results)
+            )
+        return job
+
+    def renew(self, job: JobRecord) -> JobRecord:
+        """Extend the lease on ``job``; raises ``JobLost`` if another worker took it over."""
+        now = time.time()
+        with self._transaction() as db:
+            cursor = db.execute(
+                "UPDATE jobs SET updated = ? WHERE id = ? AND status = 'running' AND processed = ?",
+                (now, job.id, job.processed)
+            )
+            if cursor.rowcount != 1:
+                raise JobLost(job.id)
+        return job._replace(updated=now)
+
+    def fail(self, job: JobRecord, error: str) -> bool:
+        """Mark ``job`` failed unless another worker took it over; returns whether it did."""
+        with self._transaction() as db:
+            cursor = db.execute(
+                "UPDATE jobs SET status = 'failed', error = ?, updated = ?"
+                " WHERE id = ? AND status = 'running' AND processed = ?",
+                (error, time.time(), job.id, job.processed)
+            )
+        return cursor.rowcount == 1
+
+    def results(self, job_id: str, offset: int, limit: int) -> List[Tuple[int, Optional[str], Optional[str]]]:
+        """``(position, result JSON, error)`` of processed items from ``offset``."""
+        return self._db.execute(
+            "SELECT position, result, error FROM job_items"
+            " WHERE job_id = ? AND position >= ? AND (result IS NOT NULL OR error IS NOT NULL)"
+            " ORDER BY position LIMIT ?",
+            (job_id, offset, limit)
+        ).fetchall()
+
+    def delete_finished(self, before: float) -> int:
+        """Delete jobs that finished before ``before``; returns how many."""
+        with self._transaction() as db:
+            expired = [
+                job_id for (job_id,) in db.execute(
+                    "SELECT id FROM jobs WHERE status IN (?, ?) AND updated < ?", (*FINISHED, before)
+                )
+            ]
+            db.executemany("DELETE FROM job_items WHERE job_id = ?", ((job_id,) for job_id in expired))
+            db.executemany("DELETE FROM jobs WHERE id = ?", ((job_id,) for job_id in expired))
+        return len(expired)
+
+    def close(self) -> None:
+        self._db.close()
+
+
+class JobManager:
+    """Accepts jobs and runs ``workers`` tasks that process them in the background"""
+
+    def __init__(
+        self,
+        path: Path,
+        workers: int = 2,
+        chunk_size: int = 500,
+        max_queued: int = 100,
+        ttl: int = 86400,
+        lease: float = 60.0,
+        poll_interval: float = 1.0,
+        gc_interval: float = 300.0
+    ):
+        self.path = Path(path)
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.max_queued = max_queued
+        self.ttl = ttl
+        self.lease = lease
+        self.poll_interval = poll_interval
+        self.gc_interval = gc_interval
+        self.store: Optional[JobStore] = None
+        # Every database call runs on this one thread, off the event loop
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="emotion-jobs")
+        self._submitted: Optional[asyncio.Event] = None
+        self._tasks: List[asyncio.Task] = []
+
+    async def _call(self, method, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, method, *args)
+
+    async def start(self) -> None:
+        if self.store is not None:
+            return
+        self.store = await self._call(JobStore, self.path)
+        self._submitted = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        self._tasks = [loop.create_task(self._work()) for _ in range(self.workers)]
+        self._tasks.append(loop.create_task(self._collect_garbage()))
+        logger.info("Job queue started: %d workers, database %s", self.workers, self.path)
+
+    async def stop(self) -> None:
+        if self.store is None:
+            return
+        for task in self._tasks:
+            task.cancel()
+        # Interrupted chunks are not committed; their jobs resume once the lease runs out
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        store, self.store = self.store, None
+        await self._call(store.close)
+
+    def _store(self) -> JobStore:
+        if self.store is None:
+            raise RuntimeError("Job queue is not running")
+        return self.store
+
+    async def submit(self, items: Sequence[EmotionBatchItem]) -> EmotionJobStatus:
+        """Queue a job for ``items``; raises ``JobQueueFull`` when too many are waiting."""
+        job = await self._call(self._store().create, items, self.max_queued)
+        self._submitted.set()
+        return job.to_status(self.ttl)
+
+    async def get(self, job_id: str, offset: int, limit: int) -> Optional[EmotionJobResponse]:
+        """Status of a job and a page of its results, or None if there is no such job."""
+        store = self._store()
+        job = await self._call(store.get, job_id)
+        if job is None:
+            return None
+        rows = await self._call(store.results, job_id, offset, limit)
+        results = [
+            EmotionBatchItemResult(
+                index=position,
+                result=EmotionAnalysisResponse.model_validate_json(result) if result is not None else None,
+                error=error
+            )
+            for position, result, error in rows
+        ]
+        end = offset + len(results)
+        return EmotionJobResponse(
+            **job.to_status(self.ttl).model_dump(),
+            offset=offset,
+            results=results,
+            next_offset=end if end < job.total else None
+        )
+
+    async def _work(self) -> None:
+        while True:
+            try:
+                job = await self._call(self.store.claim, self.lease)
+                if job is not None:
+                    await self._run(job)
+                    continue
+            except sqlite3.Error as e:
+                logger.error("Job database error: %s", e)
+            # Woken early by local submissions; other processes' jobs are found by polling
+            try:
+                await asyncio.wait_for(self._submitted.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._submitted.clear()
+
+    async def _run(self, job: JobRecord) -> None:
+        # Imported here so that importing the routes does not load the analyzer
+        from app.services.emotion_analyzer import get_emotion_analyzer
+
+        logger.info("Job %s started at item %d of %d", job.id, job.processed, job.total, extra={"job_id": job.id})
+        started = time.perf_counter()
+        try:
+            analyzer = get_emotion_analyzer()
+            while job.processed < job.total:
+                rows = await self._call(self.store.pending_items, job.id, job.processed, self.chunk_size)
+                items = [
+                    EmotionBatchItem(text=text, include_suggestions=include_suggestions)
+                    for _, text, include_suggestions in rows
+                ]
+                job, outcomes = await self._analyze_leased(
+                    job, analyzer.analyze_batch_async(items, simulate_latency=False)
+                )
+                job = await self._call(self.store.save_chunk, job, [
+                    (
+                        position,
+                        encode_analysis_response(outcome.result).decode("utf-8") if outcome.result else None,
+                        outcome.error
+                    )
+                    for (position, _, _), outcome in zip(rows, outcomes)
+                ])
+        except JobLost:
+            logger.warning("Job %s was taken over by another worker", job.id, extra={"job_id": job.id})
+            return
+        except Exception as e:
+            logger.error("Job %s failed: %s", job.id, e, extra={"job_id": job.id})
+            if not await self._call(self.store.fail, job, "Internal error while analyzing the job"):
+                logger.warning("Job %s was taken over by another worker", job.id, extra={"job_id": job.id})
+            return
+        logger.info(
+            "Job %s completed in %.3fs: %d analyzed, %d rejected",
+            job.id, time.perf_counter() - started, job.succeeded, job.failed,
+            extra={"job_id": job.id}
+        )
+
+    async def _analyze_leased(self, job: JobRecord, analysis: Awaitable[list]) -> Tuple[JobRecord, list]:
+        """
+        Await ``analysis`` while renewing the lease on ``job`` a few times per
+        lease period, so a slow chunk is not mistaken for a dead worker.
+        """
+        task = asyncio.ensure_future(analysis)
+        try:
+            while True:
+                done, _ = await asyncio.wait({task}, timeout=self.lease / 3)
+                if done:
+                    return job, task.result()
+                job = await self._call(self.store.renew, job)
+        finally:
+            task.cancel()
+
+    async def _collect_garbage(self) -> None:
+        while True:
+            try:
+                deleted = await self._call(self.store.delete_finished, time.time() - self.ttl)
+                if deleted:
+                    logger.info("Deleted %d expired jobs", deleted)
+            except sqlite3.Error as e:
+                logger.error("Deleting expired jobs failed: %s", e)
+            await asyncio.sleep(self.gc_interval)
+
+
+# Started by the app on startup
+job_manager = JobManager(
+    Path(settings.JOBS_DB_PATH),
+    workers=settings.JOBS_WORKERS,
+    chunk_size=settings.JOBS_CHUNK_SIZE,
+    max_queued=settings.JOBS_MAX_QUEUED,
+    ttl=settings.JOBS_TTL_SECONDS,
+    lease=settings.JOBS_LEASE_SECONDS,
+    gc_interval=settings.JOBS_GC_INTERVAL
+)
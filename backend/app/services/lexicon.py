@@ -0,0 +1,417 @@
+# backend/app/services/lexicon.py
+"""
+Compiled emotion lexicon.
+
+Keywords, intensity words, crisis phrases and suggestions are read from a
+lexicon file (``app/data/lexicon.json`` by default, JSON or TOML).
+
+All keyword, intensity and crisis phrases are compiled once into a single
+Aho-Corasick automaton laid out as a dense transition table, so one pass over
+the lower-cased text yields every matched phrase. Matching keeps the exact
+semantics of the original ``keyword in text.lower()`` checks: a phrase counts
+once if it occurs anywhere in the text, including inside longer words.
+"""
+import hashlib
+import json
+import threading
+from collections import deque
+from functools import cached_property, lru_cache
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+from app.models.emotion import EmotionType
+
+# Score weight per keyword tier
+TIER_WEIGHTS: Dict[str, float] = {
+    'primary': 3.0,
+    'secondary': 2.0,
+    'contextual': 1.0,
+}
+
+# Flags attached to a compiled phrase besides its emotion contributions
+FLAG_LOW_INTENSITY = 1
+FLAG_HIGH_INTENSITY = 2
+FLAG_CRISIS = 4
+
+# Lexicon shipped with the service; LEXICON_PATH can point elsewhere
+DEFAULT_LEXICON_PATH = Path(__file__).resolve().parent.parent / "data" / "lexicon.json"
+
+
+class LexiconSource(NamedTuple):
+    """Uncompiled lexicon as read from a lexicon file"""
+    version: str
+    emotion_keywords: Dict[EmotionType, Dict[str, List[str]]]
+    high_intensity_words: List[str]
+    low_intensity_words: List[str]
+    crisis_keywords: List[str]
+    suggestions: Dict[EmotionType, List[str]]
+
+
+def parse_lexicon(data: Mapping[str, Any]) -> LexiconSource:
+    """Validate the decoded contents of a lexicon file."""
+    def phrases(value: Any, where: str) -> List[str]:
+        if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+            raise ValueError(f"{where} must be a list of strings")
+        return list(value)
+
+    emotion_keywords: Dict[EmotionType, Dict[str, List[str]]] = {}
+    for name, groups in data.get("emotions", {}).items():
+        unknown_tiers = set(groups) - set(TIER_WEIGHTS)
+        if unknown_tiers:
+            raise ValueError(f"Unknown keyword tiers for {name}: {sorted(unknown_tiers)}")
+        emotion_keywords[EmotionType(name)] = {
+            tier: phrases(words, f"emotions.{name}.{tier}") for tier, words in groups.items()
+        }
+    if not emotion_keywords:
+        raise ValueError("Lexicon defines no emotions")
+
+    return LexiconSource(
+        version=str(data.get("version", "0")),
+        emotion_keywords=emotion_keywords,
+        high_intensity_words=phrases(data.get("high_intensity_words", []), "high_intensity_words"),
+        low_intensity_words=phrases(data.get("low_intensity_words", []), "low_intensity_words"),
+        crisis_keywords=phrases(data.get("crisis_keywords", []), "crisis_keywords"),
+        suggestions={
+            EmotionType(name): phrases(items, f"suggestions.{name}")
+            for name, items in data.get("suggestions", {}).items()
+        },
+    )
+
+
+def read_lexicon_file(path: Path) -> Tuple[LexiconSource, str]:
+    """Parse a JSON or TOML lexicon file; also returns the SHA-256 of its bytes."""
+    raw = Path(path).read_bytes()
+    if Path(path).suffix == ".toml":
+        try:
+            import tomllib
+        except ImportError:
+            raise ValueError(f"{path}: TOML lexicons need Python 3.11 or later")
+        data = tomllib.loads(raw.decode("utf-8"))
+    else:
+        data = json.loads(raw)
+    return parse_lexicon(data), hashlib.sha256(raw).hexdigest()
+
+
+@lru_cache(maxsize=None)
+def default_lexicon_source() -> LexiconSource:
+    """The lexicon shipped with the service, parsed on first use."""
+    return read_lexicon_file(DEFAULT_LEXICON_PATH)[0]
+
+
+class LexiconScan(NamedTuple):
+    """Everything a single pass over a text produces"""
+    scores: Dict[EmotionType, float]
+    intensity: str
+    crisis: bool
+    matched: FrozenSet[int] = frozenset()
+    # Fingerprint of the lexicon that produced the scan; phrase ids in
+    # ``matched`` are only meaningful for that lexicon
+    fingerprint: str = ""
+
+
+class CompiledLexicon:
+    """
+    Emotion lexicon compiled into a dense Aho-Corasick automaton.
+
+    Characters are mapped to small integer classes (0 for any character that
+    appears in no phrase), and ``delta`` stores, for every state row and
+    class, the row offset of the next state with failure transitions already
+    folded in. Scanning is then a single table lookup per character.
+    """
+
+    def __init__(
+        self,
+        emotion_keywords: Mapping[EmotionType, Mapping[str, Sequence[str]]],
+        high_intensity_words: Optional[Sequence[str]] = None,
+        low_intensity_words: Optional[Sequence[str]] = None,
+        crisis_keywords: Optional[Sequence[str]] = None,
+        suggestions: Optional[Mapping[EmotionType, Sequence[str]]] = None,
+        version: str = "builtin",
+        fingerprint: str = "",
+    ):
+        self.version = version
+        self.fingerprint = fingerprint
+        self.emotion_keywords: Dict[EmotionType, Dict[str, List[str]]] = {
+            emotion: {tier: list(words) for tier, words in groups.items()}
+            for emotion, groups in emotion_keywords.items()
+        }
+        self.suggestions: Dict[EmotionType, List[str]] = {
+            emotion: list(items) for emotion, items in (suggestions or {}).items()
+        }
+        self.emotions: Tuple[EmotionType, ...] = tuple(emotion_keywords)
+
+        # Deduplicate phrases; each phrase keeps every (emotion, weight)
+        # contribution it had in the source lists, in list order.
+        pattern_ids: Dict[str, int] = {}
+        patterns: List[str] = []
+        contributions: List[List[Tuple[int, float]]] = []
+        flags: List[int] = []
+
+        def intern(phrase: str) -> int:
+            pattern_id = pattern_ids.get(phrase)
+            if pattern_id is None:
+                pattern_id = pattern_ids[phrase] = len(patterns)
+                patterns.append(phrase)
+                contributions.append([])
+                flags.append(0)
+            return pattern_id
+
+        for slot, keyword_groups in enumerate(emotion_keywords.values()):
+            for tier, weight in TIER_WEIGHTS.items():
+                for keyword in keyword_groups.get(tier, []):
+                    contributions[intern(keyword)].append((slot, weight))
+        # Lists left out come from the shipped lexicon
+        if None in (high_intensity_words, low_intensity_words, crisis_keywords):
+            default = default_lexicon_source()
+            high_intensity_words = default.high_intensity_words if high_intensity_words is None else high_intensity_words
+            low_intensity_words = default.low_intensity_words if low_intensity_words is None else low_intensity_words
+            crisis_keywords = default.crisis_keywords if crisis_keywords is None else crisis_keywords
+        for word in low_intensity_words:
+            flags[intern(word)] |= FLAG_LOW_INTENSITY
+        for word in high_intensity_words:
+            flags[intern(word)] |= FLAG_HIGH_INTENSITY
+        for keyword in crisis_keywords:
+            flags[intern(keyword)] |= FLAG_CRISIS
+
+        self.patterns: Tuple[str, ...] = tuple(patterns)
+        self.contributions: Tuple[Tuple[Tuple[int, float], ...], ...] = tuple(
+            tuple(items) for items in contributions
+        )
+        self.flags: Tuple[int, ...] = tuple(flags)
+        self._build_automaton()
+
+    def _build_automaton(self) -> None:
+        """Build the trie, failure links and dense transition table."""
+        alphabet = sorted({ch for pattern in self.patterns for ch in pattern})
+        self.alphabet = ''.join(alphabet)
+        self.width = width = len(alphabet) + 1
+        char_class = {ch: index + 1 for index, ch in enumerate(alphabet)}
+
+        goto: List[Dict[int, int]] = [{}]
+        outputs: List[List[int]] = [[]]
+        for pattern_id, pattern in enumerate(self.patterns):
+            state = 0
+            for ch in pattern:
+                cls = char_class[ch]
+                nxt = goto[state].get(cls)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][cls] = nxt
+                    goto.append({})
+                    outputs.append([])
+                state = nxt
+            outputs[state].append(pattern_id)
+
+        # Breadth-first construction of the full DFA: a state's row is its
+        # failure state's row overridden by its own trie edges.
+        delta = [0] * (len(goto) * width)
+        fail = [0] * len(goto)
+        for cls, nxt in goto[0].items():
+            delta[cls] = nxt
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            if fail[state]:
+                outputs[state].extend(outputs[fail[state]])
+            row, fail_row = state * width, fail[state] * width
+            delta[row:row + width] = delta[fail_row:fail_row + width]
+            for cls, nxt in goto[state].items():
+                fail[nxt] = delta[fail_row + cls]
+                delta[row + cls] = nxt
+                queue.append(nxt)
+
+        # Store row offsets instead of state numbers so scanning needs no
+        # multiplication.
+        self.delta: List[int] = [nxt * width for nxt in delta]
+        # An empty phrase matches every text, like ``'' in text`` does.
+        self.always_matched: FrozenSet[int] = frozenset(outputs[0])
+        self.state_outputs: Dict[int, Tuple[int, ...]] = {
+            state * width: tuple(sorted(set(ids)))
+            for state, ids in enumerate(outputs) if ids and state
+        }
+        self._class_table = _ClassTable(char_class)
+
+    @classmethod
+    def from_source(cls, source: LexiconSource, fingerprint: str = "") -> "CompiledLexicon":
+        """Compile a parsed lexicon file."""
+        return cls(
+            source.emotion_keywords,
+            source.high_intensity_words,
+            source.low_intensity_words,
+            source.crisis_keywords,
+            suggestions=source.suggestions,
+            version=source.version,
+            fingerprint=fingerprint,
+        )
+
+    def tables(self) -> Dict[str, Any]:
+        """Everything except ``delta`` needed by ``from_tables``, in picklable form."""
+        return {
+            "version": self.version,
+            "fingerprint": self.fingerprint,
+            "emotion_keywords": {
+                emotion.value: groups for emotion, groups in self.emotion_keywords.items()
+            },
+            "suggestions": {emotion.value: items for emotion, items in self.suggestions.items()},
+            "patterns": self.patterns,
+            "contributions": self.contributions,
+            "flags": self.flags,
+            "alphabet": self.alphabet,
+            "state_outputs": self.state_outputs,
+            "always_matched": self.always_matched,
+        }
+
+    @classmethod
+    def from_tables(cls, delta: Sequence[int], **tables: Any) -> "CompiledLexicon":
+        """
+        Rebuild a lexicon from ``tables()`` output and its transition table
+        without recompiling.
+
+        ``delta`` can be any integer sequence, such as a ``memoryview`` over
+        shared memory, and is used as is.
+        """
+        lexicon = cls.__new__(cls)
+        lexicon.version = tables["version"]
+        lexicon.fingerprint = tables["fingerprint"]
+        lexicon.emotion_keywords = {
+            EmotionType(name): groups for name, groups in tables["emotion_keywords"].items()
+        }
+        lexicon.suggestions = {
+            EmotionType(name): items for name, items in tables["suggestions"].items()
+        }
+        lexicon.emotions = tuple(lexicon.emotion_keywords)
+        lexicon.patterns = tuple(tables["patterns"])
+        lexicon.contributions = tuple(tuple(items) for items in tables["contributions"])
+        lexicon.flags = tuple(tables["flags"])
+        lexicon.alphabet = alphabet = tables["alphabet"]
+        lexicon.width = len(alphabet) + 1
+        lexicon.delta = delta
+        lexicon.state_outputs = dict(tables["state_outputs"])
+        lexicon.always_matched = frozenset(tables["always_matched"])
+        lexicon._class_table = _ClassTable({ch: index + 1 for index, ch in enumerate(alphabet)})
+        return lexicon
+
+    @property
+    def state_count(self) -> int:
+        return len(self.delta) // self.width
+
+    def match(self, text: str) -> FrozenSet[int]:
+        """Return the ids of every phrase that occurs in ``text``."""
+        codes = text.lower().translate(self._class_table)
+        # Class codes fit in bytes for any realistic alphabet, which makes
+        # iteration yield ints directly.
+        codes = codes.encode('latin-1') if self.width <= 256 else map(ord, codes)
+        delta = self.delta
+        terminals = self.state_outputs
+        hit_states = set()
+        add = hit_states.add
+        state = 0
+        for cls in codes:
+            state = delta[state + cls]
+            if state in terminals:
+                add(state)
+        if not hit_states:
+            return self.always_matched
+        return self.always_matched.union(
+            pattern_id
+            for state in hit_states
+            for pattern_id in terminals[state]
+        )
+
+    def count(self, text: str) -> Dict[int, int]:
+        """Return how often each phrase occurs in ``text``, overlaps included."""
+        codes = text.lower().translate(self._class_table)
+        codes = codes.encode('latin-1') if self.width <= 256 else map(ord, codes)
+        delta = self.delta
+        terminals = self.state_outputs
+        visits: Dict[int, int] = {}
+        state = 0
+        for cls in codes:
+            state = delta[state + cls]
+            if state in terminals:
+                visits[state] = visits.get(state, 0) + 1
+        counts: Dict[int, int] = {}
+        for state, visited in visits.items():
+            for pattern_id in terminals[state]:
+                counts[pattern_id] = counts.get(pattern_id, 0) + visited
+        return counts
+
+    @cached_property
+    def max_phrase_length(self) -> int:
+        """Length of the longest phrase; a match never spans more characters."""
+        return max(map(len, self.patterns), default=0)
+
+    @cached_property
+    def crisis_keywords(self) -> Tuple[str, ...]:
+        """Crisis phrases of this lexicon, for ``contains_crisis_keyword``."""
+        return tuple(pattern for pattern, flags in zip(self.patterns, self.flags) if flags & FLAG_CRISIS)
+
+    def scan(self, text: str) -> LexiconScan:
+        """Score emotions, intensity and crisis flag in one pass over ``text``."""
+        return self.evaluate(self.match(text))
+
+    def evaluate(self, matched: FrozenSet[int]) -> LexiconScan:
+        """Turn a set of matched phrase ids into emotion scores and flags."""
+        totals = [0.0] * len(self.emotions)
+        flags = 0
+        for pattern_id in matched:
+            for slot, weight in self.contributions[pattern_id]:
+                totals[slot] += weight
+            flags |= self.flags[pattern_id]
+
+        if flags & FLAG_HIGH_INTENSITY:
+            intensity = "high"
+        elif flags & FLAG_LOW_INTENSITY:
+            intensity = "low"
+        else:
+            intensity = "medium"
+
+        return LexiconScan(
+            scores=dict(zip(self.emotions, totals)),
+            intensity=intensity,
+            crisis=bool(flags & FLAG_CRISIS),
+            matched=matched,
+            fingerprint=self.fingerprint,
+        )
+
+
+def contains_crisis_keyword(text: str, crisis_keywords: Sequence[str]) -> bool:
+    """Crisis check alone, for callers that leave the full scan to someone else."""
+    text_lower = text.lower()
+    return any(keyword in text_lower for keyword in crisis_keywords)
+
+
+class _ClassTable(dict):
+    """``str.translate`` table mapping unknown characters to class 0."""
+
+    def __init__(self, char_class: Mapping[str, int]):
+        super().__init__((ord(ch), cls) for ch, cls in char_class.items())
+
+    def __missing__(self, key: int) -> int:
+        return 0
+
+
+_lexicon: Optional[CompiledLexicon] = None
+_lexicon_lock = threading.Lock()
+
+
+def get_lexicon() -> CompiledLexicon:
+    """Return the process-wide compiled lexicon, loading it on first use."""
+    global _lexicon
+    if _lexicon is None:
+        with _lexicon_lock:
+            if _lexicon is None:
+                from app.services.lexicon_store import load_configured_lexicon
+                _lexicon = load_configured_lexicon()
+    return _lexicon
+
+
+def set_lexicon(lexicon: CompiledLexicon) -> None:
+    """
+    Replace the process-wide lexicon.
+
+    A single reference assignment: analyses already running keep the lexicon
+    they started with, new ones see the replacement.
+    """
+    global _lexicon
+    _lexicon = lexicon
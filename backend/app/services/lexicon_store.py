@@ -0,0 +1,172 @@
+# backend/app/services/lexicon_store.py
+"""
+Loading, snapshotting and hot-reloading the lexicon file.
+
+Compiling the automaton is the slow part of loading a lexicon, so the compiled
+tables are cached as a binary snapshot named after the SHA-256 of the source
+file. A cold start with an unchanged file loads the snapshot instead of
+compiling. ``LexiconWatcher`` polls the file and swaps a freshly loaded
+lexicon in with ``set_lexicon`` when it changes.
+"""
+import asyncio
+import os
+import pickle
+import struct
+import sys
+import tempfile
+from array import array
+from pathlib import Path
+from typing import Optional, Tuple
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.services.lexicon import CompiledLexicon, get_lexicon, read_lexicon_file, set_lexicon
+
+logger = get_logger(__name__)
+
+# Bump SNAPSHOT_FORMAT whenever the layout or ``CompiledLexicon.tables()`` changes
+SNAPSHOT_MAGIC = b"EMOLEXSN"
+SNAPSHOT_FORMAT = 1
+# magic, format, source fingerprint, metadata length, transition table entries
+_HEADER = struct.Struct("<8sH64sQQ")
+
+
+def snapshot_path(directory: Path, fingerprint: str) -> Path:
+    return Path(directory) / f"lexicon-{fingerprint[:16]}.snapshot"
+
+
+def save_snapshot(lexicon: CompiledLexicon, path: Path) -> None:
+    """Write ``lexicon``'s compiled tables to ``path`` atomically."""
+    meta = pickle.dumps(lexicon.tables(), protocol=pickle.HIGHEST_PROTOCOL)
+    delta = _little_endian(array("i", lexicon.delta))
+    header = _HEADER.pack(
+        SNAPSHOT_MAGIC, SNAPSHOT_FORMAT, lexicon.fingerprint.encode("ascii"), len(meta), len(delta)
+    )
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # A unique temporary name: several workers starting together may all
+    # write the same snapshot
+    descriptor, temporary = tempfile.mkstemp(prefix=path.name + ".", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(descriptor, "wb") as snapshot:
+            snapshot.write(header)
+            snapshot.write(meta)
+            snapshot.write(delta.tobytes())
+        os.replace(temporary, path)
+    except BaseException:
+        Path(temporary).unlink(missing_ok=True)
+        raise
+
+
+def _little_endian(values: array) -> array:
+    """``values`` in the snapshot's byte order (in place; the swap is its own inverse)."""
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values
+
+
+def load_snapshot(path: Path, fingerprint: str) -> Optional[CompiledLexicon]:
+    """The lexicon stored at ``path``, or None if missing, stale or unreadable."""
+    try:
+        data = Path(path).read_bytes()
+        magic, version, stored, meta_length, entries = _HEADER.unpack_from(data, 0)
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_FORMAT or stored.decode("ascii") != fingerprint:
+            return None
+        meta = pickle.loads(data[_HEADER.size:_HEADER.size + meta_length])
+        start = _HEADER.size + meta_length
+        delta = array("i")
+        delta.frombytes(data[start:start + entries * delta.itemsize])
+        if len(delta) != entries:
+            return None
+        # Lists index fastest in the scan loop
+        return CompiledLexicon.from_tables(_little_endian(delta).tolist(), **meta)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        # Truncated, or pickled by a different version of the code: unpickling
+        # can fail in many ways, and recompiling is always a safe fallback
+        logger.warning("Ignoring unreadable lexicon snapshot %s: %r", path, e)
+        return None
+
+
+def load_lexicon(path: Path, snapshot_dir: Optional[Path] = None) -> CompiledLexicon:
+    """Load a lexicon file, from its snapshot when one matches the file's content."""
+    source, fingerprint = read_lexicon_file(path)
+    snapshot = snapshot_path(snapshot_dir, fingerprint) if snapshot_dir else None
+    if snapshot is not None:
+        lexicon = load_snapshot(snapshot, fingerprint)
+        if lexicon is not None:
+            logger.info("Lexicon %s loaded from snapshot %s", lexicon.version, snapshot)
+            return lexicon
+
+    lexicon = CompiledLexicon.from_source(source, fingerprint)
+    logger.info("Lexicon %s compiled from %s: %d phrases", lexicon.version, path, len(lexicon.patterns))
+    if snapshot is not None:
+        try:
+            save_snapshot(lexicon, snapshot)
+        except OSError as e:
+            logger.warning("Could not write lexicon snapshot %s: %s", snapshot, e)
+    return lexicon
+
+
+def load_configured_lexicon() -> CompiledLexicon:
+    """Load the lexicon named by ``Settings``."""
+    return load_lexicon(
+        Path(settings.LEXICON_PATH),
+        Path(settings.LEXICON_SNAPSHOT_DIR) if settings.LEXICON_SNAPSHOT_DIR else None
+    )
+
+
+class LexiconWatcher:
+    """Polls the lexicon file and hot-swaps the lexicon when it changes"""
+
+    def __init__(self, path: Path, interval: float):
+        self.path = Path(path)
+        self.interval = interval
+        self._signature: Optional[Tuple[int, int]] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    async def start(self) -> None:
+        if self.interval <= 0 or self._task is not None:
+            return
+        self._signature = self._stat()
+        self._task = asyncio.get_running_loop().create_task(self._watch())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _watch(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.interval)
+            signature = self._stat()
+            if signature is not None and signature != self._signature:
+                self._signature = signature
+                # Compile off the event loop; requests keep using the old lexicon meanwhile
+                await loop.run_in_executor(None, self.reload)
+
+    def reload(self) -> bool:
+        """Load the file and swap it in; returns whether the lexicon changed."""
+        try:
+            lexicon = load_configured_lexicon()
+        except Exception as e:
+            logger.error("Lexicon reload from %s failed, keeping the current one: %s", self.path, e)
+            return False
+        current = get_lexicon()
+        if lexicon.fingerprint == current.fingerprint:
+            return False
+        set_lexicon(lexicon)
+        logger.info("Lexicon reloaded: version %s -> %s", current.version, lexicon.version)
+        return True
+
+
+lexicon_watcher = LexiconWatcher(Path(settings.LEXICON_PATH), settings.LEXICON_RELOAD_INTERVAL)
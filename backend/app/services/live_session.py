@@ -0,0 +1,147 @@
+# backend/app/services/live_session.py
+"""
+Incremental lexicon scoring for live-typing clients.
+
+A ``LiveSession`` holds one client's text and how often each lexicon phrase
+occurs in it. An edit can only create or destroy occurrences that overlap the
+edited range, and no phrase is longer than ``max_phrase_length``, so only the
+range plus that margin on each side is matched again: occurrences found in
+the old window are removed and those in the new window added. Emotion score
+totals and intensity flags change only when a phrase starts or stops
+occurring, so the cost of an edit depends on the size of the edit, not on the
+length of the text.
+"""
+from typing import Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.models.emotion import EmotionType
+from app.services.lexicon import (
+    FLAG_CRISIS,
+    FLAG_HIGH_INTENSITY,
+    FLAG_LOW_INTENSITY,
+    CompiledLexicon,
+    LexiconScan
+)
+
+
+class EditError(ValueError):
+    """An edit that does not fit the session's text"""
+
+
+class LiveSession:
+    """Text of one live connection with its running phrase counts and scores"""
+
+    def __init__(self, lexicon: CompiledLexicon, max_chars: int):
+        self.max_chars = max_chars
+        self._reset(lexicon, "")
+
+    def _reset(self, lexicon: CompiledLexicon, text: str) -> None:
+        self.lexicon = lexicon
+        self.text = text
+        # Occurrences of each phrase id present in the text
+        self.occurrences: Dict[int, int] = {}
+        self._totals = [0.0] * len(lexicon.emotions)
+        # Present phrases carrying each flag
+        self._flags = {FLAG_LOW_INTENSITY: 0, FLAG_HIGH_INTENSITY: 0, FLAG_CRISIS: 0}
+        # An empty phrase matches every text and is never re-matched
+        self._update(dict.fromkeys(lexicon.always_matched, 1), 1)
+        self._update(lexicon.count(text), 1)
+
+    def _update(self, counts: Dict[int, int], sign: int) -> None:
+        occurrences = self.occurrences
+        for pattern_id, count in counts.items():
+            before = occurrences.get(pattern_id, 0)
+            after = before + sign * count
+            if after:
+                occurrences[pattern_id] = after
+            else:
+                del occurrences[pattern_id]
+            if bool(before) == bool(after):
+                continue
+            # The phrase appeared in or vanished from the text
+            step = 1 if after else -1
+            for slot, weight in self.lexicon.contributions[pattern_id]:
+                self._totals[slot] += step * weight
+            flags = self.lexicon.flags[pattern_id]
+            for flag in self._flags:
+                if flags & flag:
+                    self._flags[flag] += step
+
+    def set_text(self, text: str) -> None:
+        """Replace the whole text."""
+        if len(text) > self.max_chars:
+            raise EditError(f"Text cannot exceed {self.max_chars} characters")
+        self._reset(self.lexicon, text)
+
+    def replace(self, start: int, end: int, insert: str) -> None:
+        """Replace characters ``start`` to ``end`` of the text with ``insert``."""
+        text = self.text
+        if not 0 <= start <= end <= len(text):
+            raise EditError(f"Edit range {start}-{end} is outside the text ({len(text)} characters)")
+        length = len(text) - (end - start) + len(insert)
+        if length > self.max_chars:
+            raise EditError(f"Text cannot exceed {self.max_chars} characters")
+
+        margin = max(0, self.lexicon.max_phrase_length - 1)
+        low = max(0, start - margin)
+        high = min(len(text), end + margin)
+        self.text = text[:start] + insert + text[end:]
+        self._update(self.lexicon.count(text[low:high]), -1)
+        self._update(self.lexicon.count(self.text[low:high - end + start + len(insert)]), 1)
+
+    def refresh(self, lexicon: CompiledLexicon) -> None:
+        """Rescan the text if the lexicon was reloaded since the last edit."""
+        if lexicon is not self.lexicon:
+            self._reset(lexicon, self.text)
+
+    @property
+    def crisis(self) -> bool:
+        return self._flags[FLAG_CRISIS] > 0
+
+    @property
+    def intensity(self) -> str:
+        if self._flags[FLAG_HIGH_INTENSITY]:
+            return "high"
+        if self._flags[FLAG_LOW_INTENSITY]:
+            return "low"
+        return "medium"
+
+    @property
+    def primary(self) -> Tuple[EmotionType, str]:
+        """Primary emotion and intensity, as a full analysis would report them."""
+        best = max(self._totals, default=0.0)
+        if best == 0:
+            return EmotionType.NEUTRAL, self.intensity
+        return self.lexicon.emotions[self._totals.index(best)], self.intensity
+
+    def scan(self) -> LexiconScan:
+        """The scan a full pass over the current text would produce."""
+        lexicon = self.lexicon
+        return LexiconScan(
+            scores=dict(zip(lexicon.emotions, self._totals)),
+            intensity=self.intensity,
+            crisis=self.crisis,
+            matched=lexicon.always_matched.union(self.occurrences),
+            fingerprint=lexicon.fingerprint,
+        )
+
+
+class LiveSessions:
+    """Counts open sessions and refuses new ones beyond ``max_sessions``"""
+
+    def __init__(self, max_sessions: int):
+        self.max_sessions = max_sessions
+        self.active = 0
+
+    def open(self, lexicon: CompiledLexicon, max_chars: int) -> Optional[LiveSession]:
+        if self.active >= self.max_sessions:
+            return None
+        self.active += 1
+        return LiveSession(lexicon, max_chars)
+
+    def close(self, session: LiveSession) -> None:
+        self.active -= 1
+
+
+# Shared by all live connections of this process
+live_sessions = LiveSessions(settings.LIVE_MAX_SESSIONS)
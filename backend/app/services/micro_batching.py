@@ -0,0 +1,138 @@
+# backend/app/services/micro_batching.py
+"""
+Dynamic micro-batching of concurrent analyses.
+
+Callers submit single items and await a future. Items are collected until
+``max_batch_size`` of them are waiting or ``max_wait_ms`` has passed since the
+first one arrived, then the whole batch is scored in one call on the executor
+and every caller's future is resolved.
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import Executor
+from typing import Callable, Dict, Generic, List, Optional, Sequence, Set, Tuple, TypeVar
+
+import numpy as np
+
+from app.models.emotion import MicroBatchStats
+from app.services.stats import LatencyBuckets
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class MicroBatcher(Generic[T, R]):
+    """
+    Groups concurrent ``submit`` calls into batches for ``score_batch``.
+
+    ``score_batch`` receives a list of items and must return one result per
+    item in the same order; it runs on ``executor``. Must be used from a single
+    event loop at a time.
+    """
+
+    def __init__(
+        self,
+        score_batch: Callable[[List[T]], Sequence[R]],
+        executor: Executor,
+        max_batch_size: int,
+        max_wait_ms: float
+    ):
+        self.score_batch = score_batch
+        self.executor = executor
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._pending: List[Tuple[T, asyncio.Future, float]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        # Strong references so running batches are not garbage collected
+        self._tasks: Set[asyncio.Task] = set()
+
+        self._lock = threading.Lock()
+        self._buckets = LatencyBuckets(min_value=1e-5, max_value=10.0)
+        self._wait_histogram = np.zeros(self._buckets.size, dtype=np.uint64)
+        # Batch sizes counted in power-of-two buckets: 1, 2, 3-4, 5-8, ...
+        self._size_histogram = np.zeros((max_batch_size - 1).bit_length() + 1, dtype=np.uint64)
+        self.queue_depth = 0
+        self.batches = 0
+        self.items = 0
+        self.wait_sum = 0.0
+
+    async def submit(self, item: T) -> R:
+        """Queue ``item`` for the next batch and wait for its result."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future, time.monotonic()))
+        with self._lock:
+            self.queue_depth += 1
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        """Hand every pending item to the executor as one batch."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.get_running_loop().create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[T, asyncio.Future, float]]) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            results = await loop.run_in_executor(self.executor, self._score, batch)
+        except Exception as e:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for (_, future, _), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+        finally:
+            with self._lock:
+                self.queue_depth -= len(batch)
+
+    def _score(self, batch: List[Tuple[T, asyncio.Future, float]]) -> Sequence[R]:
+        """Record how long the batch queued, then score it; runs on the executor."""
+        started = time.monotonic()
+        with self._lock:
+            self.batches += 1
+            self.items += len(batch)
+            self._size_histogram[(len(batch) - 1).bit_length()] += 1
+            for _, _, enqueued in batch:
+                wait = started - enqueued
+                self.wait_sum += wait
+                self._wait_histogram[self._buckets.index(wait)] += 1
+        return self.score_batch([item for item, _, _ in batch])
+
+    def stats(self) -> MicroBatchStats:
+        """Queue depth, batch-size histogram and added queuing latency."""
+        with self._lock:
+            sizes = self._size_histogram.tolist()
+            waits = self._wait_histogram.copy()
+            batches, items, wait_sum, depth = self.batches, self.items, self.wait_sum, self.queue_depth
+
+        histogram: Dict[str, int] = {}
+        for index, count in enumerate(sizes):
+            low, high = (1 << index >> 1) + 1, min(1 << index, self.max_batch_size)
+            histogram[str(high) if low >= high else f"{low}-{high}"] = int(count)
+        return MicroBatchStats(
+            enabled=True,
+            max_batch_size=self.max_batch_size,
+            max_wait_ms=self.max_wait * 1000,
+            queue_depth=depth,
+            batches=batches,
+            items=items,
+            average_batch_size=round(items / batches, 3) if batches else 0.0,
+            batch_size_histogram=histogram,
+            queue_wait_avg=round(wait_sum / items, 6) if items else 0.0,
+            queue_wait_p50=round(self._buckets.percentile(waits, 0.50), 6),
+            queue_wait_p90=round(self._buckets.percentile(waits, 0.90), 6),
+            queue_wait_p99=round(self._buckets.percentile(waits, 0.99), 6)
+        )
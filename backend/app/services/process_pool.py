@@ -0,0 +1,67 @@
+# backend/app/services/process_pool.py
+"""
+Multi-core lexicon scanning on a pool of worker processes.
+
+The API process publishes the compiled lexicon once as a ``SharedLexicon``;
+each worker attaches to it when it starts. Workers only return the ids of
+matched phrases, and the API process turns them into scans, scores and
+responses, so statistics stay in one place.
+"""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Sequence, Tuple
+
+from app.core.logging import get_logger
+from app.services.lexicon import CompiledLexicon, LexiconScan
+from app.services.shared_lexicon import SharedLexicon
+
+logger = get_logger(__name__)
+
+# Per-worker attachment, set by ``_init_worker``
+_worker_lexicon: Optional[SharedLexicon] = None
+
+
+def _init_worker(name: str) -> None:
+    global _worker_lexicon
+    _worker_lexicon = SharedLexicon.attach(name)
+
+
+def _match_chunk(texts: Sequence[str]) -> List[Tuple[int, ...]]:
+    """Matched phrase ids for each text; runs in a worker process."""
+    lexicon = _worker_lexicon.lexicon
+    return [tuple(lexicon.match(text)) for text in texts]
+
+
+class ProcessScanPool:
+    """Scans texts against ``lexicon`` on ``workers`` processes"""
+
+    def __init__(self, lexicon: CompiledLexicon, workers: int = 0, chunk_size: int = 16):
+        self.lexicon = lexicon
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.shared = SharedLexicon.create(lexicon)
+        # Spawned workers start clean instead of inheriting the server's
+        # threads and sockets
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.shared.name,)
+        )
+        logger.info("Process scan pool started: %d workers, shared lexicon %s", self.workers, self.shared.name)
+
+    def scan(self, texts: Sequence[str]) -> List[LexiconScan]:
+        """Scan ``texts`` in chunks across the pool, keeping their order."""
+        chunks = [texts[start:start + self.chunk_size] for start in range(0, len(texts), self.chunk_size)]
+        evaluate = self.lexicon.evaluate
+        return [
+            evaluate(frozenset(matched))
+            for chunk in self.executor.map(_match_chunk, chunks)
+            for matched in chunk
+        ]
+
+    def close(self) -> None:
+        """Wait for submitted chunks, then stop the workers and free the shared lexicon."""
+        self.executor.shutdown(wait=True)
+        self.shared.close()
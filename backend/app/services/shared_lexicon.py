@@ -0,0 +1,75 @@
+# backend/app/services/shared_lexicon.py
+"""
+Compiled lexicon published through ``multiprocessing.shared_memory``.
+
+The block holds a small header, the pickled phrase metadata and the dense
+transition table as int32. Worker processes attach by name and scan directly
+over a ``memoryview`` of the table, so the automaton exists once in physical
+memory however many workers run.
+"""
+import pickle
+import struct
+from multiprocessing import shared_memory
+from typing import Optional
+
+import numpy as np
+
+from app.services.lexicon import CompiledLexicon
+
+# Metadata length and number of transition table entries
+_HEADER = struct.Struct("<QQ")
+
+
+def _table_offset(meta_length: int) -> int:
+    """Start of the transition table, aligned to 8 bytes."""
+    return (_HEADER.size + meta_length + 7) // 8 * 8
+
+
+class SharedLexicon:
+    """A compiled lexicon backed by a named shared memory block"""
+
+    def __init__(self, block: shared_memory.SharedMemory, lexicon: CompiledLexicon, owner: bool):
+        self.block = block
+        self.lexicon = lexicon
+        self.owner = owner
+
+    @property
+    def name(self) -> str:
+        return self.block.name
+
+    @classmethod
+    def create(cls, lexicon: CompiledLexicon) -> "SharedLexicon":
+        """Copy ``lexicon``'s tables into a new shared memory block."""
+        meta = pickle.dumps(lexicon.tables(), protocol=pickle.HIGHEST_PROTOCOL)
+        delta = np.asarray(lexicon.delta, dtype=np.int32)
+        offset = _table_offset(len(meta))
+
+        block = shared_memory.SharedMemory(create=True, size=offset + delta.nbytes)
+        _HEADER.pack_into(block.buf, 0, len(meta), len(delta))
+        block.buf[_HEADER.size:_HEADER.size + len(meta)] = meta
+        np.ndarray(len(delta), dtype=np.int32, buffer=block.buf, offset=offset)[:] = delta
+        return cls(block, lexicon, owner=True)
+
+    @classmethod
+    def attach(cls, name: str) -> "SharedLexicon":
+        """Open an existing block; the transition table is used in place."""
+        block = shared_memory.SharedMemory(name=name)
+        meta_length, entries = _HEADER.unpack_from(block.buf, 0)
+        meta = pickle.loads(block.buf[_HEADER.size:_HEADER.size + meta_length])
+        offset = _table_offset(meta_length)
+        delta = block.buf[offset:offset + 4 * entries].cast("i")
+
+        lexicon = CompiledLexicon.from_tables(delta, **meta)
+        return cls(block, lexicon, owner=False)
+
+    def close(self) -> None:
+        """Detach from the block, and remove it if this process created it."""
+        delta: Optional[memoryview] = None
+        if not self.owner and isinstance(self.lexicon.delta, memoryview):
+            delta = self.lexicon.delta
+        self.lexicon = None
+        if delta is not None:
+            delta.release()
+        self.block.close()
+        if self.owner:
+            self.block.unlink()
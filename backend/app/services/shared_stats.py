@@ -0,0 +1,247 @@
+# backend/app/services/shared_stats.py
+"""
+Emotion statistics shared by all worker processes of a server.
+
+With ``uvicorn --workers N`` each worker has its own analyzer, so in-process
+stats only cover the requests that one worker served. ``SharedStatsAggregator``
+keeps the same aggregates in a memory-mapped file that every worker maps.
+Each table has one row per worker; a worker claims a row when it starts and
+is its only writer, so recording takes no cross-process lock. Reads sum the
+rows, at a cost proportional to the number of workers.
+
+By default the file lives in ``/dev/shm`` and is removed when the last worker
+stops. A path on disk keeps the stats across restarts: rows of workers that
+exited are still merged, and new workers take them over.
+"""
+import fcntl
+import math
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Tuple
+
+import numpy as np
+
+from app.core.logging import get_logger
+from app.models.emotion import EmotionStats, EmotionWindowStats
+from app.services.stats import (
+    EMOTION_INDEX,
+    EMOTIONS,
+    HistoryRing,
+    LatencyBuckets,
+    build_emotion_stats,
+    build_window_stats
+)
+
+logger = get_logger(__name__)
+
+# Bump STATS_FORMAT whenever the layout changes; files with another layout are reset
+STATS_MAGIC = b"EMOSTATS"
+STATS_FORMAT = 1
+# magic, format, workers, emotions, window slots, latency buckets, slot seconds
+_HEADER = struct.Struct("<8sQQQQQQ")
+_HEADER_SIZE = 64
+
+
+def default_stats_path() -> Path:
+    """Stats file shared by the workers of this server, named after their parent process."""
+    directory = Path("/dev/shm")
+    if not directory.is_dir():
+        directory = Path(tempfile.gettempdir())
+    return directory / f"emotion-stats-{os.getppid()}.mmap"
+
+
+def _layout(workers: int, slots: int, buckets: int) -> Tuple[Dict[str, Tuple[str, Tuple[int, ...], int]], int]:
+    """Dtype, shape and offset of every table, and the file size."""
+    emotions = len(EMOTIONS)
+    tables = (
+        # Process id owning each row, 0 once released
+        ("pids", "<i8", (workers,)),
+        # Confidence and processing time sums
+        ("sums", "<f8", (workers, 2)),
+        ("counts", "<u8", (workers, emotions)),
+        # Wall time each emotion was first recorded, 0 if never
+        ("first_seen", "<f8", (workers, emotions)),
+        # Window slots: the epoch each slot holds, its latency histogram and emotion counts
+        ("epochs", "<i8", (workers, slots)),
+        ("latency", "<u4", (workers, slots, buckets)),
+        ("emotions", "<u4", (workers, slots, emotions)),
+    )
+    layout = {}
+    offset = _HEADER_SIZE
+    for name, dtype, shape in tables:
+        layout[name] = (dtype, shape, offset)
+        offset += (np.dtype(dtype).itemsize * math.prod(shape) + 7) // 8 * 8
+    return layout, offset
+
+
+def _process_exists(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class SharedStatsAggregator:
+    """``StatsAggregator`` whose aggregates are merged across worker processes"""
+
+    def __init__(
+        self,
+        path: Path,
+        max_workers: int = 32,
+        persistent: bool = True,
+        history_size: int = 0,
+        window_slot_seconds: int = 5,
+        window_max_seconds: int = 3600
+    ):
+        self.path = Path(path)
+        self.max_workers = max_workers
+        self.persistent = persistent
+        self.slot_seconds = window_slot_seconds
+        self.slots = max(1, math.ceil(window_max_seconds / window_slot_seconds))
+        self.buckets = LatencyBuckets()
+        # Only between this process's threads; other workers write other rows
+        self._lock = threading.Lock()
+        # Raw history is not merged and stays per process
+        self.history = HistoryRing(history_size) if history_size > 0 else None
+
+        self._layout, self._size = _layout(max_workers, self.slots, self.buckets.size)
+        self._map = None
+        self._map, self.worker = self._open()
+        self._tables = {
+            name: np.ndarray(shape, dtype=dtype, buffer=self._map, offset=offset)
+            for name, (dtype, shape, offset) in self._layout.items()
+        }
+        # This worker's rows, as flat memoryviews: item updates on them are
+        # much cheaper than on NumPy arrays
+        rows = {name: table[self.worker] for name, table in self._tables.items()}
+        self._rows = rows
+        self._sums = memoryview(rows["sums"]).cast("B").cast("d")
+        self._counts = memoryview(rows["counts"]).cast("B").cast("Q")
+        self._first_seen = memoryview(rows["first_seen"]).cast("B").cast("d")
+        self._epochs = memoryview(rows["epochs"]).cast("B").cast("q")
+        self._latency = memoryview(rows["latency"]).cast("B").cast("I")
+        self._emotions = memoryview(rows["emotions"]).cast("B").cast("I")
+        logger.info("Shared stats at %s, worker row %d of %d", self.path, self.worker, max_workers)
+
+    def _header(self) -> bytes:
+        return _HEADER.pack(
+            STATS_MAGIC, STATS_FORMAT, self.max_workers, len(EMOTIONS),
+            self.slots, self.buckets.size, self.slot_seconds
+        ).ljust(_HEADER_SIZE, b"\0")
+
+    def _open(self) -> Tuple[mmap.mmap, int]:
+        """Map the file, creating or resetting it if needed, and claim a row."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            # Held only while claiming a row, never while recording
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            header = self._header()
+            if os.pread(fd, _HEADER_SIZE, 0) != header or os.fstat(fd).st_size != self._size:
+                if os.fstat(fd).st_size:
+                    logger.warning("Stats file %s has another layout; starting from zero", self.path)
+                os.ftruncate(fd, 0)
+                os.ftruncate(fd, self._size)
+                os.pwrite(fd, header, 0)
+            mapped = mmap.mmap(fd, self._size)
+            dtype, shape, offset = self._layout["pids"]
+            pids = np.ndarray(shape, dtype=dtype, buffer=mapped, offset=offset)
+            try:
+                worker = next(
+                    row for row, pid in enumerate(pids.tolist())
+                    if pid in (0, os.getpid()) or not _process_exists(pid)
+                )
+            except StopIteration:
+                del pids
+                mapped.close()
+                raise RuntimeError(f"All {self.max_workers} worker rows of {self.path} are in use")
+            # Rows of exited workers keep their counts, which are carried on
+            pids[worker] = os.getpid()
+            del pids
+            return mapped, worker
+        finally:
+            # The map holds a duplicate of the descriptor, so closing it
+            # would not release the lock
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+
+    def record(self, emotion: str, confidence: float, processing_time: float) -> None:
+        """Add one analysis result to this worker's row."""
+        index = EMOTION_INDEX[emotion]
+        now = time.time()
+        epoch = int(now // self.slot_seconds)
+        slot = epoch % self.slots
+        with self._lock:
+            if not self._first_seen[index]:
+                self._first_seen[index] = now
+            self._counts[index] += 1
+            self._sums[0] += confidence
+            self._sums[1] += processing_time
+            if self.history is not None:
+                self.history.append(index, confidence)
+            if self._epochs[slot] != epoch:
+                # Clear the slot before relabelling it, so readers never
+                # count its old contents as part of the new epoch
+                self._rows["latency"][slot] = 0
+                self._rows["emotions"][slot] = 0
+                self._epochs[slot] = epoch
+            self._latency[slot * self.buckets.size + self.buckets.index(processing_time)] += 1
+            self._emotions[slot * len(EMOTIONS) + index] += 1
+
+    @property
+    def total(self) -> int:
+        """Analyses recorded by all workers."""
+        return int(self._tables["counts"].sum())
+
+    def snapshot(self) -> EmotionStats:
+        """Statistics over all workers; cost grows with the number of workers only."""
+        tables = self._tables
+        counts = tables["counts"].sum(axis=0).tolist()
+        first_seen = tables["first_seen"]
+        first_seen = np.where(first_seen > 0, first_seen, np.inf).min(axis=0).tolist()
+        confidence_sum, processing_time_sum = tables["sums"].sum(axis=0).tolist()
+        return build_emotion_stats(sum(counts), counts, first_seen, confidence_sum, processing_time_sum)
+
+    def window_snapshot(self, window_seconds: int, label: str) -> EmotionWindowStats:
+        """Latency percentiles, rate and emotion distribution over all workers."""
+        epoch = int(time.time() // self.slot_seconds)
+        oldest = epoch - max(1, math.ceil(window_seconds / self.slot_seconds)) + 1
+        epochs = self._tables["epochs"]
+        live = (epochs >= oldest) & (epochs <= epoch)
+        latency = self._tables["latency"][live].sum(axis=0)
+        emotions = self._tables["emotions"][live].sum(axis=0)
+        return build_window_stats(label, window_seconds, latency, emotions, self.buckets)
+
+    def close(self) -> None:
+        """Release this worker's row, and remove a non-persistent file once unused."""
+        if self._map is None:
+            return
+        fd = os.open(self.path, os.O_RDWR)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            pids = self._tables["pids"]
+            pids[self.worker] = 0
+            if not self.persistent and not pids.any():
+                self.path.unlink(missing_ok=True)
+            self._map.flush()
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+
+        for view in (self._sums, self._counts, self._first_seen, self._epochs, self._latency, self._emotions):
+            view.release()
+        self._rows = self._tables = {}
+        mapped, self._map = self._map, None
+        try:
+            mapped.close()
+        except BufferError:
+            # A snapshot in another thread still holds a view; unmapped when it is freed
+            pass
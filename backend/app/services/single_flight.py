@@ -0,0 +1,57 @@
+# backend/app/services/single_flight.py
+"""
+Single-flight coalescing of identical concurrent work.
+
+The first caller for a key starts the computation; callers arriving with the
+same key while it runs await that computation instead of starting their own.
+The computation runs as its own task and callers await it through
+``asyncio.shield``, so a caller that goes away (a client disconnecting) does
+not cancel the result the others are waiting for.
+"""
+import asyncio
+from typing import Awaitable, Callable, Dict, Generic, Hashable, Tuple, TypeVar
+
+from app.models.emotion import SingleFlightStats
+
+T = TypeVar("T")
+
+
+class SingleFlight(Generic[T]):
+    """At most one in-flight computation per key, shared by concurrent callers"""
+
+    def __init__(self):
+        self._in_flight: Dict[Hashable, "asyncio.Task[T]"] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def run(self, key: Hashable, compute: Callable[[], Awaitable[T]]) -> Tuple[T, bool]:
+        """
+        Result of ``compute()`` for ``key``, and whether it was shared from
+        a computation another caller started.
+        """
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            return await asyncio.shield(task), True
+
+        self.leaders += 1
+        task = asyncio.ensure_future(compute())
+        self._in_flight[key] = task
+        task.add_done_callback(lambda done: self._finished(key, done))
+        return await asyncio.shield(task), False
+
+    def _finished(self, key: Hashable, task: "asyncio.Task[T]") -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        # Every caller may have gone away; retrieve the error so it is not
+        # reported as never retrieved
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> SingleFlightStats:
+        return SingleFlightStats(
+            enabled=True,
+            in_flight=len(self._in_flight),
+            computations=self.leaders,
+            coalesced=self.coalesced
+        )
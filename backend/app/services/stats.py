@@ -0,0 +1,234 @@
+# backend/app/services/stats.py
+"""
+Running emotion statistics in constant memory.
+
+Every analysis updates fixed-size aggregates, so recording and reading stats
+are O(1) no matter how many requests the process has served. Raw history is
+optional and kept in a bounded ring buffer backed by compact arrays.
+
+Recent traffic is additionally tracked in rotating time slots, each holding a
+log-bucketed latency histogram and per-emotion counts. Histograms merge by
+addition, so any window up to the ring's span is answered by summing a fixed
+number of slots.
+"""
+import math
+import threading
+import time
+from array import array
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.models.emotion import EmotionStats, EmotionType, EmotionWindowStats
+
+EMOTIONS: Tuple[EmotionType, ...] = tuple(EmotionType)
+EMOTION_INDEX = {emotion.value: index for index, emotion in enumerate(EMOTIONS)}
+
+
+class HistoryRing:
+    """Fixed-capacity ring of the most recent (emotion, confidence) pairs"""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._emotions = array('B', bytes(capacity))
+        self._confidences = array('d', bytes(8 * capacity))
+        self._next = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, emotion_index: int, confidence: float) -> None:
+        self._emotions[self._next] = emotion_index
+        self._confidences[self._next] = confidence
+        self._next = (self._next + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def items(self) -> List[Tuple[str, float]]:
+        """Entries from oldest to newest."""
+        start = (self._next - self._size) % self.capacity
+        positions = [(start + offset) % self.capacity for offset in range(self._size)]
+        return [(EMOTIONS[self._emotions[i]].value, self._confidences[i]) for i in positions]
+
+
+class LatencyBuckets:
+    """
+    Log-linear bucket layout for latency histograms.
+
+    Bucket ``i`` covers ``[min_value * growth**(i-1), min_value * growth**i)``
+    with bucket 0 catching everything below ``min_value`` and the last bucket
+    everything above ``max_value``; reported percentiles are within one
+    growth factor of the true value.
+    """
+
+    def __init__(self, min_value: float = 1e-4, max_value: float = 100.0, buckets_per_doubling: int = 8):
+        self.min_value = min_value
+        self.growth = 2 ** (1 / buckets_per_doubling)
+        self._log_growth = math.log(self.growth)
+        self.size = int(math.ceil(math.log(max_value / min_value) / self._log_growth)) + 2
+        self.upper_bounds = min_value * self.growth ** np.arange(self.size)
+        self.upper_bounds[-1] = math.inf
+
+    def index(self, value: float) -> int:
+        if value < self.min_value:
+            return 0
+        return min(self.size - 1, int(math.log(value / self.min_value) / self._log_growth) + 1)
+
+    def percentile(self, counts: np.ndarray, quantile: float) -> float:
+        """Upper bound of the bucket holding the ``quantile`` observation."""
+        total = int(counts.sum())
+        if not total:
+            return 0.0
+        rank = max(1, int(math.ceil(quantile * total)))
+        index = int(np.searchsorted(np.cumsum(counts), rank))
+        if index == self.size - 1:
+            index -= 1
+        return float(self.upper_bounds[index])
+
+
+class WindowedStats:
+    """Ring of fixed-width time slots with latency histograms and emotion counts"""
+
+    def __init__(self, slot_seconds: int, slots: int, buckets: Optional[LatencyBuckets] = None):
+        self.slot_seconds = slot_seconds
+        self.slots = slots
+        self.buckets = buckets or LatencyBuckets()
+        self._latency = np.zeros((slots, self.buckets.size), dtype=np.uint32)
+        self._emotions = np.zeros((slots, len(EMOTIONS)), dtype=np.uint32)
+        self._epochs = np.full(slots, -1, dtype=np.int64)
+
+    def record(self, emotion_index: int, processing_time: float, now: float) -> None:
+        """Add one analysis to the slot for ``now``; caller holds the stats lock."""
+        epoch = int(now // self.slot_seconds)
+        slot = epoch % self.slots
+        if self._epochs[slot] != epoch:
+            self._latency[slot] = 0
+            self._emotions[slot] = 0
+            self._epochs[slot] = epoch
+        self._latency[slot, self.buckets.index(processing_time)] += 1
+        self._emotions[slot, emotion_index] += 1
+
+    def merged(self, window_seconds: int, now: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Summed latency histogram and emotion counts over the trailing window."""
+        epoch = int(now // self.slot_seconds)
+        oldest = epoch - max(1, math.ceil(window_seconds / self.slot_seconds)) + 1
+        live = (self._epochs >= oldest) & (self._epochs <= epoch)
+        return self._latency[live].sum(axis=0), self._emotions[live].sum(axis=0)
+
+
+class StatsAggregator:
+    """Per-emotion counts plus confidence and processing-time sums"""
+
+    def __init__(
+        self,
+        history_size: int = 0,
+        window_slot_seconds: int = 5,
+        window_max_seconds: int = 3600
+    ):
+        self._lock = threading.Lock()
+        self._counts = array('Q', bytes(8 * len(EMOTIONS)))
+        # Order in which each emotion was first seen, to break count ties the
+        # way ``Counter.most_common`` does over the full history
+        self._first_seen = array('q', [-1] * len(EMOTIONS))
+        self._seen = 0
+        self.total = 0
+        self.confidence_sum = 0.0
+        self.processing_time_sum = 0.0
+        self.history = HistoryRing(history_size) if history_size > 0 else None
+        self.windows = WindowedStats(
+            window_slot_seconds,
+            max(1, math.ceil(window_max_seconds / window_slot_seconds))
+        )
+
+    def record(self, emotion: str, confidence: float, processing_time: float) -> None:
+        """Add one analysis result."""
+        index = EMOTION_INDEX[emotion]
+        with self._lock:
+            if self._first_seen[index] < 0:
+                self._first_seen[index] = self._seen
+                self._seen += 1
+            self._counts[index] += 1
+            self.total += 1
+            self.confidence_sum += confidence
+            self.processing_time_sum += processing_time
+            if self.history is not None:
+                self.history.append(index, confidence)
+            self.windows.record(index, processing_time, time.monotonic())
+
+    def snapshot(self) -> EmotionStats:
+        """Current statistics; cost is independent of the number of analyses."""
+        with self._lock:
+            total = self.total
+            counts = self._counts.tolist()
+            first_seen = self._first_seen.tolist()
+            confidence_sum = self.confidence_sum
+            processing_time_sum = self.processing_time_sum
+        return build_emotion_stats(total, counts, first_seen, confidence_sum, processing_time_sum)
+
+    def window_snapshot(self, window_seconds: int, label: str) -> EmotionWindowStats:
+        """Latency percentiles, rate and emotion distribution for a trailing window."""
+        with self._lock:
+            latency, emotions = self.windows.merged(window_seconds, time.monotonic())
+        return build_window_stats(label, window_seconds, latency, emotions, self.windows.buckets)
+
+    def close(self) -> None:
+        """Nothing to release; stats live in process memory."""
+
+
+def build_emotion_stats(
+    total: int,
+    counts: Sequence[int],
+    first_seen: Sequence[float],
+    confidence_sum: float,
+    processing_time_sum: float
+) -> EmotionStats:
+    """``EmotionStats`` from per-emotion counts and running sums."""
+    if not total:
+        return EmotionStats(
+            total_analyses=0,
+            most_common_emotion="None",
+            average_confidence=0.0,
+            processing_time_avg=0.0
+        )
+
+    # Ties go to the emotion seen first
+    most_common = min(
+        (index for index, count in enumerate(counts) if count),
+        key=lambda index: (-counts[index], first_seen[index])
+    )
+    return EmotionStats(
+        total_analyses=total,
+        most_common_emotion=EMOTIONS[most_common].value,
+        average_confidence=round(confidence_sum / total, 3),
+        processing_time_avg=round(processing_time_sum / total, 3)
+    )
+
+
+def build_window_stats(
+    label: str,
+    window_seconds: int,
+    latency: np.ndarray,
+    emotions: np.ndarray,
+    buckets: LatencyBuckets
+) -> EmotionWindowStats:
+    """``EmotionWindowStats`` from a window's merged latency histogram and emotion counts."""
+    total = int(emotions.sum())
+    distribution: Dict[str, int] = {
+        EMOTIONS[index].value: int(count)
+        for index, count in enumerate(emotions.tolist()) if count
+    }
+    return EmotionWindowStats(
+        window=label,
+        total_analyses=total,
+        request_rate=round(total / window_seconds, 3),
+        processing_time_p50=round(buckets.percentile(latency, 0.50), 4),
+        processing_time_p90=round(buckets.percentile(latency, 0.90), 4),
+        processing_time_p99=round(buckets.percentile(latency, 0.99), 4),
+        emotion_distribution=distribution
+    )
+
+
+def parse_window(window: str) -> int:
+    """Convert a window such as ``30s``, ``5m`` or ``1h`` to seconds."""
+    units = {'s': 1, 'm': 60, 'h': 3600}
+    return int(window[:-1]) * units[window[-1]]
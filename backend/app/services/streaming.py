@@ -0,0 +1,116 @@
+# backend/app/services/streaming.py
+"""
+Incremental newline-delimited JSON handling for streamed analysis.
+
+Lines are cut out of the request body chunk by chunk, so memory use is bounded
+by the chunk size plus one maximum-length line regardless of how many records
+pass through.
+"""
+import json
+from typing import AsyncIterator, List, NamedTuple, Optional, Union
+
+from pydantic import ValidationError
+from starlette.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+from app.models.emotion import EmotionBatchItem
+
+
+class NDJSONLine(NamedTuple):
+    """One input record, or the reason it could not be read"""
+    number: int
+    item: Optional[EmotionBatchItem]
+    error: Optional[str]
+
+
+async def iter_ndjson_batches(
+    chunks: AsyncIterator[bytes],
+    max_line_bytes: int
+) -> AsyncIterator[List[NDJSONLine]]:
+    """
+    Yield the complete NDJSON records found in each incoming body chunk.
+
+    Blank lines are skipped. A line longer than ``max_line_bytes`` is dropped
+    without being buffered and reported as an error record.
+    """
+    pending = bytearray()
+    overflow = False
+    number = 0
+
+    async for chunk in chunks:
+        batch: List[NDJSONLine] = []
+        start = 0
+        while True:
+            end = chunk.find(b"\n", start)
+            if end == -1:
+                break
+            if overflow:
+                number += 1
+                batch.append(_too_long(number, max_line_bytes))
+                overflow = False
+            elif len(pending) + end - start > max_line_bytes:
+                number += 1
+                batch.append(_too_long(number, max_line_bytes))
+            else:
+                pending += chunk[start:end]
+                if pending.strip():
+                    number += 1
+                    batch.append(parse_ndjson_line(number, bytes(pending)))
+            pending.clear()
+            start = end + 1
+
+        tail = chunk[start:]
+        if overflow or len(pending) + len(tail) > max_line_bytes:
+            overflow = True
+            pending.clear()
+        else:
+            pending += tail
+
+        if batch:
+            yield batch
+
+    if overflow:
+        yield [_too_long(number + 1, max_line_bytes)]
+    elif pending.strip():
+        yield [parse_ndjson_line(number + 1, bytes(pending))]
+
+
+def parse_ndjson_line(number: int, line: bytes) -> NDJSONLine:
+    """Parse and validate one NDJSON record."""
+    try:
+        payload = json.loads(line)
+    except ValueError:
+        return NDJSONLine(number, None, "Line is not valid JSON")
+    try:
+        return NDJSONLine(number, EmotionBatchItem.model_validate(payload), None)
+    except ValidationError as e:
+        detail = e.errors()[0]
+        field = ".".join(str(part) for part in detail["loc"])
+        return NDJSONLine(number, None, f"{field}: {detail['msg']}" if field else detail["msg"])
+
+
+def _too_long(number: int, max_line_bytes: int) -> NDJSONLine:
+    return NDJSONLine(number, None, f"Line exceeds {max_line_bytes} bytes")
+
+
+def encode_ndjson(record: Union[dict, str]) -> bytes:
+    """Serialize one output record as an NDJSON line."""
+    if isinstance(record, str):
+        return record.encode("utf-8") + b"\n"
+    return json.dumps(record).encode("utf-8") + b"\n"
+
+
+class DuplexStreamingResponse(StreamingResponse):
+    """
+    Streaming response whose body iterator keeps reading the request body.
+
+    ``StreamingResponse`` normally listens for client disconnects by calling
+    ``receive()`` concurrently with streaming, which would steal request body
+    messages from the iterator. Here the iterator is the only consumer of
+    ``receive()``; a disconnect surfaces through ``Request.stream()`` instead.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
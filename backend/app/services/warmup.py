@@ -0,0 +1,79 @@
+# backend/app/services/warmup.py
+"""
+Background warm-up after startup, and the readiness it reports.
+
+Importing the app builds nothing expensive: the analyzer, the lexicon and the
+classifier are created on first use. ``WarmUp`` creates them in a worker
+thread once the server has started, so liveness checks are answered at once
+and readiness only turns true when the first request will not pay for
+construction. A failed warm-up is retried with exponential backoff, so a
+transient error does not keep the instance out of rotation for good.
+"""
+import asyncio
+import time
+from typing import Optional
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+def _warm_up() -> None:
+    from app.services.emotion_analyzer import get_emotion_analyzer
+
+    get_emotion_analyzer().warm_up()
+
+
+class WarmUp:
+    """Runs the analyzer warm-up in the background until it succeeds"""
+
+    def __init__(self, enabled: bool, retry_delay: float = 1.0, max_retry_delay: float = 60.0):
+        self.enabled = enabled
+        # "pending", "warming", "ready" or "failed" (waiting to retry)
+        self.state = "pending" if enabled else "ready"
+        self.error: Optional[str] = None
+        self.duration: Optional[float] = None
+        # Seconds before the first retry, doubled after each failure
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "ready"
+
+    async def start(self) -> None:
+        if self.state != "pending" or self._task is not None:
+            return
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self) -> None:
+        started = time.perf_counter()
+        delay = self.retry_delay
+        while True:
+            self.state = "warming"
+            try:
+                await asyncio.get_running_loop().run_in_executor(None, _warm_up)
+                break
+            except Exception as e:
+                # Requests still build what they need on first use, but the
+                # instance is only reported ready once a warm-up succeeds
+                self.state = "failed"
+                self.error = str(e)
+                logger.error("Warm-up failed, retrying in %.0fs: %s", delay, e, exc_info=e)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_retry_delay)
+        self.duration = time.perf_counter() - started
+        self.state = "ready"
+        self.error = None
+        logger.info("Warm-up finished in %.3fs", self.duration)
+
+
+# Started by the app on startup
+warmup = WarmUp(enabled=settings.WARMUP_ON_STARTUP)
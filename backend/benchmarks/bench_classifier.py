@@ -0,0 +1,72 @@
+# backend/benchmarks/bench_classifier.py
+"""
+Compare the keyword path with the NumPy classifier (``use_real_model``).
+
+Simulated latency is turned off so only analysis cost is measured. Requests go
+through ``EmotionAnalyzer.analyze_emotion`` one at a time, and the classifier
+is also timed on whole batches of texts to show its vectorized throughput.
+Run from the backend directory:
+
+    python -m benchmarks.bench_classifier --requests 2000
+"""
+import argparse
+import os
+import random
+import time
+from typing import List
+
+
+def percentile(samples: List[float], quantile: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(quantile * len(ordered)))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Keyword vs classifier benchmark")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--length", type=int, default=200, help="characters per text")
+    parser.add_argument("--batch-size", type=int, default=256)
+    args = parser.parse_args()
+
+    # Settings are read at import time, so configure them before importing the app
+    os.environ["SIMULATED_LATENCY_MODE"] = "off"
+    os.environ["LOG_LEVEL"] = "WARNING"
+    from app.models.emotion import EmotionAnalysisRequest
+    from app.services.classifier import get_classifier
+    from app.services.emotion_analyzer import EmotionAnalyzer
+    from app.services.lexicon import default_lexicon_source
+    from benchmarks.bench_lexicon import make_text
+
+    rng = random.Random(42)
+    phrases = [word for groups in default_lexicon_source().emotion_keywords.values() for words in groups.values() for word in words]
+    texts = [make_text(args.length, phrases, rng) for _ in range(args.requests)]
+
+    started = time.perf_counter()
+    classifier = get_classifier()
+    classifier.predict(["warm up"])
+    print(f"classifier load:   {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    analyzer = EmotionAnalyzer()
+    print(f"{'path':>10} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8}")
+    for label, use_real_model in (("keywords", False), ("model", True)):
+        latencies = []
+        for text in texts:
+            sent = time.perf_counter()
+            request = EmotionAnalysisRequest(text=text, use_real_model=use_real_model)
+            analyzer.analyze_emotion(request)
+            latencies.append(time.perf_counter() - sent)
+        total = sum(latencies)
+        print(
+            f"{label:>10} {len(texts) / total:>9.0f} "
+            f"{percentile(latencies, 0.5) * 1000:>8.3f} {percentile(latencies, 0.99) * 1000:>8.3f}"
+        )
+
+    started = time.perf_counter()
+    for offset in range(0, len(texts), args.batch_size):
+        classifier.predict(texts[offset:offset + args.batch_size])
+    elapsed = time.perf_counter() - started
+    print(f"model batched ({args.batch_size}): {len(texts) / elapsed:.0f} texts/s")
+
+
+if __name__ == "__main__":
+    main()
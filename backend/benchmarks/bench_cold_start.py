@@ -0,0 +1,128 @@
+# backend/benchmarks/bench_cold_start.py
+"""
+Measure cold start: importing the app, and the first /analyze request.
+
+Each sample runs in a fresh interpreter, as a new worker would. Importing
+``app.main`` must stay cheap, so it must not load the modules listed in
+``DEFERRED_MODULES`` or read the lexicon file; these are loaded by the
+startup warm-up or by the first request. The first request is timed twice: straight after import, when it
+builds the analyzer and lexicon itself, and after the warm-up has run.
+
+The exit status is 1 if a median exceeds its budget or a deferred module is
+imported eagerly; tests/test_cold_start.py enforces the same budgets. Run
+from the backend directory:
+
+    python -m benchmarks.bench_cold_start --samples 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Must not be imported by ``import app.main``
+DEFERRED_MODULES = ("numpy", "uvicorn", "app.services.emotion_analyzer", "app.services.stats")
+
+# Median seconds for ``import app.main``, the first /analyze straight after
+# import, and the first /analyze after the warm-up
+IMPORT_BUDGET = 1.5
+FIRST_REQUEST_BUDGET = 0.5
+WARM_REQUEST_BUDGET = 0.05
+
+# Runs in the child interpreter; prints one JSON line
+_PROBE = """
+import asyncio, json, sys, time
+started = time.perf_counter()
+import app.main
+imported = time.perf_counter() - started
+deferred = [name for name in {deferred!r} if name in sys.modules]
+lexicon = sys.modules.get("app.services.lexicon")
+lexicon_loaded = lexicon is not None and (
+    lexicon._lexicon is not None or lexicon.default_lexicon_source.cache_info().currsize > 0
+)
+
+async def first_request():
+    import httpx
+    transport = httpx.ASGITransport(app=app.main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        started = time.perf_counter()
+        response = await client.post("/api/v1/emotion/analyze", json={{"text": "I feel happy and a bit nervous"}})
+        response.raise_for_status()
+        return time.perf_counter() - started
+
+if {warm_up!r}:
+    from app.services.warmup import _warm_up
+    _warm_up()
+print(json.dumps({{"import": imported, "first_request": asyncio.run(first_request()), "deferred": deferred, "lexicon_loaded": lexicon_loaded}}))
+"""
+
+
+def sample(warm_up: bool) -> Dict:
+    env = dict(
+        os.environ,
+        PYTHONPATH=str(BACKEND_DIR),
+        SIMULATED_LATENCY_MODE="off",
+        RATE_LIMIT_ENABLED="false",
+        LEXICON_RELOAD_INTERVAL="0",
+        LOG_LEVEL="WARNING",
+        LOG_FILE=""
+    )
+    code = _PROBE.format(deferred=DEFERRED_MODULES, warm_up=warm_up)
+    output = subprocess.run(
+        [sys.executable, "-c", code], cwd=BACKEND_DIR, env=env, check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Import-time and first-request benchmark")
+    parser.add_argument("--samples", type=int, default=5, help="fresh interpreters per configuration")
+    parser.add_argument("--import-budget", type=float, default=IMPORT_BUDGET, help="seconds for import app.main")
+    parser.add_argument(
+        "--first-request-budget", type=float, default=FIRST_REQUEST_BUDGET,
+        help="seconds for the first /analyze without warm-up"
+    )
+    parser.add_argument(
+        "--warm-request-budget", type=float, default=WARM_REQUEST_BUDGET,
+        help="seconds for the first /analyze after warm-up"
+    )
+    args = parser.parse_args()
+
+    cold: List[Dict] = [sample(warm_up=False) for _ in range(args.samples)]
+    warm: List[Dict] = [sample(warm_up=True) for _ in range(args.samples)]
+
+    checks = [
+        ("import app.main", [s["import"] for s in cold + warm], args.import_budget),
+        ("first request, cold", [s["first_request"] for s in cold], args.first_request_budget),
+        ("first request, warmed up", [s["first_request"] for s in warm], args.warm_request_budget),
+    ]
+    failures = []
+    print(f"{'':<26} {'median':>9} {'max':>9} {'budget':>9}")
+    for name, values, budget in checks:
+        median = statistics.median(values)
+        over = median > budget
+        if over:
+            failures.append(name)
+        print(f"{name:<26} {median * 1000:>7.1f}ms {max(values) * 1000:>7.1f}ms {budget * 1000:>7.0f}ms"
+              f"{'  OVER BUDGET' if over else ''}")
+
+    deferred = sorted({name for s in cold + warm for name in s["deferred"]})
+    if deferred:
+        print(f"Imported eagerly by app.main: {', '.join(deferred)}")
+        failures.append("deferred imports")
+    if any(s["lexicon_loaded"] for s in cold + warm):
+        print("Lexicon loaded by import app.main")
+        failures.append("deferred lexicon")
+    if failures:
+        print(f"\nFailed: {', '.join(failures)}")
+        sys.exit(1)
+    print("\nWithin budget")
+
+
+if __name__ == "__main__":
+    main()
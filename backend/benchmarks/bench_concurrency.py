@@ -0,0 +1,58 @@
+# backend/benchmarks/bench_concurrency.py
+"""
+Fire many parallel /analyze requests at a single in-process app instance.
+
+With the non-blocking analyzer path the whole burst should finish in about
+one simulated latency period rather than one period per request.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_concurrency --requests 200 --latency 0.5
+"""
+import argparse
+import asyncio
+import os
+import time
+
+
+async def run(requests: int, latency: float) -> None:
+    import httpx
+    from app.main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        payload = {"text": "I feel anxious about the deadline but hopeful too"}
+
+        async def one() -> float:
+            sent = time.perf_counter()
+            response = await client.post("/api/v1/emotion/analyze", json=payload)
+            response.raise_for_status()
+            return time.perf_counter() - sent
+
+        started = time.perf_counter()
+        latencies = sorted(await asyncio.gather(*(one() for _ in range(requests))))
+        elapsed = time.perf_counter() - started
+
+    print(f"requests:          {requests}")
+    print(f"simulated latency: {latency:.3f}s")
+    print(f"wall time:         {elapsed:.3f}s ({elapsed / latency:.2f} latency periods)")
+    print(f"throughput:        {requests / elapsed:.1f} req/s")
+    print(f"p50 / p99 latency: {latencies[len(latencies) // 2]:.3f}s / {latencies[int(len(latencies) * 0.99) - 1]:.3f}s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Concurrent /analyze benchmark")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.5, help="fixed simulated latency in seconds")
+    args = parser.parse_args()
+
+    # Settings are read at import time, so configure them before importing the app
+    os.environ["SIMULATED_LATENCY_MODE"] = "fixed"
+    os.environ["SIMULATED_LATENCY_FIXED"] = str(args.latency)
+    os.environ["RATE_LIMIT_ENABLED"] = "false"
+    os.environ["LOG_LEVEL"] = "WARNING"
+    asyncio.run(run(args.requests, args.latency))
+
+
+if __name__ == "__main__":
+    main()
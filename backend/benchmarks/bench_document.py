@@ -0,0 +1,127 @@
+# backend/benchmarks/bench_document.py
+"""
+Latency and memory of long-document analysis (/analyze/document).
+
+Documents are built from journal-like sentences grouped into paragraphs.
+Latency is measured end to end over an in-process ASGI transport for each
+chunk batch size; memory is the tracemalloc peak of the analysis itself for
+growing documents, which should grow with the timeline it returns; the working
+memory beyond the result should only grow by the lower-cased copy of the text
+made by the whole-document scan. Run from the backend directory:
+
+    python -m benchmarks.bench_document --size-kb 100 --repeat 10
+    ANALYZER_BACKEND=process python -m benchmarks.bench_document
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import time
+import tracemalloc
+from typing import List
+
+SENTENCES = [
+    "Today started slowly and I felt a bit tired after a restless night.",
+    "Work was stressful, the deadline keeps moving and I am worried about it.",
+    "Lunch with Sam made me laugh, and I felt genuinely happy for an hour.",
+    "Later I was frustrated that the same bug came back again.",
+    "The walk home was calm and peaceful, with the sky turning orange.",
+    "I keep wondering whether I made the right choice about the new job.",
+    "Honestly I am grateful for the people around me this week.",
+    "By evening I felt lonely in the empty flat and a little sad.",
+]
+
+
+def make_document(size: int, seed: int = 7) -> str:
+    """Paragraphs of three to eight sentences, ``size`` characters in total."""
+    rng = random.Random(seed)
+    paragraphs: List[str] = []
+    length = 0
+    while length < size:
+        paragraph = " ".join(rng.choice(SENTENCES) for _ in range(rng.randint(3, 8)))
+        paragraphs.append(paragraph)
+        length += len(paragraph) + 2
+    return "\n\n".join(paragraphs)[:size]
+
+
+async def time_requests(document: str, split: str, repeat: int) -> List[float]:
+    import httpx
+    from app.main import app
+
+    transport = httpx.ASGITransport(app=app)
+    payload = {"text": document, "split": split, "include_suggestions": True}
+    durations = []
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+        # First request builds the analyzer, lexicon and scorer
+        (await client.post("/api/v1/emotion/analyze/document", json=payload)).raise_for_status()
+        for _ in range(repeat):
+            started = time.perf_counter()
+            response = await client.post("/api/v1/emotion/analyze/document", json=payload)
+            durations.append(time.perf_counter() - started)
+            response.raise_for_status()
+    return durations
+
+
+def peak_memory(document: str, split: str) -> tuple:
+    """
+    Bytes still held by the result and peak bytes allocated beyond it while
+    analyzing ``document``, and its chunk count.
+    """
+    from app.models.emotion import EmotionDocumentRequest
+    from app.services.emotion_analyzer import get_emotion_analyzer
+
+    request = EmotionDocumentRequest(text=document, split=split)
+    analyzer = get_emotion_analyzer()
+
+    async def measure() -> tuple:
+        await analyzer.analyze_document_async(request)
+        # Traced inside the event loop: tearing the loop down allocates too
+        tracemalloc.start()
+        result = await analyzer.analyze_document_async(request)
+        retained, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return retained, peak - retained, result.chunks
+
+    return asyncio.run(measure())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Long-document analysis benchmark")
+    parser.add_argument("--size-kb", type=int, default=100, help="document size for the latency runs")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--batch-sizes", default="16,64,256", help="comma-separated DOCUMENT_BATCH_SIZE values")
+    parser.add_argument("--memory-sizes-kb", default="100,200,400", help="document sizes for the memory runs")
+    args = parser.parse_args()
+
+    os.environ.update(
+        SIMULATED_LATENCY_MODE="off",
+        RATE_LIMIT_ENABLED="false",
+        MAX_CONCURRENT_REQUESTS="0",
+        LEXICON_RELOAD_INTERVAL="0",
+        LOG_LEVEL="WARNING",
+        LOG_FILE="",
+        DOCUMENT_MAX_CHARS=str(max(args.size_kb, *map(int, args.memory_sizes_kb.split(","))) * 1024)
+    )
+    from app.core.config import settings
+
+    document = make_document(args.size_kb * 1024)
+    print(f"backend {settings.ANALYZER_BACKEND}, {settings.ANALYZER_MAX_WORKERS} workers, "
+          f"{len(document)} characters")
+    print(f"{'split':<10} {'batch':>6} {'median':>10} {'p90':>10}")
+    for split in ("sentence", "paragraph"):
+        for batch_size in map(int, args.batch_sizes.split(",")):
+            settings.DOCUMENT_BATCH_SIZE = batch_size
+            durations = sorted(asyncio.run(time_requests(document, split, args.repeat)))
+            p90 = durations[min(len(durations) - 1, int(len(durations) * 0.9))]
+            print(f"{split:<10} {batch_size:>6} {statistics.median(durations) * 1000:>8.1f}ms {p90 * 1000:>8.1f}ms")
+
+    settings.DOCUMENT_BATCH_SIZE = 64
+    print(f"\n{'size':>8} {'chunks':>7} {'result':>10} {'working':>10}")
+    for size_kb in map(int, args.memory_sizes_kb.split(",")):
+        retained, working, chunks = peak_memory(make_document(size_kb * 1024), "sentence")
+        print(f"{size_kb:>6}KB {chunks:>7} {retained / 1024:>8.0f}KB {working / 1024:>8.0f}KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+# backend/benchmarks/bench_lexicon.py
+"""
+Compare the compiled single-pass lexicon matcher with per-keyword substring scans.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_lexicon
+"""
+import argparse
+import random
+import string
+import timeit
+from typing import Dict, List, Sequence
+
+from app.models.emotion import EmotionType
+from app.services.lexicon import CompiledLexicon, default_lexicon_source
+
+FILLER_WORDS = [
+    "today", "work", "the", "meeting", "and", "my", "friend", "was", "really",
+    "about", "weekend", "family", "project", "after", "morning", "felt", "that",
+]
+
+
+def naive_scan(emotion_keywords, text: str):
+    """Reference implementation: one substring scan per keyword."""
+    text_lower = text.lower()
+    source = default_lexicon_source()
+    scores = {}
+    for emotion, keyword_groups in emotion_keywords.items():
+        score = 0.0
+        for keyword in keyword_groups.get('primary', []):
+            if keyword in text_lower:
+                score += 3.0
+        for keyword in keyword_groups.get('secondary', []):
+            if keyword in text_lower:
+                score += 2.0
+        for keyword in keyword_groups.get('contextual', []):
+            if keyword in text_lower:
+                score += 1.0
+        scores[emotion] = score
+    if any(word in text_lower for word in source.high_intensity_words):
+        intensity = "high"
+    elif any(word in text_lower for word in source.low_intensity_words):
+        intensity = "low"
+    else:
+        intensity = "medium"
+    crisis = any(keyword in text_lower for keyword in source.crisis_keywords)
+    return scores, intensity, crisis
+
+
+def scaled_lexicon(scale: int, rng: random.Random) -> Dict[EmotionType, Dict[str, List[str]]]:
+    """Default lexicon plus ``scale - 1`` times as many random made-up phrases."""
+    lexicon = {
+        emotion: {tier: list(words) for tier, words in groups.items()}
+        for emotion, groups in default_lexicon_source().emotion_keywords.items()
+    }
+    for groups in lexicon.values():
+        for words in groups.values():
+            extra = [
+                ''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(5, 12)))
+                for _ in range(len(words) * (scale - 1))
+            ]
+            words.extend(extra)
+    return lexicon
+
+
+def make_text(length: int, keywords: Sequence[str], rng: random.Random, density: float = 0.1) -> str:
+    """About ``length`` characters of filler with a ``density`` fraction of keyword words."""
+    words: List[str] = []
+    size = 0
+    while size < length:
+        word = rng.choice(keywords) if rng.random() < density else rng.choice(FILLER_WORDS)
+        words.append(word)
+        size += len(word) + 1
+    return ' '.join(words)[:length]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lengths", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    print(f"{'lexicon':>8} {'phrases':>8} {'chars':>7} {'naive us':>10} {'compiled us':>12} {'speedup':>8}")
+    for scale in args.scales:
+        keywords = scaled_lexicon(scale, rng)
+        compiled = CompiledLexicon(keywords)
+        phrases = list(compiled.patterns)
+        for length in args.lengths:
+            text = make_text(length, phrases, rng)
+            expected = naive_scan(keywords, text)
+            assert tuple(compiled.scan(text))[:3] == expected, "matcher results diverged"
+
+            number = max(1, 20000 // length)
+            naive = min(timeit.repeat(lambda: naive_scan(keywords, text), number=number, repeat=args.repeat)) / number
+            fast = min(timeit.repeat(lambda: compiled.scan(text), number=number, repeat=args.repeat)) / number
+            print(
+                f"{scale:>7}x {len(phrases):>8} {length:>7} {naive * 1e6:>10.1f} "
+                f"{fast * 1e6:>12.1f} {naive / fast:>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
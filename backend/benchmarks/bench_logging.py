@@ -0,0 +1,111 @@
+# backend/benchmarks/bench_logging.py
+"""
+Measure /analyze throughput with request logging off, written synchronously
+and written through the background queue.
+
+Simulated latency and rate limiting are off, so each request is dominated by
+routing, scoring and logging. Log lines go to a temporary file; each
+configuration is run ``--rounds`` times, interleaved, and the best round is
+reported. Run from the backend directory:
+
+    python -m benchmarks.bench_logging --requests 2000 --rounds 3
+"""
+import argparse
+import asyncio
+import logging
+import os
+import random
+import tempfile
+import time
+from pathlib import Path
+
+
+def configure(mode: str, log_file: Path) -> None:
+    from app.core.logging import setup_logging, stop_logging
+
+    logger = logging.getLogger("app")
+    if mode == "off":
+        stop_logging()
+        logger.handlers.clear()
+        logger.setLevel(logging.WARNING)
+    elif mode == "blocking":
+        # The previous setup: text lines formatted and written on the request path
+        stop_logging()
+        handler = logging.FileHandler(log_file)
+        handler.setFormatter(logging.Formatter(
+            "%(asctime)s - %(name)s - %(levelname)s - %(funcName)s:%(lineno)d - %(message)s"
+        ))
+        logger.handlers.clear()
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+    else:
+        sample_rates = {logging.INFO: 0.1} if mode == "queue-sampled" else None
+        setup_logging("app", level="INFO", log_file=str(log_file), console=False, sample_rates=sample_rates)
+    logger.propagate = False
+
+
+async def run(client, texts) -> float:
+    async def one(text: str) -> None:
+        response = await client.post("/api/v1/emotion/analyze", json={"text": text})
+        response.raise_for_status()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(text) for text in texts))
+    return time.perf_counter() - started
+
+
+async def compare(requests: int, rounds: int, modes) -> None:
+    import httpx
+    from app.core.logging import stop_logging
+    from app.main import app
+    from app.services.lexicon import default_lexicon_source
+    from benchmarks.bench_lexicon import make_text
+
+    rng = random.Random(42)
+    phrases = [word for groups in default_lexicon_source().emotion_keywords.values() for words in groups.values() for word in words]
+    texts = [make_text(200, phrases, rng) for _ in range(requests)]
+
+    best = {mode: float("inf") for mode in modes}
+    with tempfile.TemporaryDirectory() as directory:
+        log_file = Path(directory) / "bench.log"
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            # Warm up the lexicon, thread pool and routing
+            configure("off", log_file)
+            await run(client, texts[:200])
+            for _ in range(rounds):
+                for mode in modes:
+                    configure(mode, log_file)
+                    best[mode] = min(best[mode], await run(client, texts))
+        stop_logging()
+
+    baseline = requests / best["off"] if "off" in best else None
+    print(f"{'logging':>14} {'req/s':>9} {'vs off':>8}")
+    for mode in modes:
+        rate = requests / best[mode]
+        relative = f"{(rate / baseline - 1) * 100:+7.1f}%" if baseline else ""
+        print(f"{mode:>14} {rate:>9.0f} {relative:>8}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Request logging overhead benchmark")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument(
+        "--modes", nargs="+", default=["off", "blocking", "queue", "queue-sampled"],
+        choices=["off", "blocking", "queue", "queue-sampled"]
+    )
+    args = parser.parse_args()
+
+    # Settings are read at import time, so configure them before importing the app
+    os.environ["SIMULATED_LATENCY_MODE"] = "off"
+    os.environ["RATE_LIMIT_ENABLED"] = "false"
+    os.environ["MAX_CONCURRENT_REQUESTS"] = "0"
+    os.environ["LEXICON_RELOAD_INTERVAL"] = "0"
+    os.environ["LOG_LEVEL"] = "WARNING"
+    os.environ["LOG_FILE"] = ""
+    asyncio.run(compare(args.requests, args.rounds, args.modes))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# backend/benchmarks/bench_micro_batch.py
+"""
+Score bursts of concurrent analyses with and without micro-batching.
+
+Simulated latency is off, so the numbers reflect scoring and scheduling cost
+only. For each batching configuration the same burst is sent through
+``EmotionAnalyzer.analyze_emotion_async`` and the scheduler's counters are
+printed next to throughput. Run from the backend directory:
+
+    python -m benchmarks.bench_micro_batch --requests 5000 --sizes 1 16 64 256
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+
+
+async def burst(analyzer, requests) -> float:
+    started = time.perf_counter()
+    await asyncio.gather(*(analyzer.analyze_emotion_async(request) for request in requests))
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Micro-batching benchmark")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[16, 64, 256], help="max batch sizes to try")
+    parser.add_argument("--wait-ms", type=float, default=2.0)
+    parser.add_argument("--model", action="store_true", help="send use_real_model requests")
+    args = parser.parse_args()
+
+    # Settings are read at import time, so configure them before importing the app
+    os.environ["SIMULATED_LATENCY_MODE"] = "off"
+    os.environ["LOG_LEVEL"] = "WARNING"
+    from app.models.emotion import EmotionAnalysisRequest
+    from app.services.emotion_analyzer import EmotionAnalyzer
+    from app.services.lexicon import default_lexicon_source
+    from app.services.micro_batching import MicroBatcher
+    from benchmarks.bench_lexicon import make_text
+
+    rng = random.Random(42)
+    phrases = [word for groups in default_lexicon_source().emotion_keywords.values() for words in groups.values() for word in words]
+    requests = [
+        EmotionAnalysisRequest(text=make_text(200, phrases, rng), use_real_model=args.model)
+        for _ in range(args.requests)
+    ]
+
+    analyzer = EmotionAnalyzer()
+    print(f"{'batching':>14} {'req/s':>9} {'mean batch':>11} {'wait p50 ms':>12} {'wait p99 ms':>12}")
+
+    analyzer.micro_batcher = None
+    elapsed = asyncio.run(burst(analyzer, requests))
+    print(f"{'off':>14} {len(requests) / elapsed:>9.0f}")
+
+    for size in args.sizes:
+        analyzer.micro_batcher = MicroBatcher(
+            analyzer._analyze_queued, analyzer._executor, max_batch_size=size, max_wait_ms=args.wait_ms
+        )
+        elapsed = asyncio.run(burst(analyzer, requests))
+        stats = analyzer.get_micro_batch_stats()
+        print(
+            f"{f'max {size}':>14} {len(requests) / elapsed:>9.0f} {stats.average_batch_size:>11.1f} "
+            f"{stats.queue_wait_p50 * 1000:>12.2f} {stats.queue_wait_p99 * 1000:>12.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# backend/benchmarks/bench_probes.py
+"""
+Throughput of the read-mostly endpoints: /emotions, /health and /stats.
+
+Each endpoint is probed in three modes over an in-process ASGI transport:
+models serialized per request (FAST_RESPONSES off), pre-encoded snapshots,
+and conditional requests that revalidate a snapshot with If-None-Match.
+``--writes`` records that many synthetic analyses between probes, so /stats
+has to notice new data. Run from the backend directory:
+
+    python -m benchmarks.bench_probes --requests 5000
+    python -m benchmarks.bench_probes --writes 1
+"""
+import argparse
+import asyncio
+import os
+import time
+
+ENDPOINTS = ("/api/v1/emotion/emotions", "/api/v1/emotion/health", "/api/v1/emotion/stats")
+
+
+async def probe(path: str, requests: int, conditional: bool, writes: int) -> tuple:
+    """Requests per second, and the share of them answered with 304."""
+    import httpx
+    from app.main import app
+    from app.services.emotion_analyzer import get_emotion_analyzer
+
+    analyzer = get_emotion_analyzer()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        response = await client.get(path)
+        response.raise_for_status()
+        headers = {}
+        if conditional and "etag" in response.headers:
+            headers["If-None-Match"] = response.headers["etag"]
+
+        not_modified = 0
+        started = time.perf_counter()
+        for _ in range(requests):
+            for _ in range(writes):
+                analyzer.stats.record("Happy", 0.8, 0.001)
+            response = await client.get(path, headers=headers)
+            if response.status_code == 304:
+                not_modified += 1
+            elif response.status_code == 200:
+                if conditional and "etag" in response.headers:
+                    headers["If-None-Match"] = response.headers["etag"]
+            else:
+                response.raise_for_status()
+        elapsed = time.perf_counter() - started
+    return requests / elapsed, not_modified / requests
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Read-mostly endpoint benchmark")
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--writes", type=int, default=0, help="analyses recorded before each probe")
+    args = parser.parse_args()
+
+    os.environ.update(
+        SIMULATED_LATENCY_MODE="off",
+        RATE_LIMIT_ENABLED="false",
+        MAX_CONCURRENT_REQUESTS="0",
+        LEXICON_RELOAD_INTERVAL="0",
+        LOG_LEVEL="WARNING",
+        LOG_FILE=""
+    )
+    from app.core.config import settings
+
+    modes = (
+        ("serialized", False, False),
+        ("snapshot", True, False),
+        ("revalidated", True, True),
+    )
+    print(f"{args.requests} requests, {args.writes} writes per request, "
+          f"stats interval {settings.STATS_SNAPSHOT_INTERVAL}s")
+    print(f"{'endpoint':<12} {'mode':<12} {'req/s':>10} {'304':>7}")
+    for path in ENDPOINTS:
+        for mode, fast, conditional in modes:
+            settings.FAST_RESPONSES = fast
+            rate, not_modified = asyncio.run(probe(path, args.requests, conditional, args.writes))
+            print(f"{path.rsplit('/', 1)[-1]:<12} {mode:<12} {rate:>10.0f} {not_modified:>6.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+# backend/benchmarks/bench_process_pool.py
+"""
+Lexicon scan throughput in-process versus on the shared-memory process pool.
+
+The same texts are scanned once in the current process and then through
+``ProcessScanPool`` with an increasing number of workers; scaling flattens out
+at the number of physical cores. Run from the backend directory:
+
+    python -m benchmarks.bench_process_pool --texts 20000 --workers 1 2 4 8
+"""
+import argparse
+import os
+import random
+import time
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Process pool scaling benchmark")
+    parser.add_argument("--texts", type=int, default=20000)
+    parser.add_argument("--length", type=int, default=1000, help="characters per text")
+    parser.add_argument("--workers", type=int, nargs="+", default=None)
+    parser.add_argument("--chunk-size", type=int, default=64)
+    args = parser.parse_args()
+
+    os.environ["LOG_LEVEL"] = "WARNING"
+    from app.services.lexicon import default_lexicon_source, get_lexicon
+    from app.services.process_pool import ProcessScanPool
+    from benchmarks.bench_lexicon import make_text
+
+    cores = os.cpu_count() or 1
+    workers = args.workers or sorted({1, 2, max(1, cores // 2), cores})
+    rng = random.Random(42)
+    phrases = [word for groups in default_lexicon_source().emotion_keywords.values() for words in groups.values() for word in words]
+    texts = [make_text(args.length, phrases, rng) for _ in range(args.texts)]
+
+    lexicon = get_lexicon()
+    started = time.perf_counter()
+    expected = [lexicon.scan(text) for text in texts]
+    baseline = args.texts / (time.perf_counter() - started)
+    print(f"cpu cores: {cores}")
+    print(f"{'backend':>12} {'texts/s':>10} {'speedup':>8}")
+    print(f"{'in-process':>12} {baseline:>10.0f} {1.0:>7.2f}x")
+
+    for count in workers:
+        pool = ProcessScanPool(lexicon, workers=count, chunk_size=args.chunk_size)
+        try:
+            pool.scan(texts[:count * args.chunk_size])  # start and warm up every worker
+            started = time.perf_counter()
+            scans = pool.scan(texts)
+            rate = args.texts / (time.perf_counter() - started)
+        finally:
+            pool.close()
+        assert [scan.matched for scan in scans] == [scan.matched for scan in expected], "pool results diverged"
+        print(f"{f'{count} workers':>12} {rate:>10.0f} {rate / baseline:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
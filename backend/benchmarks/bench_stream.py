@@ -0,0 +1,127 @@
+# backend/benchmarks/bench_stream.py
+"""
+Stream NDJSON records through /analyze/stream on a real uvicorn server.
+
+The client writes the chunked request body and reads result lines at the same
+time over one socket, and the server's resident memory is sampled as records
+flow through. Run from the backend directory:
+
+    python -m benchmarks.bench_stream --records 100000
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+TEXTS = [
+    "I feel anxious about the deadline but hopeful too",
+    "What a wonderful and joyful day with my family",
+    "Slightly frustrated that nothing works on this project",
+    "Feeling calm and peaceful after my morning meditation",
+]
+
+
+def rss_kb(pid: int) -> int:
+    with open(f"/proc/{pid}/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def wait_for_server(port: int) -> None:
+    for _ in range(100):
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.1)
+    raise RuntimeError("server did not start")
+
+
+async def stream(port: int, records: int, server_pid: int) -> None:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(
+        b"POST /api/v1/emotion/analyze/stream HTTP/1.1\r\n"
+        b"Host: bench\r\nContent-Type: application/x-ndjson\r\n"
+        b"Transfer-Encoding: chunked\r\n\r\n"
+    )
+
+    async def send_body() -> None:
+        batch = []
+        for i in range(records):
+            batch.append(json.dumps({"text": TEXTS[i % len(TEXTS)]}).encode() + b"\n")
+            if len(batch) == 200:
+                data = b"".join(batch)
+                writer.write(b"%x\r\n%s\r\n" % (len(data), data))
+                await writer.drain()
+                batch = []
+        if batch:
+            data = b"".join(batch)
+            writer.write(b"%x\r\n%s\r\n" % (len(data), data))
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+    sender = asyncio.create_task(send_body())
+    started = time.perf_counter()
+    baseline = rss_kb(server_pid)
+    peak = baseline
+    received = 0
+
+    # Skip the response head, then count result lines inside the chunked body
+    while (await reader.readline()) not in (b"\r\n", b""):
+        pass
+    buffer = b""
+    while received < records:
+        size = int((await reader.readline()).strip(), 16)
+        if size == 0:
+            break
+        buffer += await reader.readexactly(size)
+        await reader.readexactly(2)
+        lines = buffer.split(b"\n")
+        buffer = lines.pop()
+        received += len(lines)
+        if received % 10000 < len(lines):
+            peak = max(peak, rss_kb(server_pid))
+            print(f"  {received:>9} records  server RSS {rss_kb(server_pid) / 1024:7.1f} MiB")
+
+    elapsed = time.perf_counter() - started
+    await sender
+    writer.close()
+    print(f"records:     {received}")
+    print(f"throughput:  {received / elapsed:.0f} records/s")
+    print(f"server RSS:  {baseline / 1024:.1f} MiB at start, {peak / 1024:.1f} MiB peak")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="NDJSON streaming benchmark")
+    parser.add_argument("--records", type=int, default=50000)
+    args = parser.parse_args()
+
+    port = free_port()
+    env = dict(os.environ, SIMULATED_LATENCY_MODE="off", LOG_LEVEL="WARNING")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env,
+    )
+    try:
+        asyncio.run(wait_for_server(port))
+        asyncio.run(stream(port, args.records, server.pid))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+# backend/benchmarks/suite.py
+"""
+Benchmark suite for the analyzer and API hot paths, with JSON baselines.
+
+Corpora are generated for every combination of text length and keyword
+density. Micro-benchmarks time the lexicon pass (matching, then scoring and
+intensity), request validation, and stats recording and snapshots as history
+grows. End-to-end runs send /analyze requests to the app in process over an
+ASGI transport with simulated latency, rate limiting and logging off.
+
+Record a baseline, then compare later runs against it; the exit status is 1
+if any metric is worse than the baseline by more than ``--threshold``:
+
+    python -m benchmarks.suite --save
+    python -m benchmarks.suite --threshold 0.2
+
+Baselines are only comparable on the same machine and settings.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sys
+import time
+import timeit
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+
+LENGTHS = (50, 300, 1000)
+DENSITIES = (0.0, 0.1, 0.4)
+TEXTS_PER_CORPUS = 50
+HISTORY_SIZES = (0, 1000, 100000)
+CONCURRENCY = (1, 16, 64)
+
+Results = Dict[str, Dict]
+
+
+def record(results: Results, name: str, value: float, unit: str, better: str = "lower") -> None:
+    results[name] = {"value": value, "unit": unit, "better": better}
+    print(f"  {name:<40} {value:>14.6g} {unit}")
+
+
+def per_call(fn: Callable[[], object], calls: int, repeat: int) -> float:
+    """Best-of-``repeat`` seconds per call, for ``fn`` making ``calls`` calls."""
+    timer = timeit.Timer(fn)
+    # At least 0.2s per measurement, so timer resolution and jitter stay small
+    number, _ = timer.autorange()
+    return min(timer.repeat(number=number, repeat=repeat)) / (number * calls)
+
+
+def make_corpora(rng: random.Random) -> Dict[str, List[str]]:
+    from app.services.lexicon import default_lexicon_source
+    from benchmarks.bench_lexicon import make_text
+
+    phrases = [word for groups in default_lexicon_source().emotion_keywords.values() for words in groups.values() for word in words]
+    return {
+        f"len{length}-kw{int(density * 100)}": [
+            make_text(length, phrases, rng, density) for _ in range(TEXTS_PER_CORPUS)
+        ]
+        for length in LENGTHS
+        for density in DENSITIES
+    }
+
+
+def bench_lexicon(results: Results, corpora: Dict[str, List[str]], repeat: int) -> None:
+    """The single lexicon pass that replaced the per-emotion scoring and intensity scans."""
+    from app.services.lexicon import get_lexicon
+
+    lexicon = get_lexicon()
+    print("lexicon")
+    for name, texts in corpora.items():
+        matches = [lexicon.match(text) for text in texts]
+        record(results, f"lexicon.match/{name}", per_call(
+            lambda: [lexicon.match(text) for text in texts], len(texts), repeat
+        ), "s")
+        # Emotion scores and intensity from the matched phrases
+        record(results, f"lexicon.evaluate/{name}", per_call(
+            lambda: [lexicon.evaluate(matched) for matched in matches], len(matches), repeat
+        ), "s")
+
+
+def bench_validation(results: Results, corpora: Dict[str, List[str]], repeat: int) -> None:
+    """Building an ``EmotionAnalysisRequest``: text validation, crisis check and scan."""
+    from app.models.emotion import EmotionAnalysisRequest
+
+    print("validation")
+    for name, texts in corpora.items():
+        record(results, f"validate/{name}", per_call(
+            lambda: [EmotionAnalysisRequest(text=text) for text in texts], len(texts), repeat
+        ), "s")
+
+
+def bench_stats(results: Results, repeat: int) -> None:
+    from app.services.stats import StatsAggregator
+
+    print("stats")
+    rng = random.Random(7)
+    emotions = ["Happy", "Sad", "Anxious", "Calm", "Neutral"]
+    for size in HISTORY_SIZES:
+        stats = StatsAggregator(history_size=size)
+        for _ in range(max(size, 10000)):
+            stats.record(rng.choice(emotions), rng.random(), rng.random())
+        record(results, f"stats.record/history{size}", per_call(
+            lambda: stats.record("Happy", 0.8, 0.001), 1, repeat
+        ), "s")
+        record(results, f"get_stats/history{size}", per_call(stats.snapshot, 1, repeat), "s")
+
+
+async def _e2e(texts: List[str], concurrency: int) -> List[float]:
+    import httpx
+    from app.main import app
+
+    latencies: List[float] = []
+    queue = iter(texts)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def worker() -> None:
+            for text in queue:
+                sent = time.perf_counter()
+                response = await client.post("/api/v1/emotion/analyze", json={"text": text})
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - sent)
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies
+
+
+def bench_e2e(results: Results, corpora: Dict[str, List[str]], requests: int, repeat: int) -> None:
+    print("end to end")
+    pool = [text for texts in corpora.values() for text in texts]
+    texts = [pool[i % len(pool)] for i in range(requests)]
+    asyncio.run(_e2e(texts[:200], 16))
+    for concurrency in CONCURRENCY:
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            latencies = sorted(asyncio.run(_e2e(texts, concurrency)))
+            elapsed = time.perf_counter() - started
+            if best is None or elapsed < best[0]:
+                best = (elapsed, latencies)
+        elapsed, latencies = best
+        record(results, f"e2e.throughput/c{concurrency}", requests / elapsed, "req/s", better="higher")
+        record(results, f"e2e.p50/c{concurrency}", latencies[len(latencies) // 2], "s")
+        record(results, f"e2e.p99/c{concurrency}", latencies[int(len(latencies) * 0.99) - 1], "s")
+
+
+def compare(results: Results, baseline: Results, threshold: float) -> List[str]:
+    """Names of metrics worse than ``baseline`` by more than ``threshold``."""
+    regressions = []
+    print(f"\n{'metric':<40} {'baseline':>12} {'current':>12} {'change':>8}")
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None or not previous["value"]:
+            continue
+        change = current["value"] / previous["value"] - 1
+        worse = -change if current["better"] == "higher" else change
+        flag = " REGRESSION" if worse > threshold else ""
+        if flag:
+            regressions.append(name)
+        print(f"{name:<40} {previous['value']:>12.6g} {current['value']:>12.6g} {change * 100:>+7.1f}%{flag}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Analyzer and API benchmark suite")
+    parser.add_argument("--only", nargs="+", choices=["lexicon", "validation", "stats", "e2e"])
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save", action="store_true", help="write results as the new baseline")
+    parser.add_argument("--output", type=Path, help="also write this run's results here")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown, as a fraction")
+    parser.add_argument("--requests", type=int, default=1000, help="requests per end-to-end run")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    # Settings are read at import time, so configure them before importing the app
+    os.environ["SIMULATED_LATENCY_MODE"] = "off"
+    os.environ["RATE_LIMIT_ENABLED"] = "false"
+    os.environ["MAX_CONCURRENT_REQUESTS"] = "0"
+    os.environ["LEXICON_RELOAD_INTERVAL"] = "0"
+    os.environ["LOG_LEVEL"] = "WARNING"
+    os.environ["LOG_FILE"] = ""
+
+    groups = set(args.only or ["lexicon", "validation", "stats", "e2e"])
+    corpora = make_corpora(random.Random(42))
+    results: Results = {}
+    if "lexicon" in groups:
+        bench_lexicon(results, corpora, args.repeat)
+    if "validation" in groups:
+        bench_validation(results, corpora, args.repeat)
+    if "stats" in groups:
+        bench_stats(results, args.repeat)
+    if "e2e" in groups:
+        bench_e2e(results, corpora, args.requests, args.repeat)
+
+    report = {
+        "created": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "machine": f"{platform.system()} {platform.machine()}, {os.cpu_count()} CPUs",
+        "results": results,
+    }
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+    if args.save:
+        args.baseline.write_text(json.dumps(report, indent=2))
+        print(f"\nBaseline written to {args.baseline}")
+        return
+
+    if not args.baseline.exists():
+        print(f"\nNo baseline at {args.baseline}; run with --save to create one")
+        return
+    baseline = json.loads(args.baseline.read_text())
+    if baseline.get("machine") != report["machine"]:
+        print(f"\nWarning: baseline was recorded on {baseline.get('machine')}")
+    regressions = compare(results, baseline["results"], args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+    print(f"\nNo regressions over {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
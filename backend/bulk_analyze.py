@@ -0,0 +1,71 @@
+# backend/bulk_analyze.py
+"""
+Analyze a JSONL or CSV file offline on all cores, without the HTTP API.
+
+JSONL records carry ``text`` and optional ``include_suggestions``, like
+/analyze/stream; CSV files need a header with a text column. Results are
+written in input order, as JSONL or as a directory of NumPy column files.
+An interrupted run can be continued with ``--resume``:
+
+    python bulk_analyze.py archive.jsonl results.jsonl --workers 8
+    python bulk_analyze.py archive.csv results/ --output-format columnar --resume
+"""
+import argparse
+import os
+import sys
+from pathlib import Path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Offline bulk emotion analysis")
+    parser.add_argument("input", type=Path, help="JSONL or CSV file to analyze")
+    parser.add_argument("output", type=Path, help="JSONL file, or directory for columnar output")
+    parser.add_argument("--input-format", choices=("jsonl", "csv"), help="default: from the input file name")
+    parser.add_argument("--output-format", choices=("jsonl", "columnar"), default="jsonl")
+    parser.add_argument("--text-column", default="text", help="CSV column holding the text")
+    parser.add_argument("--no-suggestions", action="store_true", help="leave suggestions out of the results")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes")
+    parser.add_argument("--chunk-kb", type=int, default=1024, help="input read per task, in KiB")
+    parser.add_argument("--checkpoint", type=Path, help="default: OUTPUT.checkpoint")
+    parser.add_argument("--resume", action="store_true", help="continue from the checkpoint if there is one")
+    args = parser.parse_args()
+
+    # Per-batch log lines would only slow a bulk run down; inherited by the workers
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    from app.services.bulk import BulkOptions, BulkProgress, input_format_for, run_bulk
+
+    options = BulkOptions(
+        input=args.input,
+        input_format=args.input_format or input_format_for(args.input),
+        output=args.output,
+        output_format=args.output_format,
+        text_column=args.text_column,
+        include_suggestions=not args.no_suggestions,
+        chunk_bytes=max(1, args.chunk_kb) * 1024
+    )
+    checkpoint = args.checkpoint or args.output.with_name(args.output.name + ".checkpoint")
+
+    def report(progress: BulkProgress) -> None:
+        share = progress.bytes_done / progress.bytes_total if progress.bytes_total else 1.0
+        print(f"\r{progress.records:>12} records {share:>7.1%} {progress.rate:>10.0f} records/s",
+              end="", file=sys.stderr, flush=True)
+
+    try:
+        result = run_bulk(options, max(1, args.workers), checkpoint, resume=args.resume, progress=report)
+    except KeyboardInterrupt:
+        print(f"\nInterrupted; run again with --resume to continue from {checkpoint}", file=sys.stderr)
+        sys.exit(130)
+    except (OSError, ValueError) as e:
+        print(f"\nError: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    print(file=sys.stderr)
+    print(f"records:     {result.records} ({result.rejected} rejected)")
+    if result.resumed:
+        print(f"resumed at:  {result.resumed}")
+    print(f"elapsed:     {result.elapsed:.1f}s")
+    print(f"throughput:  {result.rate:.0f} records/s")
+
+
+if __name__ == "__main__":
+    main()
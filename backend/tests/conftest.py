@@ -0,0 +1,14 @@
+# backend/tests/conftest.py
+import os
+import tempfile
+
+# Settings are read when app modules are first imported, so this runs before
+# any test module imports them
+os.environ.update(
+    SIMULATED_LATENCY_MODE="off",
+    RATE_LIMIT_ENABLED="false",
+    LEXICON_RELOAD_INTERVAL="0",
+    LOG_LEVEL="WARNING",
+    LOG_FILE="",
+    JOBS_DB_PATH=os.path.join(tempfile.mkdtemp(prefix="emotion-tests-"), "jobs.sqlite3"),
+)
@@ -0,0 +1,44 @@
+# backend/tests/test_admission.py
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from app.core.admission import TokenBucketLimiter, admission_controller
+from app.core.config import Settings, settings
+from app.main import app, create_application
+
+
+@pytest.fixture
+def one_request_per_client(monkeypatch):
+    monkeypatch.setattr(admission_controller, "limiter", TokenBucketLimiter(1, 3600))
+
+
+def test_rate_limit_is_on_by_default():
+    # conftest turns it off for the other tests
+    defaults = Settings.model_fields
+    assert defaults["RATE_LIMIT_ENABLED"].default is True
+    assert defaults["RATE_LIMIT_REQUESTS"].default / defaults["RATE_LIMIT_PERIOD"].default >= 1
+
+
+def test_every_analysis_entry_point_is_limited(one_request_per_client):
+    client = TestClient(app)
+    assert client.post("/api/v1/emotion/analyze", json={"text": "I feel great"}).status_code == 200
+
+    response = client.post("/api/v1/emotion/jobs", json={"items": [{"text": "I feel great"}]})
+    assert response.status_code == 429
+    assert "retry-after" in response.headers
+    assert client.post("/api/v1/emotion/analyze/batch", json={"items": [{"text": "hi"}]}).status_code == 429
+    with pytest.raises(WebSocketDisconnect):
+        with client.websocket_connect("/api/v1/emotion/analyze/live"):
+            pass
+
+    # Read-only endpoints are not admission-controlled
+    assert client.get("/api/v1/emotion/health").status_code == 200
+    assert client.get("/api/v1/emotion/stats/admission").json()["shed_rate_limited"] == 3
+
+
+def test_admission_paths_follow_the_api_prefix(monkeypatch, one_request_per_client):
+    monkeypatch.setattr(settings, "API_V1_STR", "/api/v2")
+    client = TestClient(create_application())
+    assert client.post("/api/v2/emotion/analyze", json={"text": "I feel great"}).status_code == 200
+    assert client.post("/api/v2/emotion/analyze", json={"text": "I feel great"}).status_code == 429
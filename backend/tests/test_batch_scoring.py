@@ -0,0 +1,28 @@
+# backend/tests/test_batch_scoring.py
+import random
+
+from app.core.config import settings
+from app.models.emotion import EmotionAnalysisRequest, EmotionBatchItem
+from app.services.emotion_analyzer import get_emotion_analyzer
+from app.services.lexicon import get_lexicon
+from benchmarks.bench_lexicon import make_text
+
+FIELDS = ("emotion", "confidence", "secondary_emotions", "suggestions", "emotion_intensity")
+
+
+def test_batch_matches_single_analyses(monkeypatch):
+    # Seeds the noise from the text, so both paths draw the same numbers
+    monkeypatch.setattr(settings, "DETERMINISTIC_ANALYSIS", True)
+    monkeypatch.setattr(settings, "RESULT_CACHE_MAX_ENTRIES", 0)
+    rng = random.Random(5)
+    lexicon = get_lexicon()
+    phrases = [p for p in lexicon.patterns if p and p not in lexicon.crisis_keywords]
+    texts = [make_text(length, phrases, rng, density) for length in (5, 80, 600) for density in (0.0, 0.2, 0.6)]
+    texts += ["ok", "neutral words only here", "I AM HAPPY BUT ALSO WORRIED"]
+
+    analyzer = get_emotion_analyzer()
+    batch = analyzer.analyze_batch([EmotionBatchItem(text=text) for text in texts])
+    for text, item in zip(texts, batch):
+        single = analyzer.analyze_emotion(EmotionAnalysisRequest(text=text))
+        assert item.error is None
+        assert item.result.model_dump(include=set(FIELDS)) == single.model_dump(include=set(FIELDS)), text
@@ -0,0 +1,111 @@
+# backend/tests/test_bulk.py
+import csv
+import io
+import json
+import mmap
+
+import pytest
+
+from app.core.config import settings
+from app.models.emotion import EmotionAnalysisRequest
+from app.services.bulk import BulkOptions, iter_spans, load_checkpoint, run_bulk
+from app.services.emotion_analyzer import get_emotion_analyzer
+
+TEXTS = [
+    "I am so happy and excited about the trip this weekend!",
+    "Work has been stressful and I feel anxious about tomorrow.",
+    "I'm frustrated that nobody listened to me in the meeting.",
+    "Feeling calm and peaceful after a long walk by the lake.",
+    "I miss my friends and feel a bit lonely tonight.",
+]
+# Differ between two analyses of the same text
+VOLATILE = ("timestamp", "processing_time", "analysis_id")
+
+
+class Interrupted(Exception):
+    pass
+
+
+@pytest.fixture
+def deterministic(monkeypatch):
+    # The environment reaches the spawned worker processes, the setting this one
+    monkeypatch.setenv("DETERMINISTIC_ANALYSIS", "true")
+    monkeypatch.setattr(settings, "DETERMINISTIC_ANALYSIS", True)
+
+
+def stable(line: bytes) -> dict:
+    record = json.loads(line)
+    return {key: value for key, value in record.items() if key not in VOLATILE}
+
+
+def write_jsonl(path, count: int):
+    path.write_text("".join(json.dumps({"text": TEXTS[i % len(TEXTS)] + f" ({i})"}) + "\n" for i in range(count)))
+    return path
+
+
+def test_csv_chunks_never_cut_a_quoted_field(tmp_path):
+    rows = [["id", "text"]] + [
+        [str(i), f'line one of {i}\n"quoted" line two\nline three'] if i % 3 == 0 else [str(i), f"plain {i}"]
+        for i in range(40)
+    ]
+    buffer = io.StringIO(newline="")
+    csv.writer(buffer).writerows(rows)
+    path = tmp_path / "input.csv"
+    path.write_text(buffer.getvalue(), newline="")
+
+    def parse(quoted: bool):
+        with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            chunks = [data[start:end].decode("utf-8") for start, end in iter_spans(data, 0, 30, quoted=quoted)]
+        return [row for chunk in chunks for row in csv.reader(io.StringIO(chunk, newline=""))]
+
+    assert parse(quoted=True) == rows
+    # The precondition: plain line chunks do cut through the multi-line fields
+    assert parse(quoted=False) != rows
+
+
+def test_resume_after_interruption_matches_a_full_run(tmp_path, deterministic):
+    source = write_jsonl(tmp_path / "input.jsonl", 60)
+    full = BulkOptions(source, "jsonl", tmp_path / "full.jsonl", "jsonl", chunk_bytes=600)
+    run_bulk(full, 1, tmp_path / "full.checkpoint")
+
+    options = full._replace(output=tmp_path / "resumed.jsonl")
+    checkpoint = tmp_path / "resumed.checkpoint"
+    chunks = []
+
+    def interrupt(progress):
+        chunks.append(progress)
+        if len(chunks) == 2:
+            raise Interrupted
+
+    with pytest.raises(Interrupted):
+        run_bulk(options, 1, checkpoint, progress=interrupt)
+    saved = load_checkpoint(checkpoint, options)
+    assert saved["records"] == chunks[-1].records < 60
+    # Output written after the last checkpoint is discarded on resume
+    with open(options.output, "ab") as output:
+        output.write(b'{"partial": ')
+
+    result = run_bulk(options, 1, checkpoint, resume=True)
+    assert (result.records, result.resumed) == (60, saved["records"])
+    assert not checkpoint.exists()
+    resumed = options.output.read_bytes().splitlines()
+    assert [stable(line) for line in resumed] == [stable(line) for line in full.output.read_bytes().splitlines()]
+
+
+def test_jsonl_output_matches_single_analyses(tmp_path, deterministic):
+    source = write_jsonl(tmp_path / "input.jsonl", 12)
+    source.write_text(source.read_text() + '{"text": ""}\n')
+    options = BulkOptions(source, "jsonl", tmp_path / "output.jsonl", "jsonl", chunk_bytes=256)
+    result = run_bulk(options, 2, tmp_path / "output.checkpoint")
+    assert (result.records, result.rejected) == (13, 1)
+
+    analyzer = get_emotion_analyzer()
+    lines = options.output.read_bytes().splitlines()
+    assert len(lines) == 13
+    for line, record in zip(lines, source.read_text().splitlines()):
+        text = json.loads(record)["text"]
+        if not text:
+            assert json.loads(line)["line"] == 13 and json.loads(line)["error"]
+            continue
+        expected = analyzer.analyze_emotion(EmotionAnalysisRequest(text=text)).model_dump(mode="json")
+        assert stable(line) == {key: value for key, value in expected.items() if key not in VOLATILE}
@@ -0,0 +1,26 @@
+# backend/tests/test_classifier.py
+import pytest
+
+from app.core.config import settings
+from app.services import classifier
+
+
+@pytest.fixture
+def weights_path(tmp_path, monkeypatch):
+    path = tmp_path / "weights.npy"
+    monkeypatch.setattr(settings, "MODEL_WEIGHTS_PATH", str(path))
+    monkeypatch.setattr(classifier, "_classifier", None)
+    return path
+
+
+def test_missing_weights_fail_fast(weights_path):
+    with pytest.raises(classifier.ClassifierUnavailableError, match="app.services.classifier build"):
+        classifier.get_classifier()
+    assert not weights_path.exists()
+
+
+def test_built_weights_are_loaded(weights_path):
+    classifier.build_weights(weights_path, n_features=256, corpus_size=200)
+    assert [p.name for p in weights_path.parent.iterdir()] == [weights_path.name]
+    prediction = classifier.get_classifier().predict(["I am so happy today"])[0]
+    assert 0.0 <= prediction.confidence <= 1.0
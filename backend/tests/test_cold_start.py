@@ -0,0 +1,46 @@
+# backend/tests/test_cold_start.py
+import statistics
+
+import pytest
+
+from benchmarks.bench_cold_start import (
+    FIRST_REQUEST_BUDGET,
+    IMPORT_BUDGET,
+    WARM_REQUEST_BUDGET,
+    sample
+)
+
+# Fresh interpreters per configuration for the wall-clock budgets, which
+# depend on the machine and only run with ``pytest -m timing``
+SAMPLES = 3
+
+
+@pytest.fixture(scope="module")
+def cold():
+    return [sample(warm_up=False) for _ in range(SAMPLES)]
+
+
+@pytest.fixture(scope="module")
+def warm():
+    return [sample(warm_up=True) for _ in range(SAMPLES)]
+
+
+def test_import_defers_heavy_modules():
+    result = sample(warm_up=False)
+    assert result["deferred"] == []
+    assert not result["lexicon_loaded"]
+
+
+@pytest.mark.timing
+def test_import_within_budget(cold, warm):
+    assert statistics.median(s["import"] for s in cold + warm) <= IMPORT_BUDGET
+
+
+@pytest.mark.timing
+def test_first_request_within_budget(cold):
+    assert statistics.median(s["first_request"] for s in cold) <= FIRST_REQUEST_BUDGET
+
+
+@pytest.mark.timing
+def test_warmed_up_first_request_within_budget(warm):
+    assert statistics.median(s["first_request"] for s in warm) <= WARM_REQUEST_BUDGET
@@ -0,0 +1,50 @@
+# backend/tests/test_documents.py
+import asyncio
+
+import pytest
+
+from app.models.emotion import EmotionDocumentRequest
+from app.services.documents import CrisisContentError, iter_chunks
+from app.services.emotion_analyzer import get_emotion_analyzer
+from app.services.lexicon import get_lexicon
+
+FILLER = " and then the day went on as usual" * 40
+
+
+def straddling(prefix: int, phrase: str) -> str:
+    """A single long sentence in which the chunker cuts through ``phrase``."""
+    return "x" * prefix + " " + phrase + " " + FILLER
+
+
+@pytest.mark.parametrize("prefix", range(990, 996))
+def test_crisis_phrase_across_a_cut_is_rejected(prefix):
+    text = straddling(prefix, "kill myself")
+    chunks = [text[start:end] for start, end in iter_chunks(text, "sentence", 1000)]
+    # The precondition this guards against: no single chunk holds the phrase
+    assert get_lexicon().scan(text).crisis
+    assert not any(get_lexicon().scan(chunk).crisis for chunk in chunks)
+
+    request = EmotionDocumentRequest(text=text, split="sentence")
+    with pytest.raises(CrisisContentError):
+        asyncio.run(get_emotion_analyzer().analyze_document_async(request))
+
+
+def test_document_scores_use_phrases_across_cuts(monkeypatch):
+    lexicon = get_lexicon()
+    phrase = max((p for p in lexicon.patterns if " " in p and not lexicon.scan(p).crisis), key=len)
+    text = straddling(1000 - len(phrase) // 2, phrase)
+    chunks = [text[start:end] for start, end in iter_chunks(text, "sentence", 1000)]
+    assert not any(phrase in chunk.lower() for chunk in chunks)
+
+    analyzer = get_emotion_analyzer()
+    scans = []
+    analyze_scanned = analyzer.analyze_scanned
+    def capture(text, scan, **kwargs):
+        scans.append(scan)
+        return analyze_scanned(text, scan, **kwargs)
+    monkeypatch.setattr(analyzer, "analyze_scanned", capture)
+
+    request = EmotionDocumentRequest(text=text, split="sentence")
+    result = asyncio.run(analyzer.analyze_document_async(request))
+    assert scans == [lexicon.scan(text)]
+    assert result.chunks == len(chunks)
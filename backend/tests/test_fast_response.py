@@ -0,0 +1,73 @@
+# backend/tests/test_fast_response.py
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.routes import emotion as routes
+from app.core.config import settings
+from app.main import app
+from app.services.fast_response import RefreshingSnapshot, etag_matches, new_id
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(settings, "FAST_RESPONSES", True)
+    # Every request checks whether /stats changed
+    monkeypatch.setattr(routes, "_stats_snapshot", RefreshingSnapshot(0))
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("path", ["/api/v1/emotion/emotions", "/api/v1/emotion/stats"])
+def test_unchanged_snapshot_is_not_modified(client, path):
+    response = client.get(path)
+    etag = response.headers["etag"]
+    assert response.status_code == 200 and "cache-control" in response.headers
+
+    revalidated = client.get(path, headers={"If-None-Match": etag})
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+    assert revalidated.headers["etag"] == etag
+    assert client.get(path, headers={"If-None-Match": '"other"'}).status_code == 200
+
+
+def test_stats_change_after_an_analysis(client):
+    response = client.get("/api/v1/emotion/stats")
+    client.post("/api/v1/emotion/analyze", json={"text": "I am so happy today"})
+    changed = client.get("/api/v1/emotion/stats", headers={"If-None-Match": response.headers["etag"]})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != response.headers["etag"]
+    assert changed.json()["total_analyses"] == response.json()["total_analyses"] + 1
+
+
+def test_etag_matching():
+    assert etag_matches('"a"', '"a"')
+    assert etag_matches('W/"a"', '"a"')
+    assert etag_matches('"b", "a"', '"a"')
+    assert etag_matches("*", '"a"')
+    assert not etag_matches('"b"', '"a"')
+    assert not etag_matches('W/"ab"', '"a"')
+
+
+def test_new_ids_are_unique_version_4_uuids():
+    with ThreadPoolExecutor(8) as pool:
+        ids = list(pool.map(lambda _: new_id(), range(20000)))
+    assert len(set(ids)) == len(ids)
+    parsed = uuid.UUID(ids[0])
+    assert (str(parsed), parsed.version, parsed.variant) == (ids[0], 4, uuid.RFC_4122)
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs os.fork")
+def test_forked_worker_does_not_repeat_ids():
+    new_id()
+    read, write = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.write(write, new_id().encode("ascii"))
+        os._exit(0)
+    os.close(write)
+    os.waitpid(pid, 0)
+    with os.fdopen(read) as pipe:
+        assert pipe.read() != new_id()
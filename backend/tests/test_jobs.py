@@ -0,0 +1,105 @@
+# backend/tests/test_jobs.py
+import asyncio
+import time
+
+import pytest
+
+from app.models.emotion import EmotionBatchItem
+from app.services.emotion_analyzer import get_emotion_analyzer
+from app.services.jobs import JobLost, JobManager, JobStore
+
+ITEMS = [EmotionBatchItem(text=f"I am happy about day {i}") for i in range(6)]
+
+
+@pytest.fixture
+def stores(tmp_path):
+    """Two connections to one database, like two worker processes"""
+    first, second = JobStore(tmp_path / "jobs.sqlite3"), JobStore(tmp_path / "jobs.sqlite3")
+    yield first, second
+    first.close()
+    second.close()
+
+
+def test_running_job_is_not_claimed_twice(stores):
+    first, second = stores
+    job = first.create(ITEMS, max_queued=10)
+    assert first.claim(lease=60).id == job.id
+    assert second.claim(lease=60) is None
+
+
+def test_expired_lease_is_taken_over(stores):
+    first, second = stores
+    first.create(ITEMS, max_queued=10)
+    lost = first.claim(lease=60)
+    time.sleep(0.05)
+    taken = second.claim(lease=0.01)
+    assert taken.id == lost.id
+
+    second.save_chunk(taken, [(0, "{}", None)])
+    with pytest.raises(JobLost):
+        first.save_chunk(lost, [(0, "{}", None)])
+    with pytest.raises(JobLost):
+        first.renew(lost)
+    # The worker that lost the job cannot fail it for the new owner
+    assert not first.fail(lost, "error")
+    assert second.get(taken.id).status == "running"
+
+
+def test_renewed_lease_is_kept(stores):
+    first, second = stores
+    first.create(ITEMS, max_queued=10)
+    job = first.claim(lease=0.2)
+    for _ in range(4):
+        time.sleep(0.1)
+        job = first.renew(job)
+        assert second.claim(lease=0.2) is None
+
+
+def test_slow_chunk_keeps_its_lease(tmp_path, monkeypatch):
+    analyzer = get_emotion_analyzer()
+    analyze = analyzer.analyze_batch_async
+
+    async def slow_analyze(items, **kwargs):
+        await asyncio.sleep(0.8)
+        return await analyze(items, **kwargs)
+
+    monkeypatch.setattr(analyzer, "analyze_batch_async", slow_analyze)
+
+    async def run():
+        manager = JobManager(tmp_path / "jobs.sqlite3", workers=1, chunk_size=3, lease=0.3, poll_interval=0.05)
+        await manager.start()
+        other = JobStore(tmp_path / "jobs.sqlite3")
+        try:
+            status = await manager.submit(ITEMS)
+            while True:
+                await asyncio.sleep(0.05)
+                # A second worker polling meanwhile never gets the job
+                assert other.claim(lease=0.3) is None
+                job = other.get(status.job_id)
+                if job.status != "running" and job.status != "queued":
+                    return job
+        finally:
+            other.close()
+            await manager.stop()
+
+    job = asyncio.run(run())
+    assert (job.status, job.processed, job.succeeded) == ("completed", len(ITEMS), len(ITEMS))
+
+
+def test_jobs_skip_the_simulated_latency(tmp_path, monkeypatch):
+    monkeypatch.setattr(get_emotion_analyzer(), "_simulated_delay", lambda: 30.0)
+
+    async def run():
+        manager = JobManager(tmp_path / "jobs.sqlite3", workers=1, chunk_size=2, lease=60, poll_interval=0.01)
+        await manager.start()
+        try:
+            status = await manager.submit(ITEMS)
+            while status.status in ("queued", "running"):
+                await asyncio.sleep(0.01)
+                status = await manager.get(status.job_id, 0, 0)
+            return status
+        finally:
+            await manager.stop()
+
+    status = asyncio.run(asyncio.wait_for(run(), timeout=10))
+    assert (status.status, status.processed) == ("completed", len(ITEMS))
@@ -0,0 +1,86 @@
+# backend/tests/test_lexicon.py
+import random
+import threading
+
+import pytest
+from pydantic import ValidationError
+
+from app.core.config import settings
+from app.models.emotion import EmotionAnalysisRequest
+from app.services.lexicon import CompiledLexicon, get_lexicon, set_lexicon
+from app.services.lexicon_store import load_snapshot, save_snapshot, snapshot_path
+from benchmarks.bench_lexicon import make_text, naive_scan, scaled_lexicon
+
+
+@pytest.fixture
+def custom_lexicon():
+    """A lexicon with one extra crisis phrase, swapped in like a hot reload"""
+    builtin = get_lexicon()
+    lexicon = CompiledLexicon(
+        builtin.emotion_keywords,
+        crisis_keywords=list(builtin.crisis_keywords) + ["purple elephant"],
+        version="custom"
+    )
+    set_lexicon(lexicon)
+    yield lexicon
+    set_lexicon(builtin)
+
+
+@pytest.mark.parametrize("backend", ["thread", "process"])
+def test_reloaded_crisis_phrases_are_enforced(custom_lexicon, monkeypatch, backend):
+    monkeypatch.setattr(settings, "ANALYZER_BACKEND", backend)
+    with pytest.raises(ValidationError):
+        EmotionAnalysisRequest(text="I keep thinking about the purple elephant")
+    EmotionAnalysisRequest(text="I keep thinking about the grey elephant")
+
+
+def test_truncated_snapshots_are_recompiled(tmp_path):
+    lexicon = get_lexicon()
+    path = snapshot_path(tmp_path, lexicon.fingerprint)
+    save_snapshot(lexicon, path)
+    data = path.read_bytes()
+    assert load_snapshot(path, lexicon.fingerprint).patterns == lexicon.patterns
+
+    # Cut in the header, the pickled tables and the transition table
+    for length in (0, 10, 200, len(data) // 2, len(data) - 1):
+        path.write_bytes(data[:length])
+        assert load_snapshot(path, lexicon.fingerprint) is None
+
+
+def test_concurrent_snapshot_writers(tmp_path):
+    lexicon = get_lexicon()
+    path = snapshot_path(tmp_path, lexicon.fingerprint)
+    threads = [threading.Thread(target=save_snapshot, args=(lexicon, path)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert load_snapshot(path, lexicon.fingerprint).patterns == lexicon.patterns
+    assert [p.name for p in tmp_path.iterdir()] == [path.name]
+
+
+@pytest.mark.parametrize("scale", [1, 4])
+def test_compiled_scan_matches_substring_scans(scale):
+    rng = random.Random(scale)
+    keywords = scaled_lexicon(scale, rng)
+    lexicon = CompiledLexicon(keywords)
+    restored = CompiledLexicon.from_tables(list(lexicon.delta), **lexicon.tables())
+    phrases = list(lexicon.patterns) + ["HAPPY", "Anxious", "naïve", "café", "😊"]
+    for length in (0, 1, 20, 300, 1000):
+        for density in (0.0, 0.2, 0.8):
+            text = make_text(length, phrases, rng, density)
+            scores, intensity, crisis = naive_scan(keywords, text)
+            for compiled in (lexicon, restored):
+                scan = compiled.scan(text)
+                assert scan.scores == scores
+                assert (scan.intensity, scan.crisis) == (intensity, crisis)
+
+
+def test_overlapping_and_nested_phrases():
+    lexicon = get_lexicon()
+    # Phrases inside other phrases and words, and runs of a repeated phrase
+    text = "I'm unhappy, happyhappy, so so so stressed and overwhelmed!!"
+    scores, intensity, crisis = naive_scan(lexicon.emotion_keywords, text)
+    scan = lexicon.scan(text)
+    assert scan.scores == scores
+    assert (scan.intensity, scan.crisis) == (intensity, crisis)
@@ -0,0 +1,59 @@
+# backend/tests/test_live_session.py
+import random
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.cache import TTLCache
+from app.services.emotion_analyzer import get_emotion_analyzer
+from app.services.lexicon import get_lexicon
+from app.services.live_session import EditError, LiveSession
+
+
+def assert_matches_full_scan(session: LiveSession) -> None:
+    expected = session.lexicon.scan(session.text)
+    scan = session.scan()
+    assert scan.scores == pytest.approx(expected.scores)
+    assert (scan.intensity, scan.crisis, scan.matched) == (expected.intensity, expected.crisis, expected.matched)
+
+
+def test_random_edits_match_a_full_rescan():
+    lexicon = get_lexicon()
+    rng = random.Random(3)
+    fragments = [p for p in lexicon.patterns if p] + [" ", "so ", "not ", "x", "!"]
+    session = LiveSession(lexicon, max_chars=5000)
+    for _ in range(500):
+        text = session.text
+        start = rng.randint(0, len(text))
+        end = min(len(text), start + rng.choice([0, 0, 1, 3, 10]))
+        insert = rng.choice(fragments)[:rng.randint(0, 12)] if rng.random() < 0.8 else ""
+        if len(text) - (end - start) + len(insert) > session.max_chars:
+            continue
+        session.replace(start, end, insert)
+        assert_matches_full_scan(session)
+
+
+def test_edit_that_splits_and_joins_a_phrase():
+    session = LiveSession(get_lexicon(), max_chars=100)
+    session.set_text("I am happy")
+    session.replace(7, 7, " ")
+    assert_matches_full_scan(session)
+    session.replace(7, 8, "")
+    assert_matches_full_scan(session)
+    with pytest.raises(EditError):
+        session.replace(5, 50, "")
+
+
+def test_live_results_stay_out_of_the_result_cache(monkeypatch):
+    analyzer = get_emotion_analyzer()
+    monkeypatch.setattr(analyzer, "result_cache", TTLCache(max_entries=100, ttl_seconds=60))
+    with TestClient(app).websocket_connect("/api/v1/emotion/analyze/live") as websocket:
+        websocket.send_json({"type": "set", "text": "I am happy"})
+        websocket.send_json({"type": "analyze"})
+        # The first text changes the state from nothing, so it is pushed too
+        assert [websocket.receive_json()["type"] for _ in range(2)] == ["result", "result"]
+        websocket.send_json({"type": "edit", "start": 10, "end": 10, "text": " and glad"})
+        websocket.send_json({"type": "analyze"})
+        assert websocket.receive_json()["result"]["emotion"]
+    assert analyzer.get_cache_stats().size == 0
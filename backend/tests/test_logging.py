@@ -0,0 +1,22 @@
+# backend/tests/test_logging.py
+import io
+import logging
+import queue
+
+from app.core.logging import BatchingQueueListener
+
+
+def test_stop_flushes_a_full_queue():
+    stream = io.StringIO()
+    handler = logging.StreamHandler(stream)
+    log_queue = queue.Queue(maxsize=4)
+    listener = BatchingQueueListener(log_queue, handler, interval=0.2)
+    listener.start()
+
+    records = [logging.makeLogRecord({"msg": f"record {i}", "levelno": logging.INFO}) for i in range(5)]
+    for record in records:
+        log_queue.put(record, timeout=1)
+    assert log_queue.full()
+
+    listener.stop()
+    assert stream.getvalue().splitlines() == [f"record {i}" for i in range(5)]
@@ -0,0 +1,44 @@
+# backend/tests/test_profiling.py
+import time
+from fastapi.testclient import TestClient
+
+from app.core.profiling import ADMIN_TOKEN_HEADER, PROFILE_ID_HEADER, ProfileStore, _frame_label, profiler
+from app.main import create_application
+
+TOKEN = "test-token"
+
+
+class OldCode:
+    """A code object as Python 3.9 and 3.10 have them, without co_qualname"""
+    co_name = "scan"
+    co_filename = "/app/services/lexicon.py"
+    co_firstlineno = 12
+
+
+def test_frame_label_without_qualname():
+    assert _frame_label(OldCode(), {}) == "scan (lexicon.py:12)"
+
+
+def test_profiled_request_is_sampled(monkeypatch, tmp_path):
+    monkeypatch.setattr(profiler, "admin_token", TOKEN.encode("latin-1"))
+    monkeypatch.setattr(profiler, "store", ProfileStore(tmp_path, 5))
+    client = TestClient(create_application())
+    headers = {ADMIN_TOKEN_HEADER: TOKEN}
+
+    document = "I am happy and excited about the trip this weekend. " * 5000
+    response = client.post("/api/v1/emotion/analyze/document", json={"text": document}, headers=headers)
+    assert response.status_code == 200
+    profile_id = response.headers[PROFILE_ID_HEADER]
+
+    # The profile is written by a background thread once the response is sent
+    deadline = time.monotonic() + 5
+    while not client.get("/admin/profiles", headers=headers).json():
+        assert time.monotonic() < deadline, "profile was not saved"
+        time.sleep(0.01)
+    [summary] = client.get("/admin/profiles", headers=headers).json()
+    assert summary["profile_id"] == profile_id
+    assert summary["samples"] > 0
+    stacks = client.get(f"/admin/profiles/{profile_id}", headers=headers).text
+    lines = stacks.splitlines()
+    assert lines and all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+    assert any(".py:" in line for line in lines)
@@ -0,0 +1,29 @@
+# backend/tests/test_warmup.py
+import asyncio
+
+from app.services import warmup as warmup_module
+from app.services.warmup import WarmUp
+
+
+def test_failed_warm_up_is_retried_until_ready(monkeypatch):
+    attempts = []
+
+    def flaky_warm_up():
+        attempts.append(len(attempts))
+        if len(attempts) < 3:
+            raise RuntimeError("weights not built yet")
+
+    monkeypatch.setattr(warmup_module, "_warm_up", flaky_warm_up)
+    warmup = WarmUp(enabled=True, retry_delay=0.01)
+    states = []
+
+    async def run():
+        await warmup.start()
+        while not warmup.ready:
+            states.append((warmup.state, warmup.error))
+            await asyncio.sleep(0.001)
+
+    asyncio.run(asyncio.wait_for(run(), timeout=5))
+    assert len(attempts) == 3
+    assert ("failed", "weights not built yet") in states
+    assert warmup.error is None